@@ -16,6 +16,9 @@ from src.app.agents.nodes import (
 )
 from src.app.domain.enums import ProcessingStatus
 from src.app.domain.state import AgentState
+from src.app.services.deduplication import DeduplicationService
+from src.app.services.memory import KnowledgeBaseService
+from src.app.services.vector_store import VectorStore
 
 
 def route_after_router(state: AgentState) -> str:
@@ -61,20 +64,26 @@ def route_after_reviewer(state: AgentState) -> str:
 	return "debugger"
 
 
-def create_workflow(embedding_function=None) -> StateGraph:
+def create_workflow(vector_store: VectorStore | None = None) -> StateGraph:
 	"""
 	Constructs the StateGraph logic without compiling.
 	"""
 	workflow = StateGraph(AgentState)
 
-	# Bind the embedding function to each node that needs it
+	# Vector-backed services share one app-lifetime store; bind them to the nodes that need them
+	vector_store = vector_store or VectorStore()
+	vector_services = {
+		"dedup_service": DeduplicationService(vector_store),
+		"memory_service": KnowledgeBaseService(vector_store),
+	}
+
 	workflow.add_node("router", router_node)
-	workflow.add_node("analyst", functools.partial(analyst_node, embedding_function=embedding_function))
+	workflow.add_node("analyst", functools.partial(analyst_node, **vector_services))
 	workflow.add_node("human_approval", human_approval_node)
 	workflow.add_node("feature_coder", feature_coder_node)
 	workflow.add_node("repo_explorer", repo_explorer_node)
 	workflow.add_node("debugger", debugger_node)
-	workflow.add_node("reviewer", functools.partial(reviewer_node, embedding_function=embedding_function))
+	workflow.add_node("reviewer", functools.partial(reviewer_node, **vector_services))
 	workflow.add_node("batch", batch_node)
 	workflow.add_node("final_output", final_output_node)
 
@@ -119,11 +128,11 @@ def create_workflow(embedding_function=None) -> StateGraph:
 	return workflow
 
 
-def compile_graph(checkpointer: BaseCheckpointSaver = None, embedding_function=None):
+def compile_graph(checkpointer: BaseCheckpointSaver = None, vector_store: VectorStore | None = None):
     """
-    Compiles the graph with an optional checkpointer.
+    Compiles the graph with an optional checkpointer and shared vector store.
     """
-    workflow = create_workflow(embedding_function)
+    workflow = create_workflow(vector_store)
     # HITL: stop right after Analyst has produced the plan, before we enter the approval gate.
     # We intentionally DO NOT interrupt before coder nodes because that would also pause debug runs.
     return workflow.compile(checkpointer=checkpointer, interrupt_before=["human_approval"])
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import re
@@ -15,13 +16,17 @@ from src.app.agents.prompts import (
 	FIXER_SYSTEM_PROMPT,
 	ROUTER_SYSTEM_PROMPT,
 )
+from src.app.core.concurrency import run_blocking
+from src.app.core.config import get_settings
 from src.app.domain.enums import ProcessingStatus, TestType
 from src.app.domain.state import AgentState
+from src.app.services.context_budget import context_budget, token_counter
 from src.app.services.deduplication import DeduplicationService
 from src.app.services.defects import DefectAnalysisService
 from src.app.services.llm_factory import CloudRuLLMService
 from src.app.services.memory import KnowledgeBaseService
 from src.app.services.parsers.openapi import OpenAPIParser
+from src.app.services.speculation import plan_fingerprint, speculative_coder
 from src.app.services.storage import storage_service
 from src.app.services.tools.browser import WebInspector
 from src.app.services.tools.codebase_navigator import CodebaseNavigator
@@ -30,6 +35,7 @@ from src.app.services.validator import ValidationService
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
 defect_service = DefectAnalysisService()
 llm_service = CloudRuLLMService()
 web_inspector = WebInspector()
@@ -49,7 +55,7 @@ async def human_approval_node(state: AgentState) -> dict[str, Any]:
 	interrupting reviewer retry loops or debug flows.
 	"""
 	# Keep this node minimal to avoid accidentally overwriting state.
-	log_path = storage_service.save(
+	log_path = await storage_service.asave(
 		"System: Human approval received. Continuing to code generation...",
 		run_id=state["run_id"],
 		extension="log"
@@ -88,10 +94,8 @@ def _extract_fix_summary_from_code(code: str | None) -> str | None:
 	return m.group(1).strip() or None
 
 
-def _truncate(text: str, limit: int) -> str:
-	if len(text) <= limit:
-		return text
-	return text[:limit] + "\n...<truncated>..."
+def _truncate(text: str, max_tokens: int) -> str:
+	return token_counter.truncate(text, max_tokens)
 
 
 async def router_node(state: AgentState) -> dict[str, Any]:
@@ -125,7 +129,59 @@ async def router_node(state: AgentState) -> dict[str, Any]:
 		return {"task_type": "ui_test_gen"}
 
 
-async def analyst_node(state: AgentState, embedding_function=None) -> dict[str, Any]:
+async def _gather_source(name: str, coro, timeout: float | None, default: Any, logs: list[str]) -> Any:
+	"""Awaits one context source; on timeout or error logs it and returns `default`."""
+	try:
+		return await asyncio.wait_for(coro, timeout)
+	except TimeoutError:
+		logger.warning(f"⚠️ [Analyst] Context source '{name}' timed out after {timeout}s. Continuing without it.")
+		logs.append(f"Analyst: '{name}' context timed out, continuing without it.")
+	except Exception as e:
+		logger.warning(f"⚠️ [Analyst] Context source '{name}' failed (non-fatal): {e}")
+		logs.append(f"Analyst: '{name}' context unavailable: {e}")
+	return default
+
+
+async def _gather_code_context(raw_input: str, git_url_match: re.Match | None, logs: list[str]) -> tuple[str, Path | None]:
+	"""Returns (parsed_context, repo_path) from a git repository, an OpenAPI spec or the raw request."""
+	if "[SOURCE CODE CONTEXT" in raw_input:
+		return raw_input, None
+	if git_url_match:
+		repo_url = git_url_match.group(0)
+		logger.info(f"🐙 [Analyst] Detected Git repository: {repo_url}")
+		try:
+			repo_path = await codebase_navigator.aclone_repo(repo_url)
+			file_tree = await codebase_navigator.aget_file_tree(repo_path)
+			logger.info("✅ [Analyst] Cloned repo and generated file tree.")
+			return f"[SOURCE CODE REPOSITORY]\nURL: {repo_url}\n\n[FILE TREE]\n{file_tree}", repo_path
+		except Exception as e:
+			logger.error(f"❌ [Analyst] Failed to process git repository: {e}")
+			return raw_input, None
+	if "http" in raw_input and "api" in raw_input.lower():
+		logger.info("🔍 [Analyst] Parsing OpenAPI spec from URL in request.")
+		return await OpenAPIParser.aparse(raw_input, query=raw_input), None
+	return raw_input, None
+
+
+async def _gather_vision_context(url: str, raw_input: str, logs: list[str]) -> str:
+	logger.info(f"🌍 [Analyst] Detected URL: {url}. Starting WebInspector...")
+	logs.append(f"Analyst: Detected URL {url}. Inspecting page structure...")
+	try:
+		dom_tree = await web_inspector.inspect_page(url, query=raw_input)
+	except Exception as e:
+		logger.error(f"❌ [Analyst] WebInspector failed: {e}")
+		logs.append(f"Analyst: Inspection failed: {e}")
+		return ""
+	logger.info(f"👁️ [Analyst] DOM Tree extracted ({len(dom_tree)} chars).")
+	logs.append("Analyst: Page inspection complete. DOM context acquired.")
+	return f"\n\n[REAL PAGE DOM STRUCTURE ({url})]:\n{dom_tree}\n\n[INSTRUCTION]: USE THESE EXACT ATTRIBUTES (id, class, testid) FOR LOCATORS."
+
+
+async def analyst_node(
+	state: AgentState,
+	dedup_service: DeduplicationService | None = None,
+	memory_service: KnowledgeBaseService | None = None,
+) -> dict[str, Any]:
 	logger.info("🚀 [Analyst] Node started.")
 	llm = llm_service.get_model(state.get("model_name"))
 	raw_input = state['user_request']
@@ -133,99 +189,96 @@ async def analyst_node(state: AgentState, embedding_function=None) -> dict[str,
 	run_id = state.get("run_id", "unknown_run")
 	logs = []
 
-	dedup_service = DeduplicationService(embedding_function)
-	memory_service = KnowledgeBaseService(embedding_function)
-
 	# 0. Auto-Fix Check
 	if "[AUTO-FIX]" in raw_input:
 		logger.info("🔧 [Analyst] Detected Auto-Fix request. Redirecting to Debugger.")
-		log_path = storage_service.save("System: Detected Auto-Fix request. Handing over to Debugger.", run_id, "log")
+		log_path = await storage_service.asave("System: Detected Auto-Fix request. Handing over to Debugger.", run_id, "log")
 		return {
 			"status": ProcessingStatus.FIXING,
 			"scenarios": [],
 			"log_path": log_path,
 		}
 
-	# 1. RAG & Defects
-	defects_context = defect_service.get_relevant_defects(raw_input)
-	memory_context = ""
-	try:
-		memory_context = memory_service.recall_lessons(raw_input, url=request_url)
-		if memory_context:
-			logger.info("🧠 [Analyst] Found relevant lessons in long-term memory.")
-			logs.append("Analyst: Injected long-term memory insights into context.")
-	except Exception as e:
-		logger.warning(f"⚠️ [Analyst] Memory recall failed (non-fatal): {e}")
-
+	# 1. Context gathering: every source is independent I/O, so they run concurrently
+	# with their own timeout. A failed or slow source only drops its part of the context.
+	timeouts = settings.ANALYST_SOURCE_TIMEOUTS
+	git_url_match = re.search(r'https?://[^\s]+\.git', raw_input)
+	url_match = re.search(r'https?://[^\s]+', raw_input)
 	is_follow_up = len(state.get("messages", [])) > 1
 	if is_follow_up:
 		logger.info("💬 [Analyst] Follow-up message detected. Bypassing RAG cache.")
-		cached_code = None
-	else:
-		cached_code = dedup_service.find_similar(raw_input)
 
+	dedup_service = dedup_service or DeduplicationService()
+	memory_service = memory_service or KnowledgeBaseService()
+
+	tasks: dict[str, asyncio.Task] = {
+		"defects": asyncio.create_task(_gather_source(
+			"defects", run_blocking(defect_service.get_relevant_defects, raw_input), timeouts.get("defects"), "", logs)),
+		"memory": asyncio.create_task(_gather_source(
+			"memory", memory_service.arecall_lessons(raw_input, url=request_url), timeouts.get("memory"), "", logs)),
+		"code": asyncio.create_task(_gather_source(
+			"code", _gather_code_context(raw_input, git_url_match, logs), timeouts.get("code"), (raw_input, None), logs)),
+	}
+	if not is_follow_up:
+		tasks["dedup"] = asyncio.create_task(_gather_source(
+			"dedup", dedup_service.afind_similar(raw_input), timeouts.get("dedup"), None, logs))
+	if url_match and not git_url_match and "api" not in raw_input.lower():
+		tasks["vision"] = asyncio.create_task(_gather_source(
+			"vision", _gather_vision_context(url_match.group(0), raw_input, logs), timeouts.get("vision"), "", logs))
+
+	cached_code = await tasks["dedup"] if "dedup" in tasks else None
 	if cached_code:
+		# Cancels only the coroutines: work already handed to `run_blocking` threads (defect
+		# lookup, git clone, page inspection) runs to completion in the background, which the
+		# old sequential flow never started.
+		for task in tasks.values():
+			task.cancel()
+		await asyncio.gather(*tasks.values(), return_exceptions=True)
 		logger.info("✅ [Analyst] Found exact match in RAG. Skipping generation.")
-		log_path = storage_service.save(
+		log_path = await storage_service.asave(
 			"Analyst: Found exact match in knowledge base.\nSystem: Retrieved verified code.",
 			run_id, "log"
 		)
-		code_path = storage_service.save(cached_code, run_id, "py")
+		code_path = await storage_service.asave(cached_code, run_id, "py")
 		return {
 			"generated_code_path": code_path,
 			"status": ProcessingStatus.COMPLETED,
 			"log_path": log_path,
 		}
 
-	# 2. Context Parsing
-	parsed_context = ""
-	repo_path = None
-	git_url_match = re.search(r'https?://[^\s]+\.git', raw_input)
+	await asyncio.gather(*tasks.values())
+	defects_context = tasks["defects"].result()
+	memory_context = tasks["memory"].result()
+	parsed_context, repo_path = tasks["code"].result()
+	vision_context = tasks["vision"].result() if "vision" in tasks else ""
+	if memory_context:
+		logger.info("🧠 [Analyst] Found relevant lessons in long-term memory.")
+		logs.append("Analyst: Injected long-term memory insights into context.")
 
-	if "[SOURCE CODE CONTEXT" in raw_input:
-		parsed_context = raw_input
-	elif git_url_match:
-		repo_url = git_url_match.group(0)
-		logger.info(f"🐙 [Analyst] Detected Git repository: {repo_url}")
-		try:
-			repo_path = codebase_navigator.clone_repo(repo_url)
-			file_tree = codebase_navigator.get_file_tree(repo_path)
-			parsed_context = f"[SOURCE CODE REPOSITORY]\nURL: {repo_url}\n\n[FILE TREE]\n{file_tree}"
-			logger.info("✅ [Analyst] Cloned repo and generated file tree.")
-		except Exception as e:
-			logger.error(f"❌ [Analyst] Failed to process git repository: {e}")
-			parsed_context = raw_input
-	elif "http" in raw_input and "api" in raw_input.lower():
-		logger.info("🔍 [Analyst] Parsing OpenAPI spec from URL in request.")
-		parsed_context = OpenAPIParser.parse(raw_input, query=raw_input)
-	else:
-		parsed_context = raw_input
-
-	# 3. Web Inspector
-	url_match = re.search(r'https?://[^\s]+', raw_input)
-	vision_context = ""
-	if url_match and not git_url_match and "api" not in raw_input.lower():
-		url = url_match.group(0)
-		logger.info(f"🌍 [Analyst] Detected URL: {url}. Starting WebInspector...")
-		logs.append(f"Analyst: Detected URL {url}. Inspecting page structure...")
-		try:
-			dom_tree = await web_inspector.inspect_page(url)
-			vision_context = f"\n\n[REAL PAGE DOM STRUCTURE ({url})]:\n{dom_tree}\n\n[INSTRUCTION]: USE THESE EXACT ATTRIBUTES (id, class, testid) FOR LOCATORS."
-			logger.info(f"👁️ [Analyst] DOM Tree extracted ({len(dom_tree)} chars).")
-			logs.append("Analyst: Page inspection complete. DOM context acquired.")
-		except Exception as e:
-			logger.error(f"❌ [Analyst] WebInspector failed: {e}")
-			logs.append(f"Analyst: Inspection failed: {e}")
-
-	# 4. LLM Call
+	# 2. LLM Call
 	logger.info("🧠 [Analyst] Generating Test Plan...")
+	history_messages = state["messages"][1:] if len(state.get("messages", [])) > 1 else []
+	fitted = context_budget.fit(
+		{
+			"source": parsed_context,
+			"vision": vision_context,
+			"defects": defects_context,
+			"memory": memory_context,
+		},
+		fixed_text=ANALYST_SYSTEM_PROMPT + raw_input + "".join(str(m.content) for m in history_messages),
+	)
+	parsed_context = fitted["source"]
+	vision_context = fitted["vision"]
+	defects_context = fitted["defects"]
+	memory_context = fitted["memory"]
+
 	messages_for_llm = [
 		SystemMessage(content=ANALYST_SYSTEM_PROMPT),
 		HumanMessage(content=(
 			f"Original Request: '{state['user_request']}'\n\n"
 			f"Supporting Context:\n{parsed_context}{defects_context}{memory_context}{vision_context}"
 		)),
-		*(state["messages"][1:] if len(state.get("messages", [])) > 1 else [])
+		*history_messages
 	]
 
 	try:
@@ -247,7 +300,7 @@ async def analyst_node(state: AgentState, embedding_function=None) -> dict[str,
 
 	if not plan or not plan.strip():
 		question = "I wasn't able to generate a test plan. Could you please clarify the task?"
-		log_path = storage_service.save("Analyst: LLM returned empty plan, asking for clarification.", run_id, "log")
+		log_path = await storage_service.asave("Analyst: LLM returned empty plan, asking for clarification.", run_id, "log")
 		return {
 			"messages": [AIMessage(content=question)],
 			"status": ProcessingStatus.WAITING_FOR_INPUT,
@@ -256,7 +309,7 @@ async def analyst_node(state: AgentState, embedding_function=None) -> dict[str,
 
 	if plan.strip().startswith("[CLARIFICATION]"):
 		question = plan.replace("[CLARIFICATION]", "").strip()
-		log_path = storage_service.save("Analyst: Ambiguous request, asking for clarification.", run_id, "log")
+		log_path = await storage_service.asave("Analyst: Ambiguous request, asking for clarification.", run_id, "log")
 		return {
 			"messages": [AIMessage(content=question)],
 			"status": ProcessingStatus.WAITING_FOR_INPUT,
@@ -271,15 +324,20 @@ async def analyst_node(state: AgentState, embedding_function=None) -> dict[str,
 	logs.append("System: Waiting for human approval of the test plan...")
 
 	# Save artifacts
-	log_path = storage_service.save("\n".join(logs), run_id, "log")
-	plan_path = storage_service.save(plan, run_id, "md")
-	context_path = storage_service.save(parsed_context + vision_context, run_id, "txt")
+	tech_context = parsed_context + vision_context
+	batch_scenarios = scenarios if len(scenarios) > 1 else None
+	if (batch_scenarios or not repo_path) and _start_speculative_generation(run_id, plan, tech_context, batch_scenarios, state.get("model_name")):
+		logs.append("System: Started speculative code generation while the plan is reviewed.")
+
+	log_path = await storage_service.asave("\n".join(logs), run_id, "log")
+	plan_path = await storage_service.asave(plan, run_id, "md")
+	context_path = await storage_service.asave(tech_context, run_id, "txt")
 
 	return {
 		"repo_path": str(repo_path) if repo_path else None,
 		"test_plan_path": plan_path,
 		"technical_context_path": context_path,
-		"scenarios": scenarios if len(scenarios) > 1 else None,
+		"scenarios": batch_scenarios,
 		"test_type": t_type,
 		"status": ProcessingStatus.WAITING_FOR_APPROVAL,
 		"log_path": log_path,
@@ -287,28 +345,46 @@ async def analyst_node(state: AgentState, embedding_function=None) -> dict[str,
 	}
 
 
-async def feature_coder_node(state: AgentState) -> dict[str, Any]:
-	"""Generates code based on a plan, without repository interaction."""
-	logger.info("💻 [Coder] Simple generation mode activated.")
-	llm = llm_service.get_model(state.get("model_name"))
-	run_id = state.get("run_id", "unknown_run")
+def _start_speculative_generation(
+	run_id: Any, plan: str, tech_context: str, scenarios: list[str] | None, model_name: str | None
+) -> bool:
+	"""Starts the coder (or batch) on the draft plan while the graph waits for approval."""
+	fingerprint = plan_fingerprint(plan, tech_context, scenarios)
+	if scenarios:
+		return speculative_coder.start(run_id, fingerprint, lambda: process_batch(scenarios))
+	return speculative_coder.start(run_id, fingerprint, lambda: _generate_feature_code(plan, tech_context, model_name))
 
-	plan_str = storage_service.load(state["test_plan_path"]) if state.get("test_plan_path") else ""
-	tech_context = storage_service.load(state["technical_context_path"]) if state.get("technical_context_path") else ""
 
+async def _generate_feature_code(plan_str: str, tech_context: str, model_name: str | None) -> str:
+	llm = llm_service.get_model(model_name)
 	messages = [
 		SystemMessage(content=CODER_SYSTEM_PROMPT),
 		HumanMessage(content=f"Technical Context:\n{tech_context}\n\nTest Plan:\n{plan_str}\n\nGenerate the full Python code now.")
 	]
+	response = await llm.ainvoke(messages)
+	return response.content.replace("```python", "").replace("```", "").strip()
+
+
+async def feature_coder_node(state: AgentState) -> dict[str, Any]:
+	"""Generates code based on a plan, without repository interaction."""
+	logger.info("💻 [Coder] Simple generation mode activated.")
+	run_id = state.get("run_id", "unknown_run")
+
+	plan_str = await storage_service.aload(state["test_plan_path"]) if state.get("test_plan_path") else ""
+	tech_context = await storage_service.aload(state["technical_context_path"]) if state.get("technical_context_path") else ""
+
 	log_msg = "Coder: Generating initial code..."
 
 	try:
-		response = await llm.ainvoke(messages)
-		code = response.content.replace("```python", "").replace("```", "").strip()
+		code = await speculative_coder.take(run_id, plan_fingerprint(plan_str, tech_context))
+		if code:
+			log_msg = "Coder: Reused code generated speculatively during plan review."
+		else:
+			code = await _generate_feature_code(plan_str, tech_context, state.get("model_name"))
 		logger.info(f"✅ [Coder] Code generated ({len(code)} chars).")
 
-		code_path = storage_service.save(code, run_id, "py")
-		log_path = storage_service.save(log_msg, run_id, "log")
+		code_path = await storage_service.asave(code, run_id, "py")
+		log_path = await storage_service.asave(log_msg, run_id, "log")
 
 		return {
 			"generated_code_path": code_path,
@@ -319,10 +395,22 @@ async def feature_coder_node(state: AgentState) -> dict[str, Any]:
 		}
 	except Exception as e:
 		logger.error(f"❌ [Coder] LLM Generation Failed: {e}", exc_info=True)
-		log_path = storage_service.save(f"Coder: Critical LLM Error. The AI Provider returned an error: {str(e)}", run_id, "log")
+		log_path = await storage_service.asave(f"Coder: Critical LLM Error. The AI Provider returned an error: {str(e)}", run_id, "log")
 		return {"status": ProcessingStatus.FAILED, "log_path": log_path}
 
 
+async def _run_tool_call(tool_to_call, args: dict[str, Any], timeout: float | None) -> str:
+	"""Runs one explorer tool; a timeout or error becomes the tool's answer so the model can adapt."""
+	try:
+		return await asyncio.wait_for(tool_to_call.ainvoke(args), timeout)
+	except TimeoutError:
+		logger.warning(f"⚠️ [Coder/Explorer] Tool '{tool_to_call.name}' timed out after {timeout}s.")
+		return f"Error: {tool_to_call.name} timed out after {timeout}s. Try a narrower request."
+	except Exception as e:
+		logger.warning(f"⚠️ [Coder/Explorer] Tool '{tool_to_call.name}' failed: {e}")
+		return f"Error: {tool_to_call.name} failed: {e}"
+
+
 async def repo_explorer_node(state: AgentState) -> dict[str, Any]:
 	"""Explores a repository using tools (ReAct loop) and then generates code."""
 	logger.info("🛠️ [Coder/Explorer] Tool-using repository analysis mode activated.")
@@ -331,22 +419,41 @@ async def repo_explorer_node(state: AgentState) -> dict[str, Any]:
 	repo_path = Path(repo_path_str)
 	run_id = state.get("run_id", "unknown_run")
 	logs = []
+	# Reads of this session by (file, first line): files are not re-read across iterations,
+	# and concurrent reads of the same window share one task.
+	read_cache: dict[tuple[str, int], asyncio.Task] = {}
 
 	@tool
-	async def read_file(file_path: str) -> str:
-		"""Reads the content of a specific file within the cloned repository."""
-		full_path = repo_path / file_path
-		return codebase_navigator.read_file_content(full_path)
+	async def read_file(file_path: str, start_line: int = 1) -> str:
+		"""Reads the content of a specific file within the cloned repository (500 lines from `start_line`)."""
+		key = (str(Path(file_path)), start_line)
+		if key not in read_cache:
+			read_cache[key] = asyncio.ensure_future(
+				codebase_navigator.aread_file_content(repo_path / file_path, start_line=start_line)
+			)
+		return await asyncio.shield(read_cache[key])
 
 	@tool
 	async def search_code(query: str) -> str:
 		"""Searches for a string or regex query within the cloned repository."""
-		return codebase_navigator.search_in_codebase(repo_path, query)
+		return await codebase_navigator.asearch_in_codebase(repo_path, query)
 
-	llm_with_tools = llm.bind_tools([read_file, search_code])
+	@tool
+	async def find_symbol(name: str) -> str:
+		"""Finds where a class, function, method, type or constant is defined (exact, then partial name matches)."""
+		return await codebase_navigator.afind_symbol(repo_path, name)
 
-	plan_str = storage_service.load(state["test_plan_path"]) if state.get("test_plan_path") else ""
-	tech_context = storage_service.load(state["technical_context_path"]) if state.get("technical_context_path") else ""
+	@tool
+	async def find_references(name: str) -> str:
+		"""Finds the places where an identifier is used, excluding its definitions."""
+		return await codebase_navigator.afind_references(repo_path, name)
+
+	tools = {t.name: t for t in (read_file, search_code, find_symbol, find_references)}
+	timeouts = settings.REPO_EXPLORER_TOOL_TIMEOUTS
+	llm_with_tools = llm.bind_tools(list(tools.values()))
+
+	plan_str = await storage_service.aload(state["test_plan_path"]) if state.get("test_plan_path") else ""
+	tech_context = await storage_service.aload(state["technical_context_path"]) if state.get("technical_context_path") else ""
 
 	messages = [
 		SystemMessage(content=CODER_SYSTEM_PROMPT),
@@ -362,24 +469,27 @@ async def repo_explorer_node(state: AgentState) -> dict[str, Any]:
 		if not response.tool_calls:
 			logger.info("✅ [Coder/Explorer] LLM provided final code. Exiting ReAct loop.")
 			code = response.content.replace("```python", "").replace("```", "").strip()
-			code_path = storage_service.save(code, run_id, "py")
+			code_path = await storage_service.asave(code, run_id, "py")
 			logs.append(f"Coder: Generated code after {i + 1} research steps.")
-			log_path = storage_service.save("\n".join(logs), run_id, "log")
+			log_path = await storage_service.asave("\n".join(logs), run_id, "log")
 			return {"generated_code_path": code_path, "status": ProcessingStatus.VALIDATING,
 							"log_path": log_path}
 
 		messages.append(response)
 
-		for tool_call in response.tool_calls:
-			tool_to_call = read_file if tool_call["name"] == "read_file" else search_code
-			tool_output = await tool_to_call.ainvoke(tool_call["args"])
+		# Tool calls of one turn are independent: run them concurrently, answer in call order.
+		outputs = await asyncio.gather(*(
+			_run_tool_call(tools.get(tool_call["name"], search_code), tool_call["args"], timeouts.get(tool_call["name"]))
+			for tool_call in response.tool_calls
+		))
+		for tool_call, tool_output in zip(response.tool_calls, outputs, strict=True):
 			messages.append(ToolMessage(content=tool_output, tool_call_id=tool_call["id"]))
 			log_msg = f"Tool Call: {tool_call['name']}({tool_call['args']}) -> Output: {len(tool_output)} chars"
 			logger.info(f"🛠️ [Coder/Explorer] {log_msg}")
 			logs.append(log_msg)
 
 	logs.append("Coder: Failed to generate code within the maximum number of tool iterations.")
-	log_path = storage_service.save("\n".join(logs), run_id, "log")
+	log_path = await storage_service.asave("\n".join(logs), run_id, "log")
 	return {"status": ProcessingStatus.FAILED, "log_path": log_path}
 
 
@@ -392,7 +502,7 @@ async def debugger_node(state: AgentState) -> dict[str, Any]:
 
 	previous_code = ""
 	if state.get("generated_code_path"):
-		previous_code = storage_service.load(state["generated_code_path"])
+		previous_code = await storage_service.aload(state["generated_code_path"])
 
 	is_auto_fix = state.get("task_type") == "debug_request"
 
@@ -401,7 +511,7 @@ async def debugger_node(state: AgentState) -> dict[str, Any]:
 		user_error_log = state['user_request'].replace("[AUTO-FIX]", "").strip()
 		last_fix_error = user_error_log
 
-		context = trace_inspector.get_failure_context(run_id, user_error_log)
+		context = await trace_inspector.aget_failure_context(run_id, user_error_log)
 		if context:
 			logger.info("✅ [Debugger] Trace Inspector context found. Using rich debugging.")
 			human_prompt = DEBUGGER_SYSTEM_PROMPT.format(
@@ -431,9 +541,9 @@ async def debugger_node(state: AgentState) -> dict[str, Any]:
 		code = response.content.replace("```python", "").replace("```", "").strip()
 		logger.info(f"✅ [Debugger] Code fixed ({len(code)} chars).")
 
-		new_code_path = storage_service.save(code, run_id, "py")
-		old_code_path = storage_service.save(previous_code, run_id, "py.old")
-		log_path = storage_service.save("\n".join(logs), run_id, "log")
+		new_code_path = await storage_service.asave(code, run_id, "py")
+		old_code_path = await storage_service.asave(previous_code, run_id, "py.old")
+		log_path = await storage_service.asave("\n".join(logs), run_id, "log")
 
 		update: dict[str, Any] = {
 			"generated_code_path": new_code_path,
@@ -449,29 +559,33 @@ async def debugger_node(state: AgentState) -> dict[str, Any]:
 	except Exception as e:
 		logger.error(f"❌ [Debugger] LLM Generation Failed: {e}", exc_info=True)
 		logs.append(f"Debugger: Critical LLM Error. The AI Provider returned an error: {str(e)}")
-		log_path = storage_service.save("\n".join(logs), run_id, "log")
+		log_path = await storage_service.asave("\n".join(logs), run_id, "log")
 		return {"status": ProcessingStatus.FAILED, "log_path": log_path}
 
 
 
-async def reviewer_node(state: AgentState, embedding_function=None) -> dict[str, Any]:
+async def reviewer_node(
+	state: AgentState,
+	dedup_service: DeduplicationService | None = None,
+	memory_service: KnowledgeBaseService | None = None,
+) -> dict[str, Any]:
 	logger.info("🚀 [Reviewer] Node started. Validating code...")
 	run_id = state.get("run_id", "unknown_run")
 	logs = []
 
 	code = ""
 	if state.get("generated_code_path"):
-		code = storage_service.load(state["generated_code_path"])
+		code = await storage_service.aload(state["generated_code_path"])
 
 	is_valid, error_msg, fixed_code = await validation_service.validate(code)
 
 	new_state = {}
 	if fixed_code:
-		new_state["generated_code_path"] = storage_service.save(fixed_code, run_id, "py")
+		new_state["generated_code_path"] = await storage_service.asave(fixed_code, run_id, "py")
 		code = fixed_code # Use fixed code for subsequent steps
 
-	dedup_service = DeduplicationService(embedding_function)
-	memory_service = KnowledgeBaseService(embedding_function)
+	dedup_service = dedup_service or DeduplicationService()
+	memory_service = memory_service or KnowledgeBaseService()
 
 	# If static analysis passed, and it's a UI test, do a live locator check
 	if is_valid and state.get("test_type") == TestType.UI:
@@ -484,7 +598,7 @@ async def reviewer_node(state: AgentState, embedding_function=None) -> dict[str,
 		# 2. Extract URL from technical context
 		tech_context = ""
 		if state.get("technical_context_path"):
-			tech_context = storage_service.load(state["technical_context_path"])
+			tech_context = await storage_service.aload(state["technical_context_path"])
 		url_match = re.search(r'https?://[^\s]+', tech_context)
 
 		if locators and url_match:
@@ -509,7 +623,7 @@ async def reviewer_node(state: AgentState, embedding_function=None) -> dict[str,
 				new_code = code # This is the fixed code now
 				old_code = ""
 				if state.get("last_fix_old_code_path"):
-					old_code = storage_service.load(state["last_fix_old_code_path"])
+					old_code = await storage_service.aload(state["last_fix_old_code_path"])
 				error_log = state.get("last_fix_error") or ""
 
 				user_request = state.get("user_request", "")
@@ -527,36 +641,36 @@ async def reviewer_node(state: AgentState, embedding_function=None) -> dict[str,
 						"The test passed after a fix. Summarize the TECHNICAL LESSON in ONE sentence. "
 						"Focus on selectors/locators, waits/timeouts, modals/overlays, auth, redirects. "
 						"Return only the sentence, no quotes, no markdown.\n\n"
-						f"Original error:\n{_truncate(error_log, 1500)}\n\n"
-						f"Old code (truncated):\n{_truncate(old_code, 4000)}\n\n"
-						f"New code (truncated):\n{_truncate(new_code, 4000)}\n"
+						f"Original error:\n{_truncate(error_log, 400)}\n\n"
+						f"Old code (truncated):\n{_truncate(old_code, 1200)}\n\n"
+						f"New code (truncated):\n{_truncate(new_code, 1200)}\n"
 					)
 					lesson_resp = await lesson_llm.ainvoke(lesson_prompt)
 					fix_summary = str(getattr(lesson_resp, "content", "") or "").strip()
 
 				if fix_summary:
-					memory_service.learn_lesson(url=url, original_error=error_log, fix_summary=fix_summary)
+					await memory_service.alearn_lesson(url=url, original_error=error_log, fix_summary=fix_summary)
 					logger.info("🧠 [Reviewer] Stored lesson to long-term memory.")
 					logs.append("Reviewer: Stored lesson to long-term memory.")
 			except Exception as e:
 				logger.warning(f"⚠️ [Reviewer] Failed to store lesson (non-fatal): {e}")
 				logs.append(f"Reviewer: Failed to store lesson (non-fatal): {e}")
 
-		dedup_service.save(state['user_request'], code) # code is the (potentially fixed) generated code
+		await dedup_service.asave(state['user_request'], code) # code is the (potentially fixed) generated code
 		new_state["status"] = ProcessingStatus.COMPLETED
 		ai_message_content = (f"I have generated the following code:\n```python\n{code}\n```\n\n"
 		                      f"What would you like to do next?")
 		new_state["messages"] = state.get("messages", []) + [AIMessage(content=ai_message_content)]
 		logs.extend(["Reviewer: Code passed all checks (Static + Dry Run). Ready for dispatch.",
 								 "System: Saved to Knowledge Base."])
-		new_state["log_path"] = storage_service.save("\n".join(logs), run_id, "log")
+		new_state["log_path"] = await storage_service.asave("\n".join(logs), run_id, "log")
 		return {**state, **new_state} # Merge current state with new state
 	else:
 		logger.warning(f"❌ [Reviewer] Code is INVALID. Sending back to Coder. Error: {error_msg[:200]}...")
 		logs.append(f"Reviewer: Validation failed.\n{error_msg}")
 		new_state["status"] = ProcessingStatus.FIXING
 		new_state["validation_error"] = error_msg
-		new_state["log_path"] = storage_service.save("\n".join(logs), run_id, "log")
+		new_state["log_path"] = await storage_service.asave("\n".join(logs), run_id, "log")
 		return {**state, **new_state}
 
 
@@ -564,12 +678,21 @@ async def batch_node(state: AgentState) -> dict[str, Any]:
 	logger.info("🚀 [Batch] Starting parallel processing...")
 	run_id = state.get("run_id", "unknown_run")
 	scenarios = state["scenarios"]
-	results = await process_batch(scenarios)
+	plan_str = await storage_service.aload(state["test_plan_path"]) if state.get("test_plan_path") else ""
+	tech_context = await storage_service.aload(state["technical_context_path"]) if state.get("technical_context_path") else ""
+
+	results = await speculative_coder.take(run_id, plan_fingerprint(plan_str, tech_context, scenarios))
+	reused = results is not None
+	if not reused:
+		results = await process_batch(scenarios)
 	combined_code = "\n\n# ==========================================\n".join(results)
 	logger.info(f"✅ [Batch] Completed {len(results)} scenarios.")
 
-	code_path = storage_service.save(combined_code, run_id, "py")
-	log_path = storage_service.save(f"Batch: Successfully generated {len(results)} tests in parallel.", run_id, "log")
+	code_path = await storage_service.asave(combined_code, run_id, "py")
+	log_msg = f"Batch: Successfully generated {len(results)} tests in parallel."
+	if reused:
+		log_msg += " (reused speculative generation)"
+	log_path = await storage_service.asave(log_msg, run_id, "log")
 
 	return {
 		"generated_code_path": code_path,
@@ -590,7 +713,7 @@ async def final_output_node(state: AgentState) -> dict[str, Any]:
     if not final_message:
         generated_code = ""
         if state.get("generated_code_path"):
-            generated_code = storage_service.load(state["generated_code_path"])
+            generated_code = await storage_service.aload(state["generated_code_path"])
 
         if generated_code:
             final_message_content = (
@@ -601,7 +724,7 @@ async def final_output_node(state: AgentState) -> dict[str, Any]:
             final_message_content = "The process has completed. What would you like to do next?"
         final_message = [AIMessage(content=final_message_content)]
 
-    log_path = storage_service.save("System: All tasks complete. Final output dispatched.", run_id, "log")
+    log_path = await storage_service.asave("System: All tasks complete. Final output dispatched.", run_id, "log")
     return {
         "status": ProcessingStatus.COMPLETED,
         "generated_code_path": state.get("generated_code_path", ""),
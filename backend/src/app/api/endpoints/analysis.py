@@ -1,13 +1,11 @@
-import os
-import shutil
-import tempfile
 import zipfile
 from typing import Annotated  # Added import for Annotated
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
 
-from src.app.services.code_analysis.service import CodeAnalysisService
+from src.app.core.concurrency import run_blocking
+from src.app.services.code_analysis.service import ArchiveLimitError, CodeAnalysisService, progress_logger
 
 router = APIRouter()
 
@@ -20,12 +18,17 @@ class AnalysisResponse(BaseModel):
 class GitAnalysisRequest(BaseModel):
 	url: str
 	token: str | None = None
+	# Optional test request; the summary then lists the most relevant endpoints first.
+	query: str | None = None
 
 
 @router.post("/analyze-source", response_model=AnalysisResponse)
-async def analyze_source_code(file: Annotated[UploadFile, File(...)]):
+async def analyze_source_code(
+		file: Annotated[UploadFile, File(...)],
+		query: Annotated[str | None, Form()] = None,
+):
 	"""
-	Accepts a ZIP file with source code (Python/Java/JS/TS).
+	Accepts a ZIP file with source code (Python/Java/Kotlin/JS/TS/Go).
 	Returns a textual summary of API endpoints found.
 	"""
 	if not file.filename.endswith(".zip"):
@@ -33,24 +36,20 @@ async def analyze_source_code(file: Annotated[UploadFile, File(...)]):
 
 	service = CodeAnalysisService()
 
-	with tempfile.TemporaryDirectory() as temp_dir:
-		zip_path = os.path.join(temp_dir, "source.zip")
-		with open(zip_path, "wb") as buffer:
-			shutil.copyfileobj(file.file, buffer)
-
-		try:
-			with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-				zip_ref.extractall(temp_dir)
-		except zipfile.BadZipFile:
-			raise HTTPException(status_code=400, detail="Invalid zip file") from None
-
-		endpoints = service.analyze_project(temp_dir)
-		summary = service.format_for_llm(endpoints)
+	# The spooled upload is read in place: source members are streamed to the parsers
+	# straight from the archive, nothing is extracted to disk.
+	try:
+		endpoints = await run_blocking(service.analyze_zip, file.file, progress_logger(f"Analyzing {file.filename}"))
+	except zipfile.BadZipFile:
+		raise HTTPException(status_code=400, detail="Invalid zip file") from None
+	except ArchiveLimitError as e:
+		raise HTTPException(status_code=413, detail=str(e)) from None
+	summary = await run_blocking(service.format_for_llm, endpoints, query=query)
 
-		return AnalysisResponse(
-			summary=summary,
-			endpoint_count=len(endpoints)
-		)
+	return AnalysisResponse(
+		summary=summary,
+		endpoint_count=len(endpoints)
+	)
 
 
 @router.post("/analyze-git", response_model=AnalysisResponse)
@@ -60,8 +59,8 @@ async def analyze_git_repo(request: GitAnalysisRequest):
 	"""
 	service = CodeAnalysisService()
 	try:
-		endpoints = service.clone_and_analyze(request.url, request.token)
-		summary = service.format_for_llm(endpoints)
+		endpoints = await run_blocking(service.clone_and_analyze, request.url, request.token)
+		summary = await run_blocking(service.format_for_llm, endpoints, query=request.query)
 
 		return AnalysisResponse(
 			summary=summary,
@@ -9,6 +9,7 @@ from src.app.core.config import get_settings
 from src.app.core.database import AsyncSessionLocal
 from src.app.domain.enums import ProcessingStatus
 from src.app.services.history import HistoryService
+from src.app.services.speculation import speculative_coder
 from src.app.services.streaming_service import StreamingService, _state_next_contains, _maybe_await
 
 
@@ -69,6 +70,7 @@ async def approve_step(
 			raise HTTPException(status_code=404, detail="Run not found")
 
 		if not body.approved:
+			speculative_coder.discard(body.run_id)
 			await history_service.update_run(run_id=body.run_id, status=ProcessingStatus.FAILED)
 			return JSONResponse(content={"status": "rejected"}, status_code=200)
 
@@ -112,11 +112,11 @@ async def get_debug_context(
 
 	execution_logs = ""
 	if run.execution_logs_path:
-		execution_logs = storage_service.load(run.execution_logs_path)
+		execution_logs = await storage_service.aload(run.execution_logs_path)
 
 	# Разрешаем запрос контекста, даже если статус не FAILURE (для дебага)
 	inspector = TraceInspector()
-	context = inspector.get_failure_context(run.id, execution_logs)
+	context = await inspector.aget_failure_context(run.id, execution_logs)
 
 	if not context:
 		return DebugContextResponse(
@@ -48,15 +48,15 @@ async def get_history(
 	for run in runs:
 		generated_code_content = None
 		if run.generated_code_path:
-			generated_code_content = storage_service.load(run.generated_code_path)
+			generated_code_content = await storage_service.aload(run.generated_code_path)
 		
 		test_plan_content = None
 		if run.test_plan_path:
-			test_plan_content = storage_service.load(run.test_plan_path)
+			test_plan_content = await storage_service.aload(run.test_plan_path)
 
 		execution_logs_content = None
 		if run.execution_logs_path:
-			execution_logs_content = storage_service.load(run.execution_logs_path)
+			execution_logs_content = await storage_service.aload(run.execution_logs_path)
 
 		response_runs.append(TestRunSchema(
 			id=run.id,
@@ -96,15 +96,15 @@ async def get_run(
 	
 	generated_code_content = None
 	if run.generated_code_path:
-		generated_code_content = storage_service.load(run.generated_code_path)
+		generated_code_content = await storage_service.aload(run.generated_code_path)
 	
 	test_plan_content = None
 	if run.test_plan_path:
-		test_plan_content = storage_service.load(run.test_plan_path)
+		test_plan_content = await storage_service.aload(run.test_plan_path)
 
 	execution_logs_content = None
 	if run.execution_logs_path:
-		execution_logs_content = storage_service.load(run.execution_logs_path)
+		execution_logs_content = await storage_service.aload(run.execution_logs_path)
 
 	# Fallback: if DB snapshot doesn't have plan/code, take them from LangGraph checkpoint.
 	if not test_plan_content and run_details.get("checkpoint_test_plan"):
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Header, Query, Response
+
+from src.app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _load_issues() -> tuple[list[dict[str, Any]], str]:
+	"""Serves `DEFECTS_PATH` as tracker issues; the file's mtime doubles as their `updated_at`."""
+	path = get_settings().DEFECTS_PATH
+	try:
+		stat = os.stat(path)
+		defects = json.loads(path.read_text(encoding="utf-8"))
+	except (OSError, json.JSONDecodeError) as e:
+		logger.warning(f"Mock tracker: cannot read {path}: {e}")
+		return [], '"empty"'
+
+	updated_at = datetime.utcfromtimestamp(stat.st_mtime).isoformat()
+	issues = [
+		{
+			"id": defect.get("id") or f"MOCK-{n}",
+			"component": defect.get("component"),
+			"summary": defect.get("description"),
+			"priority": defect.get("severity"),
+			"updated_at": defect.get("updated_at") or updated_at,
+		}
+		for n, defect in enumerate(defects, start=1)
+	]
+	issues.sort(key=lambda issue: (issue["updated_at"], str(issue["id"])))
+	etag = '"' + hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest() + '"'
+	return issues, etag
+
+
+@router.get("/issues")
+async def list_issues(
+		response: Response,
+		updated_since: str | None = None,
+		limit: int = Query(100, ge=1, le=1000),
+		if_none_match: str | None = Header(None),
+):
+	"""
+	Local stand-in for an issue tracker: issues ordered by `(updated_at, id)`,
+	paged by an opaque `updated_since` cursor, versioned by an ETag.
+	"""
+	issues, etag = _load_issues()
+	if if_none_match == etag:
+		return Response(status_code=304, headers={"ETag": etag})
+
+	if updated_since:
+		issues = [i for i in issues if f"{i['updated_at']}|{i['id']}" > updated_since]
+	page = issues[:limit]
+	response.headers["ETag"] = etag
+	return {
+		"issues": page,
+		"next_cursor": f"{page[-1]['updated_at']}|{page[-1]['id']}" if page else updated_since,
+		"has_more": len(issues) > limit,
+	}
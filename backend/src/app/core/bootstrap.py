@@ -7,9 +7,12 @@ from psycopg_pool import AsyncConnectionPool
 from sqlalchemy import text
 
 from src.app.agents.graph import compile_graph
+from src.app.core.concurrency import LoopBlockingDetector, run_blocking, shutdown_blocking_executor
 from src.app.core.config import get_settings
 from src.app.core.database import AsyncSessionLocal, init_db
+from src.app.services.code_analysis.scanner import shutdown_parser_pool
 from src.app.services.llm_factory import CloudRuLLMService
+from src.app.services.vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +26,7 @@ async def preload_models(app):
         embedding_fn = embedding_functions.DefaultEmbeddingFunction()
         # By calling the function on a sample text, we force the model to be
         # downloaded and cached at this moment.
-        embedding_fn(["Pre-load test"])
+        await run_blocking(embedding_fn, ["Pre-load test"])
         app.state.embedding_function = embedding_fn
         logger.info("✅ Embedding model is ready.")
     except Exception as e:
@@ -50,6 +53,10 @@ async def bootstrap_application(app):
     """
     settings = get_settings()
 
+    if settings.LOOP_BLOCK_DETECTOR_ENABLED:
+        app.state.loop_detector = LoopBlockingDetector()
+        app.state.loop_detector.start()
+
     # Run model preloading first
     await preload_models(app)
 
@@ -80,8 +87,12 @@ async def bootstrap_application(app):
     connection_pool = AsyncConnectionPool(conninfo=DB_URI, max_size=20, open=False)
     await connection_pool.open()
 
+    # One Chroma client (and collection handles) for the whole app lifetime.
+    app.state.vector_store = VectorStore(getattr(app.state, "embedding_function", None))
+
     checkpointer = AsyncPostgresSaver(connection_pool)
-    app.state.agent_graph = compile_graph(checkpointer, app.state.embedding_function)
+    app.state.agent_graph = compile_graph(checkpointer, app.state.vector_store)
+    await run_blocking(app.state.vector_store.warmup)
     app.state.connection_pool = connection_pool
 
     logger.info("Agent Graph compiled and ready.")
@@ -94,3 +105,10 @@ async def shutdown_application(app):
 	if hasattr(app.state, "connection_pool"):
 		logger.info("Closing LangGraph Postgres Pool...")
 		await app.state.connection_pool.close()
+
+	if hasattr(app.state, "loop_detector"):
+		await app.state.loop_detector.stop()
+	if hasattr(app.state, "vector_store"):
+		app.state.vector_store.embedder.close()
+	shutdown_parser_pool()
+	shutdown_blocking_executor()
@@ -0,0 +1,108 @@
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from src.app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+	global _executor
+	if _executor is None:
+		with _executor_lock:
+			if _executor is None:
+				_executor = ThreadPoolExecutor(
+					max_workers=get_settings().BLOCKING_IO_WORKERS,
+					thread_name_prefix="blocking-io",
+				)
+	return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+	"""
+	Runs a blocking call (sync client, subprocess, file I/O) off the event loop.
+
+	Uses a dedicated bounded pool so blocking services cannot exhaust the default
+	executor used by the rest of the process (e.g. Docker calls in the executor service).
+	"""
+	loop = asyncio.get_running_loop()
+	return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_blocking_executor() -> None:
+	global _executor
+	with _executor_lock:
+		if _executor is not None:
+			_executor.shutdown(wait=False, cancel_futures=True)
+			_executor = None
+
+
+class LoopBlockingDetector:
+	"""
+	Watchdog that logs whenever the event loop is held longer than a threshold.
+
+	A heartbeat coroutine stamps the time on every loop iteration; a daemon thread
+	checks the stamp and, when it goes stale, logs the loop thread's current stack,
+	which points at the callback that is blocking every other request.
+	"""
+
+	def __init__(self, threshold_ms: int | None = None, interval_ms: int = 50):
+		settings = get_settings()
+		self.threshold = (threshold_ms or settings.LOOP_BLOCK_THRESHOLD_MS) / 1000
+		self.interval = interval_ms / 1000
+		self._last_beat = time.monotonic()
+		self._loop_thread_id: int | None = None
+		self._heartbeat: asyncio.Task | None = None
+		self._watchdog: threading.Thread | None = None
+		self._stopped = threading.Event()
+
+	def start(self) -> None:
+		"""Must be called from a coroutine running on the loop to watch."""
+		self._loop_thread_id = threading.get_ident()
+		self._last_beat = time.monotonic()
+		self._stopped.clear()
+		self._heartbeat = asyncio.get_running_loop().create_task(self._beat())
+		self._watchdog = threading.Thread(target=self._watch, name="loop-blocking-detector", daemon=True)
+		self._watchdog.start()
+		logger.info(f"Loop blocking detector started (threshold {self.threshold * 1000:.0f} ms).")
+
+	async def stop(self) -> None:
+		self._stopped.set()
+		if self._heartbeat is not None:
+			self._heartbeat.cancel()
+			try:
+				await self._heartbeat
+			except asyncio.CancelledError:
+				pass
+			self._heartbeat = None
+
+	async def _beat(self) -> None:
+		while True:
+			self._last_beat = time.monotonic()
+			await asyncio.sleep(self.interval)
+
+	def _watch(self) -> None:
+		reported_beat = None
+		while not self._stopped.wait(self.interval):
+			beat = self._last_beat
+			lag = time.monotonic() - beat - self.interval
+			if lag < self.threshold or beat == reported_beat:
+				continue
+			# Report each stall once, with the stack that is holding the loop.
+			reported_beat = beat
+			frame = sys._current_frames().get(self._loop_thread_id)
+			stack = "".join(traceback.format_stack(frame, limit=8)) if frame else "<unavailable>"
+			logger.warning(f"⏱️ Event loop blocked for {lag * 1000:.0f} ms. Loop thread stack:\n{stack}")
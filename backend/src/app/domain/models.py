@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
 
 from src.app.core.database import Base
 
@@ -34,3 +34,29 @@ class Notification(Base):
 	related_run_id = Column(Integer, ForeignKey("test_runs.id"), nullable=True)
 	is_read = Column(Boolean, default=False, nullable=False)
 	created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Defect(Base):
+	"""Historical defect ingested from an export or issue tracker (see `DefectIngestionService`)."""
+
+	__tablename__ = "defects"
+	__table_args__ = (UniqueConstraint("source", "external_id", name="uq_defects_source_external_id"),)
+
+	id = Column(Integer, primary_key=True, index=True)
+	source = Column(String, nullable=False)
+	external_id = Column(String, nullable=False)
+	component = Column(String, nullable=False, index=True)
+	description = Column(Text, nullable=False)
+	severity = Column(String, nullable=True)
+	source_updated_at = Column(String, nullable=True)
+	# Wall-clock time of the sync that last wrote the row; readers pull rows past their last seen value.
+	ingested_at = Column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+
+
+class DefectSyncState(Base):
+	__tablename__ = "defect_sync_state"
+
+	source = Column(String, primary_key=True)
+	cursor = Column(String, nullable=True)
+	etag = Column(String, nullable=True)
+	synced_at = Column(DateTime, default=datetime.utcnow)
@@ -10,12 +10,15 @@ from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 
-from src.app.api.endpoints import analysis, chat, execution, generation, history, notifications
+from src.app.agents.nodes import defect_service
+from src.app.api.endpoints import analysis, chat, execution, generation, history, mock_tracker, notifications
 from src.app.api.endpoints.export import gitlab
 from src.app.core.bootstrap import bootstrap_application, shutdown_application
 from src.app.core.config import get_settings
 from src.app.core.database import AsyncSessionLocal
+from src.app.services.defect_ingestion import DefectIngestionService
 from src.app.services.executor import TestExecutorService
+from src.app.services.memory import KnowledgeBaseService
 from src.app.services.scheduler import SchedulerService
 from src.app.services.tools.browser import BrowserManager
 
@@ -47,7 +50,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await bootstrap_application(app)
 
     # Start the scheduler and pass it the compiled agent graph
-    scheduler_service.start(app.state.agent_graph)
+    # Defect sync runs once right away, then every DEFECT_SYNC_INTERVAL_MINUTES
+    defect_ingestion = DefectIngestionService()
+    defect_sync = (defect_ingestion, defect_service) if (defect_ingestion.sources or settings.DEFECTS_SOURCE == "table") else None
+    scheduler_service.start(app.state.agent_graph, KnowledgeBaseService(app.state.vector_store), defect_sync)
 
     try:
         async with AsyncSessionLocal() as session:
@@ -139,6 +145,8 @@ app.include_router(execution.router, prefix="/api/v1/execution", tags=["Executio
 app.include_router(gitlab.router, prefix="/api/v1/export", tags=["Export"])
 app.include_router(analysis.router, prefix="/api/v1", tags=["Code Analysis"])
 app.include_router(notifications.router, prefix="/api/v1/notifications", tags=["Notifications"])
+if settings.ENVIRONMENT != "prod":
+	app.include_router(mock_tracker.router, prefix="/api/v1/mock-tracker", tags=["Mock Issue Tracker"])
 
 
 @app.get("/api/v1/health", tags=["System"])
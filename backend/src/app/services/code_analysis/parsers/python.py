@@ -1,7 +1,7 @@
 import ast
 import os
 
-from src.app.services.code_analysis.schemas import ParsedEndpoint, ParsedParameter
+from src.app.services.code_analysis.schemas import ModuleRoutes, ParsedEndpoint, ParsedParameter, RouterInclude
 
 
 class FastAPIParser:
@@ -13,33 +13,78 @@ class FastAPIParser:
 	HTTP_METHODS = {'get', 'post', 'put', 'delete', 'patch', 'options', 'head'}
 
 	def parse_file(self, file_path: str, content: str) -> list[ParsedEndpoint]:
-		endpoints = []
+		return self.parse_module(file_path, content)[0]
+
+	def parse_module(self, file_path: str, content: str) -> tuple[list[ParsedEndpoint], ModuleRoutes | None]:
+		"""
+		Endpoints of a module plus its routing facts (routers, include_router/mount calls,
+		imports). Paths are as declared in the file; `RouterGraph` applies prefixes
+		defined in other modules.
+		"""
 		try:
 			tree = ast.parse(content)
-
-			# We need to track router prefixes if defined at module level (not implemented deep recursion yet)
-			# Simple visitor for now
-			visitor = FastAPIVisitor(file_path)
-			visitor.visit(tree)
-			endpoints.extend(visitor.endpoints)
-
 		except SyntaxError:
-			pass  # Skip invalid python files
+			return [], None  # Skip invalid python files
 
-		return endpoints
+		visitor = FastAPIVisitor(file_path)
+		visitor.visit(tree)
+		return visitor.endpoints, visitor.routes
 
 
 class FastAPIVisitor(ast.NodeVisitor):
+	ROUTER_FACTORIES = {"APIRouter", "FastAPI"}
+
 	def __init__(self, filename: str):
 		self.filename = filename
 		self.endpoints: list[ParsedEndpoint] = []
-		self.router_prefix = ""
+		self.routes = ModuleRoutes()
 
 	def visit_FunctionDef(self, node: ast.FunctionDef):
 		self._visit_func(node)
+		# App factories (`def create_app(): app = FastAPI(); app.include_router(...)`)
+		self.generic_visit(node)
 
 	def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
 		self._visit_func(node)
+		self.generic_visit(node)
+
+	def visit_Import(self, node: ast.Import):
+		for alias in node.names:
+			self.routes.imports[alias.asname or alias.name] = (alias.name, None)
+
+	def visit_ImportFrom(self, node: ast.ImportFrom):
+		module = "." * node.level + (node.module or "")
+		for alias in node.names:
+			if alias.name != "*":
+				self.routes.imports[alias.asname or alias.name] = (module, alias.name)
+
+	def visit_Assign(self, node: ast.Assign):
+		call = node.value
+		if isinstance(call, ast.Call) and _dotted(call.func).rsplit(".", 1)[-1] in self.ROUTER_FACTORIES:
+			prefix = _keyword_str(call, "prefix") or ""
+			for target in node.targets:
+				if isinstance(target, ast.Name):
+					self.routes.routers[target.id] = prefix
+		self.generic_visit(node)
+
+	def visit_AnnAssign(self, node: ast.AnnAssign):
+		if node.value is not None:
+			self.visit_Assign(ast.Assign(targets=[node.target], value=node.value))
+
+	def visit_Call(self, node: ast.Call):
+		if isinstance(node.func, ast.Attribute):
+			parent = _dotted(node.func.value)
+			if node.func.attr == "include_router" and node.args:
+				child = _dotted(node.args[0])
+				if parent and child:
+					self.routes.includes.append(RouterInclude(parent=parent, child=child, prefix=_keyword_str(node, "prefix") or ""))
+			elif node.func.attr == "mount":
+				path = node.args[0] if node.args else next((k.value for k in node.keywords if k.arg == "path"), None)
+				app = node.args[1] if len(node.args) > 1 else next((k.value for k in node.keywords if k.arg == "app"), None)
+				child = _dotted(app) if app is not None else ""
+				if parent and child and isinstance(path, ast.Constant) and isinstance(path.value, str):
+					self.routes.includes.append(RouterInclude(parent=parent, child=child, prefix=path.value))
+		self.generic_visit(node)
 
 	def _visit_func(self, node):
 		# Check decorators for routing info
@@ -99,7 +144,8 @@ class FastAPIVisitor(ast.NodeVisitor):
 			description=docstring,
 			parameters=params,
 			source_file=self.filename,
-			line_number=node.lineno
+			line_number=node.lineno,
+			router=_dotted(decorator.func.value) or None,
 		))
 
 	def _get_annotation_str(self, node: ast.AST) -> str:
@@ -113,3 +159,20 @@ class FastAPIVisitor(ast.NodeVisitor):
 			slice_val = self._get_annotation_str(node.slice) if hasattr(node, "slice") else "Any"
 			return f"{value}[{slice_val}]"
 		return "Any"
+
+
+def _dotted(node: ast.AST) -> str:
+	"""`a.b.c` for Name/Attribute chains, "" for anything else (calls, subscripts...)."""
+	if isinstance(node, ast.Name):
+		return node.id
+	if isinstance(node, ast.Attribute):
+		base = _dotted(node.value)
+		return f"{base}.{node.attr}" if base else ""
+	return ""
+
+
+def _keyword_str(call: ast.Call, name: str) -> str | None:
+	for kw in call.keywords:
+		if kw.arg == name and isinstance(kw.value, ast.Constant) and isinstance(kw.value.value, str):
+			return kw.value.value
+	return None
@@ -0,0 +1,478 @@
+import importlib
+import logging
+import os
+import re
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.app.core.config import get_settings
+from src.app.services.code_analysis.schemas import ParsedEndpoint, ParsedParameter
+
+logger = logging.getLogger(__name__)
+
+QUERIES_DIR = Path(__file__).resolve().parent.parent / "queries"
+
+Match = dict[str, Any]  # capture name -> tree-sitter Node
+
+
+@dataclass(frozen=True)
+class _GrammarSpec:
+	name: str
+	module: str
+	factory: str
+	queries: tuple[str, ...]  # "<dir>/<framework>" under QUERIES_DIR
+
+
+_JS_QUERIES = ("javascript/nestjs", "javascript/express")
+_GRAMMARS: dict[str, _GrammarSpec] = {
+	".java": _GrammarSpec("java", "tree_sitter_java", "language", ("java/spring",)),
+	".kt": _GrammarSpec("kotlin", "tree_sitter_kotlin", "language", ("kotlin/spring",)),
+	".js": _GrammarSpec("javascript", "tree_sitter_javascript", "language", _JS_QUERIES),
+	".jsx": _GrammarSpec("javascript", "tree_sitter_javascript", "language", _JS_QUERIES),
+	".ts": _GrammarSpec("typescript", "tree_sitter_typescript", "language_typescript", _JS_QUERIES),
+	".tsx": _GrammarSpec("tsx", "tree_sitter_typescript", "language_tsx", _JS_QUERIES),
+	".go": _GrammarSpec("go", "tree_sitter_go", "language", ("go/http",)),
+	".py": _GrammarSpec("python", "tree_sitter_python", "language", ("python/flask",)),
+}
+
+_STRING_NODES = {"string", "string_literal", "interpreted_string_literal", "raw_string_literal", "template_string"}
+_STRING_CONTENT_NODES = {"string_fragment", "string_content", "interpreted_string_literal_content"}
+_CLASS_NODES = {"class_declaration", "class", "abstract_class_declaration"}
+
+_SPRING_VERBS = {
+	"GetMapping": "get", "PostMapping": "post", "PutMapping": "put",
+	"DeleteMapping": "delete", "PatchMapping": "patch", "RequestMapping": "any",
+}
+_SPRING_PARAM_SOURCES = {"PathVariable": "path", "RequestBody": "body", "RequestHeader": "header", "RequestParam": "query"}
+_NEST_PARAM_SOURCES = {"Param": "path", "Body": "body", "Query": "query", "Headers": "header"}
+_EXPRESS_OBJECTS = re.compile(r"^(app|api|server|router|routes?|\w*(Router|App|Routes))$")
+_GO_VERBS = {"HandleFunc": "any", "Handle": "any", "Any": "any"}
+_FLASK_CONVERTER = re.compile(r"<(?:(\w+):)?(\w+)>")
+
+
+def _text(node) -> str:
+	return node.text.decode("utf-8", errors="ignore") if node is not None else ""
+
+
+def _line(node) -> int:
+	return node.start_point[0] + 1
+
+
+def _key(node) -> tuple[int, int]:
+	return node.start_byte, node.end_byte
+
+
+def _string_value(node) -> str:
+	"""Unquoted content of a string literal node (the first fragment-bearing string below `node`)."""
+	if node.type not in _STRING_NODES:
+		for child in node.named_children:
+			value = _first_string(child)
+			if value is not None:
+				return value
+		return ""
+	return "".join(_text(c) for c in node.named_children if c.type in _STRING_CONTENT_NODES)
+
+
+def _first_string(node) -> str | None:
+	if node.type in _STRING_NODES:
+		return _string_value(node)
+	for child in node.named_children:
+		value = _first_string(child)
+		if value is not None:
+			return value
+	return None
+
+
+def _join(*parts: str) -> str:
+	segments = [p.strip("/") for p in parts if p and p.strip("/")]
+	return "/" + "/".join(segments)
+
+
+def _ancestor(node, types: set[str]):
+	node = node.parent
+	while node is not None and node.type not in types:
+		node = node.parent
+	return node
+
+
+def _annotation_name(node) -> str:
+	"""Name of a Java/Kotlin annotation node (`@Foo`, `@Foo(...)`, `@a.b.Foo`)."""
+	name = node.child_by_field_name("name")
+	if name is not None:
+		return _text(name).rsplit(".", 1)[-1]
+	stack = [node]
+	while stack:
+		current = stack.pop(0)
+		if current.type == "user_type":
+			return _text(current).rsplit(".", 1)[-1]
+		stack.extend(current.named_children)
+	return ""
+
+
+def _annotation_arguments(args) -> list[tuple[str | None, Any]]:
+	"""`(name or None, value node)` pairs of Java `annotation_argument_list` / Kotlin `value_arguments`."""
+	pairs: list[tuple[str | None, Any]] = []
+	if args is None:
+		return pairs
+	for child in args.named_children:
+		if child.type == "element_value_pair":
+			pairs.append((_text(child.child_by_field_name("key")), child.child_by_field_name("value")))
+		elif child.type == "value_argument":
+			named = child.named_children
+			if len(named) >= 2 and any(c.type == "=" for c in child.children):
+				pairs.append((_text(named[0]), named[-1]))
+			elif named:
+				pairs.append((None, named[-1]))
+		else:
+			pairs.append((None, child))
+	return pairs
+
+
+def _mapping_path(args) -> str:
+	for name, value in _annotation_arguments(args):
+		if name in (None, "value", "path") and value is not None:
+			path = _first_string(value)
+			if path is not None:
+				return path
+	return ""
+
+
+def _mapping_method(args) -> str | None:
+	for name, value in _annotation_arguments(args):
+		if name == "method" and value is not None:
+			# RequestMethod.POST, {RequestMethod.POST}, [RequestMethod.POST]
+			return re.split(r"\W+", _text(value).strip("{}[] "))[-1].lower() or None
+	return None
+
+
+def _spring_params(params) -> list[ParsedParameter]:
+	result = []
+	pending: list[str] = []  # Kotlin puts parameter annotations in a preceding sibling
+	for child in params.named_children:
+		if child.type == "parameter_modifiers":
+			pending = [_annotation_name(a) for a in child.named_children if a.type == "annotation"]
+			continue
+		if child.type in ("formal_parameter", "spread_parameter"):
+			modifiers = next((c for c in child.named_children if c.type == "modifiers"), None)
+			annotations = [_annotation_name(a) for a in modifiers.named_children] if modifiers else []
+			name, type_hint = _text(child.child_by_field_name("name")), _text(child.child_by_field_name("type"))
+		elif child.type == "parameter":
+			annotations, pending = pending, []
+			named = child.named_children
+			name, type_hint = _text(named[0]), (_text(named[1]) if len(named) > 1 else None)
+		else:
+			continue
+		source = next((_SPRING_PARAM_SOURCES[a] for a in annotations if a in _SPRING_PARAM_SOURCES), "query")
+		result.append(ParsedParameter(name=name, type_hint=type_hint or None, source=source))
+	return result
+
+
+def _spring_return_type(method) -> str | None:
+	declared = method.child_by_field_name("type")
+	if declared is not None:
+		return _text(declared)
+	# Kotlin: the return type follows the parameter list
+	seen_params = False
+	for child in method.named_children:
+		if child.type == "function_value_parameters":
+			seen_params = True
+		elif seen_params and child.type in ("user_type", "nullable_type", "function_type"):
+			return _text(child)
+	return None
+
+
+def _extract_spring(matches: list[Match], file_path: str) -> list[ParsedEndpoint]:
+	prefixes = {_key(m["prefix.scope"]): _mapping_path(m.get("prefix.args")) for m in matches if "prefix.scope" in m}
+	endpoints = []
+	for m in matches:
+		if "route" not in m:
+			continue
+		annotation = _text(m["route.annotation"])
+		args = m.get("route.args")
+		method = _SPRING_VERBS.get(annotation, "get")
+		if annotation == "RequestMapping":
+			method = _mapping_method(args) or "any"
+		owner = _ancestor(m["route"], {"class_declaration"})
+		prefix = prefixes.get(_key(owner), "") if owner is not None else ""
+		class_name = _text(owner.child_by_field_name("name")) if owner is not None else "?"
+		endpoints.append(ParsedEndpoint(
+			path=_join(prefix, _mapping_path(args)),
+			method=method,
+			function_name=_text(m["route.handler"]),
+			description=f"Spring Boot Endpoint (in {class_name})",
+			parameters=_spring_params(m["route.params"]),
+			return_type=_spring_return_type(m["route"]),
+			source_file=file_path,
+			line_number=_line(m["route.handler"]),
+		))
+	return endpoints
+
+
+def _decorated_method(decorator):
+	"""The method a NestJS decorator applies to (JS: its parent, TS: the next method in the class body)."""
+	if decorator.parent is not None and decorator.parent.type == "method_definition":
+		return decorator.parent
+	sibling = decorator.next_named_sibling
+	while sibling is not None and sibling.type == "decorator":
+		sibling = sibling.next_named_sibling
+	return sibling if sibling is not None and sibling.type == "method_definition" else None
+
+
+def _nest_params(method) -> list[ParsedParameter]:
+	params = method.child_by_field_name("parameters")
+	result = []
+	for param in params.named_children if params is not None else []:
+		pattern = param.child_by_field_name("pattern") or param
+		decorators = [
+			_text(d.named_children[0].child_by_field_name("function"))
+			for d in param.named_children
+			if d.type == "decorator" and d.named_children and d.named_children[0].type == "call_expression"
+		]
+		source = next((_NEST_PARAM_SOURCES[d] for d in decorators if d in _NEST_PARAM_SOURCES), "query")
+		type_hint = _text(param.child_by_field_name("type")).lstrip(": ") or None
+		result.append(ParsedParameter(name=_text(pattern), type_hint=type_hint, source=source))
+	return result
+
+
+def _extract_nestjs(matches: list[Match], file_path: str) -> list[ParsedEndpoint]:
+	prefixes = {}
+	for m in matches:
+		if "prefix.scope" in m:
+			parent = m["prefix.scope"].parent
+			owner = parent if parent is not None and parent.type in _CLASS_NODES else (
+				parent.child_by_field_name("declaration") if parent is not None else None)
+			if owner is not None:
+				prefixes[_key(owner)] = _first_string(m["prefix.args"]) or ""
+
+	endpoints = []
+	for m in matches:
+		if "route" not in m:
+			continue
+		method_node = _decorated_method(m["route"])
+		if method_node is None:
+			continue
+		owner = _ancestor(method_node, _CLASS_NODES)
+		prefix = prefixes.get(_key(owner), "") if owner is not None else ""
+		verb = _text(m["route.annotation"]).lower()
+		return_type = _text(method_node.child_by_field_name("return_type")).lstrip(": ") or None
+		endpoints.append(ParsedEndpoint(
+			path=_join(prefix, _first_string(m["route.args"]) or ""),
+			method="any" if verb == "all" else verb,
+			function_name=_text(method_node.child_by_field_name("name")),
+			description="NestJS Endpoint",
+			parameters=_nest_params(method_node),
+			return_type=return_type,
+			source_file=file_path,
+			line_number=_line(method_node),
+		))
+	return endpoints
+
+
+def _extract_express(matches: list[Match], file_path: str) -> list[ParsedEndpoint]:
+	endpoints = []
+	for m in matches:
+		path = _text(m["route.path"])
+		if not _EXPRESS_OBJECTS.match(_text(m["route.object"])) or not path.startswith(("/", "*")):
+			continue
+		handler = m["route.args"].named_children[-1]
+		verb = _text(m["route.annotation"])
+		endpoints.append(ParsedEndpoint(
+			path=path,
+			method="any" if verb == "all" else verb,
+			function_name=_text(handler) if handler.type in ("identifier", "member_expression") else "anonymous",
+			description="Express.js Route",
+			source_file=file_path,
+			line_number=_line(m["route"]),
+		))
+	return endpoints
+
+
+def _group_prefixes(matches: list[Match]) -> dict[str, tuple[str | None, str]]:
+	return {
+		_text(m["group.name"]): (_text(m["group.parent"]) if "group.parent" in m else None, _string_value(m["group.path"]))
+		for m in matches if "group.name" in m
+	}
+
+
+def _resolve_prefix(groups: dict[str, tuple[str | None, str]], name: str) -> str:
+	parts: list[str] = []
+	while name in groups and len(parts) < 16:
+		parent, path = groups[name]
+		parts.insert(0, path)
+		name = parent or ""
+	return _join(*parts) if parts else ""
+
+
+def _extract_go(matches: list[Match], file_path: str) -> list[ParsedEndpoint]:
+	groups = _group_prefixes(matches)
+	endpoints = []
+	for m in matches:
+		if "route" not in m:
+			continue
+		verb = _text(m["route.annotation"])
+		path = _string_value(m["route.path"])
+		methods = [_GO_VERBS.get(verb, verb.lower())]
+		if verb in ("HandleFunc", "Handle"):
+			pattern_method, _, pattern_path = path.partition(" ")
+			if pattern_path.startswith("/"):  # Go 1.22 ServeMux pattern: "GET /items/{id}"
+				methods, path = [pattern_method.lower()], pattern_path
+			else:
+				methods = _gorilla_methods(m["route"]) or methods
+		if not path.startswith("/"):
+			continue
+		args = m["route.args"].named_children
+		handler = args[1] if len(args) > 1 else None
+		for method in methods:
+			endpoints.append(ParsedEndpoint(
+				path=_join(_resolve_prefix(groups, _text(m["route.object"])), path),
+				method=method,
+				function_name=_text(handler) if handler is not None and handler.type in ("identifier", "selector_expression") else "anonymous",
+				description="Go HTTP Route",
+				source_file=file_path,
+				line_number=_line(m["route"]),
+			))
+	return endpoints
+
+
+def _gorilla_methods(call) -> list[str]:
+	"""Methods of a chained gorilla/mux registration: r.HandleFunc("/x", h).Methods("GET", "POST")."""
+	selector = call.parent
+	if selector is None or selector.type != "selector_expression":
+		return []
+	if _text(selector.child_by_field_name("field")) != "Methods" or selector.parent is None:
+		return []
+	args = selector.parent.child_by_field_name("arguments")
+	return [_string_value(a).lower() for a in args.named_children if a.type in _STRING_NODES] if args else []
+
+
+def _python_docstring(function) -> str | None:
+	body = function.child_by_field_name("body")
+	first = body.named_children[0] if body is not None and body.named_children else None
+	if first is not None and first.type == "expression_statement" and first.named_children[0].type == "string":
+		return _string_value(first.named_children[0]).strip() or None
+	return None
+
+
+def _extract_flask(matches: list[Match], file_path: str) -> list[ParsedEndpoint]:
+	groups = _group_prefixes(matches)
+	endpoints = []
+	for m in matches:
+		if "route" not in m:
+			continue
+		path = _string_value(m["route.path"])
+		methods = ["get"]
+		for arg in m["route.args"].named_children:
+			if arg.type == "keyword_argument" and _text(arg.child_by_field_name("name")) == "methods":
+				methods = [_string_value(s).lower() for s in arg.child_by_field_name("value").named_children] or methods
+		params = [
+			ParsedParameter(name=name, type_hint=converter or "string", source="path")
+			for converter, name in _FLASK_CONVERTER.findall(path)
+		]
+		function = m["route"].child_by_field_name("definition")
+		for method in methods:
+			endpoints.append(ParsedEndpoint(
+				path=_join(_resolve_prefix(groups, _text(m["route.object"])), _FLASK_CONVERTER.sub(r"{\2}", path)),
+				method=method,
+				function_name=_text(m["route.handler"]),
+				description=_python_docstring(function) or "Flask Route",
+				parameters=params,
+				source_file=file_path,
+				line_number=_line(m["route.handler"]),
+			))
+	return endpoints
+
+
+_EXTRACTORS: dict[str, Callable[[list[Match], str], list[ParsedEndpoint]]] = {
+	"spring": _extract_spring,
+	"nestjs": _extract_nestjs,
+	"express": _extract_express,
+	"http": _extract_go,
+	"flask": _extract_flask,
+}
+
+
+class TreeSitterEngine:
+	"""
+	Endpoint extraction on tree-sitter syntax trees for Java, Kotlin, JS/TS, Go and Python.
+
+	Each framework is a query file under `code_analysis/queries/<language>/`; its captures
+	(`@route.*`, `@prefix.*`, `@group.*`) are turned into `ParsedEndpoint`s with real line
+	numbers. Grammars are optional dependencies (`tree-sitter` plus `tree-sitter-java`,
+	`-kotlin`, `-javascript`, `-typescript`, `-go`, `-python`): `supports()` is False for a
+	file whose grammar isn't installed, and callers fall back to the regex/javalang parsers.
+	"""
+
+	def __init__(self):
+		self.enabled = get_settings().CODE_ANALYSIS_TREE_SITTER_ENABLED
+		self._grammars: dict[str, tuple[Any, list[tuple[str, Any]]] | None] = {}
+		self._lock = threading.Lock()
+		self._local = threading.local()  # parsers are not thread-safe
+
+	def supports(self, file_path: str) -> bool:
+		return self.enabled and self._grammar(os.path.splitext(file_path)[1]) is not None
+
+	def _grammar(self, extension: str) -> tuple[Any, list[tuple[str, Any]]] | None:
+		if extension not in self._grammars:
+			with self._lock:
+				if extension not in self._grammars:
+					self._grammars[extension] = self._load(extension)
+		return self._grammars[extension]
+
+	@staticmethod
+	def _load(extension: str) -> tuple[Any, list[tuple[str, Any]]] | None:
+		spec = _GRAMMARS.get(extension)
+		if spec is None:
+			return None
+		try:
+			import tree_sitter
+
+			language = tree_sitter.Language(getattr(importlib.import_module(spec.module), spec.factory)())
+			queries = [
+				(name.rsplit("/", 1)[-1], tree_sitter.Query(language, (QUERIES_DIR / f"{name}.scm").read_text(encoding="utf-8")))
+				for name in spec.queries
+			]
+		except Exception as e:
+			logger.info(f"Tree-sitter grammar for {extension} unavailable ({e}); using fallback parsers.")
+			return None
+		return language, queries
+
+	def _parser(self, language):
+		import tree_sitter
+
+		parsers = self._local.__dict__.setdefault("parsers", {})
+		parser = parsers.get(id(language))
+		if parser is None:
+			parser = parsers[id(language)] = tree_sitter.Parser(language)
+		return parser
+
+	@staticmethod
+	def _matches(query, root) -> list[Match]:
+		import tree_sitter
+
+		# tree-sitter >= 0.25 runs queries through a QueryCursor; older bindings on the query itself.
+		runner = tree_sitter.QueryCursor(query) if hasattr(tree_sitter, "QueryCursor") else query
+		matches = []
+		for _pattern, captures in runner.matches(root):
+			matches.append({
+				name: nodes[0] if isinstance(nodes, list) else nodes
+				for name, nodes in captures.items() if nodes and not name.startswith("_")
+			})
+		return matches
+
+	def parse_file(self, file_path: str, content: str) -> list[ParsedEndpoint]:
+		grammar = self._grammar(os.path.splitext(file_path)[1])
+		if grammar is None:
+			raise ValueError(f"No tree-sitter grammar for {file_path}")
+		language, queries = grammar
+		tree = self._parser(language).parse(content.encode("utf-8"))
+		endpoints = []
+		for framework, query in queries:
+			endpoints.extend(_EXTRACTORS[framework](self._matches(query, tree.root_node), file_path))
+		endpoints.sort(key=lambda ep: ep.line_number)
+		return endpoints
+
+
+tree_sitter_engine = TreeSitterEngine()
@@ -0,0 +1,23 @@
+; Go HTTP routers: gin/echo (r.GET), chi/fiber (r.Get), net/http and gorilla/mux (HandleFunc).
+
+; Route groups: v1 := r.Group("/v1")
+(short_var_declaration
+  left: (expression_list . (identifier) @group.name)
+  right: (expression_list
+    .
+    (call_expression
+      function: (selector_expression
+        operand: (identifier) @group.parent
+        field: (field_identifier) @_group)
+      arguments: (argument_list . (interpreted_string_literal) @group.path)))
+  (#eq? @_group "Group"))
+
+; Handler registrations.
+(call_expression
+  function: (selector_expression
+    operand: (identifier) @route.object
+    field: (field_identifier) @route.annotation)
+  arguments: (argument_list
+    .
+    (interpreted_string_literal) @route.path) @route.args
+  (#match? @route.annotation "^(GET|POST|PUT|DELETE|PATCH|OPTIONS|HEAD|Any|Get|Post|Put|Delete|Patch|Options|Head|HandleFunc|Handle)$")) @route
@@ -0,0 +1,23 @@
+; Spring MVC / Spring Boot controllers (Java).
+
+; Class-level base path: @RequestMapping("/api/users") on the controller.
+(class_declaration
+  (modifiers
+    (annotation
+      name: (identifier) @_prefix
+      arguments: (annotation_argument_list) @prefix.args)
+    (#eq? @_prefix "RequestMapping"))) @prefix.scope
+
+; Handler methods: @GetMapping("/{id}"), @RequestMapping(path = "/x", method = RequestMethod.POST), bare @DeleteMapping.
+(method_declaration
+  (modifiers
+    [
+      (annotation
+        name: (identifier) @route.annotation
+        arguments: (annotation_argument_list) @route.args)
+      (marker_annotation
+        name: (identifier) @route.annotation)
+    ]
+    (#match? @route.annotation "^(Get|Post|Put|Delete|Patch|Request)Mapping$"))
+  name: (identifier) @route.handler
+  parameters: (formal_parameters) @route.params) @route
@@ -0,0 +1,10 @@
+; Express / Koa-router / Fastify style registrations: app.get('/path', handler).
+
+(call_expression
+  function: (member_expression
+    object: (identifier) @route.object
+    property: (property_identifier) @route.annotation)
+  arguments: (arguments
+    .
+    (string (string_fragment) @route.path)) @route.args
+  (#match? @route.annotation "^(get|post|put|delete|patch|options|head|all)$")) @route
@@ -0,0 +1,17 @@
+; NestJS controllers (JavaScript/TypeScript). In TypeScript method decorators are
+; siblings of the method in the class body, in JavaScript they are its children;
+; the engine resolves the decorated method and the enclosing controller.
+
+; Controller prefix: @Controller('cats')
+(decorator
+  (call_expression
+    function: (identifier) @_prefix
+    arguments: (arguments) @prefix.args)
+  (#eq? @_prefix "Controller")) @prefix.scope
+
+; Route decorators: @Get(':id'), @Post()
+(decorator
+  (call_expression
+    function: (identifier) @route.annotation
+    arguments: (arguments) @route.args)
+  (#match? @route.annotation "^(Get|Post|Put|Delete|Patch|Options|Head|All)$")) @route
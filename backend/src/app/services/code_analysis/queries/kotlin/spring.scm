@@ -0,0 +1,24 @@
+; Spring MVC / Spring Boot controllers (Kotlin).
+
+; Class-level base path: @RequestMapping("/api/items") on the controller.
+(class_declaration
+  (modifiers
+    (annotation
+      (constructor_invocation
+        (user_type (identifier) @_prefix)
+        (value_arguments) @prefix.args))
+    (#eq? @_prefix "RequestMapping"))) @prefix.scope
+
+; Handler functions: @GetMapping("/{id}"), @RequestMapping(path = ["/x"], method = [RequestMethod.POST]), bare @PostMapping.
+(function_declaration
+  (modifiers
+    (annotation
+      [
+        (constructor_invocation
+          (user_type (identifier) @route.annotation)
+          (value_arguments) @route.args)
+        (user_type (identifier) @route.annotation)
+      ])
+    (#match? @route.annotation "^(Get|Post|Put|Delete|Patch|Request)Mapping$"))
+  name: (identifier) @route.handler
+  (function_value_parameters) @route.params) @route
@@ -0,0 +1,26 @@
+; Flask views: @app.route("/path", methods=[...]) and Blueprint url_prefix.
+; FastAPI-style @router.get(...) decorators are handled by FastAPIParser.
+
+; Blueprint prefixes: bp = Blueprint("users", __name__, url_prefix="/users")
+(assignment
+  left: (identifier) @group.name
+  right: (call
+    function: (identifier) @_blueprint
+    arguments: (argument_list
+      (keyword_argument
+        name: (identifier) @_kw
+        value: (string) @group.path)))
+  (#eq? @_blueprint "Blueprint")
+  (#eq? @_kw "url_prefix"))
+
+(decorated_definition
+  (decorator
+    (call
+      function: (attribute
+        object: (identifier) @route.object
+        attribute: (identifier) @route.annotation)
+      arguments: (argument_list . (string) @route.path) @route.args))
+  definition: (function_definition
+    name: (identifier) @route.handler
+    parameters: (parameters) @route.params)
+  (#eq? @route.annotation "route")) @route
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from src.app.core.config import get_settings
+from src.app.services.code_analysis.routing import resolve_endpoints
+from src.app.services.code_analysis.scanner import is_relevant_path
+from src.app.services.code_analysis.schemas import ParsedEndpoint, ParsedFile
+
+logger = logging.getLogger(__name__)
+
+AnalyzeFiles = Callable[..., dict[str, ParsedFile]]
+
+
+class RepositoryIndex:
+	"""
+	Persistent endpoint index per Git repository, versioned by commit SHA.
+
+	Each repository lives under `CODE_ANALYSIS_REPO_CACHE_DIR/<sha256(url)>/`: a shallow
+	`checkout/` plus one `<commit>/` directory per analyzed commit holding the per-file
+	parse results with their routing facts (`files.json`) and the endpoints with router
+	prefixes resolved (`endpoints.json`). When the remote HEAD is already indexed the stored
+	endpoints are returned without fetching; otherwise only the new commit is fetched and
+	files changed since the last indexed commit are re-parsed.
+
+	Tokens are only ever passed on the command line, never stored in the checkout's config.
+	"""
+
+	KEPT_COMMITS = 3
+	INDEX_VERSION = 2
+
+	def __init__(self, cache_dir: Path | None = None):
+		settings = get_settings()
+		self.cache_dir = cache_dir or settings.CODE_ANALYSIS_REPO_CACHE_DIR
+		self.timeout = settings.CODE_ANALYSIS_GIT_TIMEOUT_SECONDS
+		self._locks: dict[str, threading.Lock] = {}
+		self._locks_guard = threading.Lock()
+
+	def analyze(
+			self,
+			repo_url: str,
+			fetch_url: str,
+			analyze_files: AnalyzeFiles,
+			token: str | None = None,
+			progress: Callable[[int, int], None] | None = None,
+	) -> list[ParsedEndpoint]:
+		"""Endpoints of the remote HEAD of `repo_url` (fetched from `fetch_url`, which may carry credentials)."""
+		repo_dir = self.cache_dir / hashlib.sha256(repo_url.encode()).hexdigest()
+		with self._lock_for(repo_dir.name):
+			state = self._read_json(repo_dir / "state.json") or {}
+			indexed_commit = state.get("commit")
+
+			remote_head = self._git(["ls-remote", fetch_url, "HEAD"], token=token).split("\t", 1)[0]
+			endpoints = self._load_endpoints(repo_dir, remote_head) if remote_head else None
+			if endpoints is not None:
+				logger.info(f"{repo_url} unchanged at {remote_head[:12]}; using stored endpoint index.")
+				if remote_head != indexed_commit:
+					self._write_json(repo_dir / "state.json", {"url": repo_url, "commit": remote_head})
+				return endpoints
+
+			checkout = repo_dir / "checkout"
+			if not (checkout / ".git").exists():
+				checkout.mkdir(parents=True, exist_ok=True)
+				self._git(["init", "-q", str(checkout)])
+			logger.info(f"Fetching {repo_url} into {checkout}...")
+			self._git(["fetch", "-q", "--depth", "1", "--no-tags", fetch_url, "HEAD"], cwd=checkout, token=token)
+			commit = self._git(["rev-parse", "FETCH_HEAD"], cwd=checkout)
+
+			previous = self._load_files(repo_dir, indexed_commit) if indexed_commit else None
+			changed = self._changed_files(checkout, indexed_commit, commit) if previous is not None else None
+			self._git(["checkout", "-q", "--force", "--detach", commit], cwd=checkout)
+
+			if changed is None:
+				logger.info(f"Indexing {repo_url}@{commit[:12]} from scratch.")
+				files = self._analyze(checkout, self._source_files(checkout), analyze_files, progress)
+			else:
+				logger.info(f"Re-indexing {len(changed)} changed files of {repo_url} ({indexed_commit[:12]}..{commit[:12]}).")
+				files = {path: parsed for path, parsed in previous.items() if path not in changed}
+				existing = [path for path in changed if (checkout / path).is_file()]
+				files.update(self._analyze(checkout, existing, analyze_files, progress))
+
+			endpoints = resolve_endpoints(files, sorted(files))
+			self._save_index(repo_dir, repo_url, commit, files, endpoints)
+			return endpoints
+
+	def _lock_for(self, key: str) -> threading.Lock:
+		with self._locks_guard:
+			return self._locks.setdefault(key, threading.Lock())
+
+	def _git(self, args: list[str], cwd: Path | None = None, token: str | None = None) -> str:
+		try:
+			result = subprocess.run(
+				["git", *args],
+				cwd=cwd,
+				check=True,
+				capture_output=True,
+				timeout=self.timeout,
+				env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+			)
+		except subprocess.CalledProcessError as e:
+			error_msg = e.stderr.decode("utf-8", errors="ignore")
+			# Sanitize error message to hide token if it leaked
+			if token and token in error_msg:
+				error_msg = error_msg.replace(token, "***TOKEN***")
+			logger.error(f"Git {args[0]} failed: {error_msg}")
+			# Not chained: the original exception's command line carries the token URL.
+			raise Exception(f"Failed to fetch repository: {error_msg}") from None
+		except subprocess.TimeoutExpired:
+			logger.error(f"Git {args[0]} timed out after {self.timeout}s")
+			raise Exception(f"Failed to fetch repository: git {args[0]} timed out after {self.timeout}s") from None
+		return result.stdout.decode("utf-8", errors="ignore").strip()
+
+	def _source_files(self, checkout: Path) -> list[str]:
+		listed = self._git(["ls-files", "-z"], cwd=checkout)
+		return [path for path in listed.split("\0") if path and is_relevant_path(path)]
+
+	def _changed_files(self, checkout: Path, old: str, new: str) -> set[str] | None:
+		"""Source files that differ between two commits; None when `old` is no longer available."""
+		try:
+			diff = self._git(["diff", "--name-only", "-z", "--no-renames", old, new], cwd=checkout)
+		except Exception:
+			logger.warning(f"Cannot diff against {old[:12]}; falling back to a full re-index.")
+			return None
+		return {path for path in diff.split("\0") if path and is_relevant_path(path)}
+
+	@staticmethod
+	def _analyze(
+			checkout: Path,
+			paths: list[str],
+			analyze_files: AnalyzeFiles,
+			progress: Callable[[int, int], None] | None,
+	) -> dict[str, ParsedFile]:
+		"""Parses `paths` (relative to the checkout); stored results reference repository-relative paths."""
+		absolute = {str(checkout / path): path for path in paths}
+		results = analyze_files(list(absolute), progress)
+		return {absolute[file_path]: parsed.with_source(absolute[file_path]) for file_path, parsed in results.items()}
+
+	@staticmethod
+	def _read_json(path: Path) -> dict[str, Any] | None:
+		try:
+			return json.loads(path.read_text(encoding="utf-8"))
+		except (OSError, ValueError):
+			return None
+
+	@staticmethod
+	def _write_json(path: Path, data: dict[str, Any]) -> None:
+		tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+		tmp_path.write_text(json.dumps(data), encoding="utf-8")
+		os.replace(tmp_path, path)
+
+	def _load(self, repo_dir: Path, commit: str, name: str) -> Any:
+		data = self._read_json(repo_dir / commit / name)
+		if data is None or data.get("version") != self.INDEX_VERSION or data.get("commit") != commit:
+			return None
+		return data["data"]
+
+	def _load_endpoints(self, repo_dir: Path, commit: str) -> list[ParsedEndpoint] | None:
+		endpoints = self._load(repo_dir, commit, "endpoints.json")
+		return [ParsedEndpoint.model_validate(ep) for ep in endpoints] if endpoints is not None else None
+
+	def _load_files(self, repo_dir: Path, commit: str) -> dict[str, ParsedFile] | None:
+		files = self._load(repo_dir, commit, "files.json")
+		return {path: ParsedFile.model_validate(parsed) for path, parsed in files.items()} if files is not None else None
+
+	def _save_index(
+			self,
+			repo_dir: Path,
+			repo_url: str,
+			commit: str,
+			files: dict[str, ParsedFile],
+			endpoints: list[ParsedEndpoint],
+	) -> None:
+		commit_dir = repo_dir / commit
+		commit_dir.mkdir(parents=True, exist_ok=True)
+		header = {"version": self.INDEX_VERSION, "commit": commit}
+		self._write_json(commit_dir / "files.json", {
+			**header, "data": {path: parsed.model_dump() for path, parsed in files.items()},
+		})
+		self._write_json(commit_dir / "endpoints.json", {**header, "data": [ep.model_dump() for ep in endpoints]})
+		self._write_json(repo_dir / "state.json", {"url": repo_url, "commit": commit})
+		# Keep a few recent commits so a force-push back to one of them is still instant.
+		indexed = sorted(
+			(p for p in repo_dir.iterdir() if p.is_dir() and p.name != "checkout"),
+			key=lambda p: p.stat().st_mtime,
+			reverse=True,
+		)
+		for stale in indexed[self.KEPT_COMMITS:]:
+			shutil.rmtree(stale, ignore_errors=True)
+
+
+repository_index = RepositoryIndex()
@@ -0,0 +1,132 @@
+import os
+
+from src.app.services.code_analysis.schemas import ModuleRoutes, ParsedEndpoint, ParsedFile
+
+RouterRef = tuple[str, str]  # (module, variable)
+
+_MAX_DEPTH = 16
+
+
+def module_name(path: str, root: str | None = None) -> str:
+	"""Dotted module name of a project-relative `.py` path (`app/api/__init__.py` -> `app.api`)."""
+	relative = os.path.relpath(path, root) if root else path
+	dotted = os.path.splitext(relative.replace(os.sep, "/"))[0].strip("/").replace("/", ".")
+	return dotted[: -len(".__init__")] if dotted.endswith(".__init__") else dotted
+
+
+def _join(*parts: str) -> str:
+	segments = [p.strip("/") for p in parts if p and p.strip("/")]
+	return "/" + "/".join(segments)
+
+
+class RouterGraph:
+	"""
+	Project-level FastAPI routing: which router is included (or mounted) where, under which prefix.
+
+	Built once per analysis from the per-module `ModuleRoutes` facts, so modules are never
+	re-parsed. Imports are resolved relative to the importing package; absolute imports
+	match the project layout by module-name suffix (`app.api.users` also finds
+	`backend/src/app/api/users.py`).
+	"""
+
+	def __init__(self, modules: dict[str, ModuleRoutes], root: str | None = None):
+		self.root = root
+		self.modules: dict[str, ModuleRoutes] = {}
+		self._packages: dict[str, bool] = {}  # module -> is package (__init__)
+		for path, routes in modules.items():
+			name = module_name(path, root)
+			self.modules[name] = routes
+			self._packages[name] = os.path.basename(path) == "__init__.py"
+		self._by_suffix: dict[str, str] = {}
+		for name in sorted(self._known_names(), key=len, reverse=True):
+			parts = name.split(".")
+			for i in range(len(parts)):
+				self._by_suffix[".".join(parts[i:])] = name  # shortest full name wins
+		self._mounts: dict[RouterRef, list[tuple[RouterRef, str]]] = {}
+		for name, routes in self.modules.items():
+			for include in routes.includes:
+				parent, child = self._resolve(name, include.parent), self._resolve(name, include.child)
+				if parent and child and parent != child:
+					self._mounts.setdefault(child, []).append((parent, include.prefix))
+		self._prefix_cache: dict[RouterRef, list[str]] = {}
+
+	def _known_names(self) -> set[str]:
+		"""Modules plus their parent packages (namespace packages have no __init__)."""
+		names = set()
+		for name in self.modules:
+			parts = name.split(".")
+			names.update(".".join(parts[: i + 1]) for i in range(len(parts)))
+		return names
+
+	def _absolute(self, importer: str, module: str) -> str | None:
+		if module.startswith("."):
+			level = len(module) - len(module.lstrip("."))
+			package = importer.split(".") if self._packages.get(importer) else importer.split(".")[:-1]
+			if level > 1:
+				package = package[: -(level - 1)] if level - 1 <= len(package) else []
+			tail = module.lstrip(".")
+			return ".".join([*package, *([tail] if tail else [])])
+		return self._by_suffix.get(module)
+
+	def _resolve(self, module: str, expression: str, depth: int = 0) -> RouterRef | None:
+		"""The router variable an expression in `module` refers to, following imports and re-exports."""
+		routes = self.modules.get(module)
+		if routes is None or depth > _MAX_DEPTH:
+			return None
+		parts = expression.split(".")
+		if len(parts) == 1 and parts[0] in routes.routers:
+			return module, parts[0]
+		for i in range(len(parts), 0, -1):
+			imported = routes.imports.get(".".join(parts[:i]))
+			if imported is None:
+				continue
+			target = self._absolute(module, imported[0])
+			if target is None:
+				return None
+			names = ([imported[1]] if imported[1] else []) + parts[i:]
+			# `from app.api import users` / `import app.api.users`: descend into submodules first.
+			while names and f"{target}.{names[0]}" in self.modules:
+				target = f"{target}.{names.pop(0)}"
+			if len(names) == 1:
+				return self._resolve(target, names[0], depth + 1)
+			return None
+		return None
+
+	def _mount_prefixes(self, router: RouterRef, seen: frozenset[RouterRef] = frozenset()) -> list[str]:
+		"""Every path prefix `router` ends up under, own `APIRouter(prefix=...)` included."""
+		if router in self._prefix_cache:
+			return self._prefix_cache[router]
+		own = self.modules[router[0]].routers.get(router[1], "")
+		parents = [(parent, prefix) for parent, prefix in self._mounts.get(router, []) if parent not in seen]
+		if not parents:
+			prefixes = [_join(own)]
+		else:
+			prefixes = []
+			for parent, include_prefix in parents:
+				for base in self._mount_prefixes(parent, seen | {router}):
+					prefixes.append(_join(base, include_prefix, own))
+		self._prefix_cache[router] = prefixes = list(dict.fromkeys(prefixes))
+		return prefixes
+
+	def apply(self, path: str, endpoint: ParsedEndpoint) -> list[ParsedEndpoint]:
+		"""`endpoint` under each resolved prefix of its router (itself when nothing is known)."""
+		if not endpoint.router:
+			return [endpoint]
+		router = self._resolve(module_name(path, self.root), endpoint.router)
+		if router is None:
+			return [endpoint]
+		return [
+			endpoint if prefix == "/" else endpoint.model_copy(update={"path": _join(prefix, endpoint.path)})
+			for prefix in self._mount_prefixes(router)
+		]
+
+
+def resolve_endpoints(files: dict[str, ParsedFile], order: list[str], root: str | None = None) -> list[ParsedEndpoint]:
+	"""Flattens per-file results in `order`, with router prefixes resolved across modules."""
+	graph = RouterGraph({path: parsed.routes for path, parsed in files.items() if parsed.routes is not None}, root)
+	return [
+		resolved
+		for path in order if path in files
+		for endpoint in files[path].endpoints
+		for resolved in graph.apply(path, endpoint)
+	]
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+from src.app.services.code_analysis.parsers.java_ast import JavaASTParser
+from src.app.services.code_analysis.parsers.java_simple import JavaSpringParser
+from src.app.services.code_analysis.parsers.js_ts import NodeJSParser
+from src.app.services.code_analysis.parsers.python import FastAPIParser
+from src.app.services.code_analysis.parsers.tree_sitter_engine import tree_sitter_engine
+from src.app.services.code_analysis.schemas import ParsedEndpoint, ParsedFile
+
+logger = logging.getLogger(__name__)
+
+SOURCE_EXTENSIONS = (".py", ".java", ".kt", ".js", ".jsx", ".ts", ".tsx", ".go")
+# Dependency, build output, VCS and tooling directories never hold the project's own routes.
+IGNORED_DIRS = frozenset({
+	"node_modules", "bower_components", "jspm_packages", "vendor", "vendors", "third_party", "third-party",
+	"build", "dist", "out", "target", "bin", "obj", "coverage", "site-packages",
+	".git", ".hg", ".svn", ".idea", ".vscode", ".gradle", ".mvn", ".next", ".nuxt", ".cache",
+	"__pycache__", ".venv", "venv", "env", ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+})
+IGNORED_SUFFIXES = (".min.js", ".bundle.js", ".d.ts", ".spec.ts", ".spec.js", ".test.ts", ".test.js", "_test.go")
+
+# Cheap byte-level checks run before a file is decoded and parsed: a file that cannot
+# contain a route declaration for its language is skipped.
+_ROUTE_MARKERS: dict[str, re.Pattern[bytes]] = {
+	# Python also keeps modules that define, include, mount or re-export routers (prefix resolution).
+	".py": re.compile(rb"\.(?:get|post|put|delete|patch|options|head|route|mount)\s*\(|include_router|APIRouter|FastAPI|\brouter\b"),
+	".java": re.compile(rb"@(?:Rest)?Controller\b"),
+	".js": re.compile(rb"@(?:Get|Post|Put|Delete|Patch|Options|Head|All)\s*\(|\.(?:get|post|put|delete|patch|all)\s*\("),
+	".go": re.compile(rb"\.(?:GET|POST|PUT|DELETE|PATCH|Get|Post|Put|Delete|Patch|Any|HandleFunc|Handle)\s*\("),
+}
+_ROUTE_MARKERS[".kt"] = _ROUTE_MARKERS[".java"]
+for _extension in (".jsx", ".ts", ".tsx"):
+	_ROUTE_MARKERS[_extension] = _ROUTE_MARKERS[".js"]
+
+
+def is_ignored_dir(name: str) -> bool:
+	return name in IGNORED_DIRS or (name.startswith(".") and name not in (".", ".."))
+
+
+def is_source_file(name: str) -> bool:
+	return name.endswith(SOURCE_EXTENSIONS) and not name.endswith(IGNORED_SUFFIXES)
+
+
+def is_relevant_path(relative_path: str) -> bool:
+	"""`is_source_file` for a `/`-separated relative path (archive member, `git ls-files` entry)."""
+	*dirs, name = relative_path.split("/")
+	return is_source_file(name) and not any(is_ignored_dir(d) for d in dirs)
+
+
+def iter_source_files(root_path: str) -> Iterator[str]:
+	"""Walks `root_path`, pruning ignored directories, and yields candidate source files."""
+	for root, dirs, files in os.walk(root_path):
+		dirs[:] = sorted(d for d in dirs if not is_ignored_dir(d))
+		for name in sorted(files):
+			if is_source_file(name):
+				yield os.path.join(root, name)
+
+
+def has_route_markers(file_path: str, content: bytes) -> bool:
+	marker = _ROUTE_MARKERS.get(os.path.splitext(file_path)[1])
+	return bool(marker and marker.search(content))
+
+
+def content_key(file_path: str, content: bytes) -> str:
+	"""Cache key of a file's parse result; the file name is included because parsers use it as context."""
+	return hashlib.sha1(os.path.basename(file_path).encode() + b"\0" + content).hexdigest()
+
+
+def parse_source(file_path: str, content: str) -> ParsedFile:
+	"""
+	Dispatches a single file to the parser for its language: the tree-sitter engine when its
+	grammar is installed, the regex/javalang parsers otherwise. Python always goes through
+	FastAPIParser (stdlib `ast`); tree-sitter adds Flask routes on top.
+	"""
+	if file_path.endswith(".py"):
+		endpoints, routes = FastAPIParser().parse_module(file_path, content)
+		if tree_sitter_engine.supports(file_path):
+			endpoints.extend(tree_sitter_engine.parse_file(file_path, content))
+		return ParsedFile(endpoints=endpoints, routes=routes)
+
+	return ParsedFile(endpoints=_parse_endpoints(file_path, content))
+
+
+def _parse_endpoints(file_path: str, content: str) -> list[ParsedEndpoint]:
+	if tree_sitter_engine.supports(file_path):
+		try:
+			return tree_sitter_engine.parse_file(file_path, content)
+		except Exception as e:
+			logger.warning(f"Tree-sitter failed for {file_path}: {e}. Falling back to legacy parsers.")
+
+	if file_path.endswith(".java"):
+		if "@RestController" not in content and "@Controller" not in content:
+			return []
+		# Strategy: Try AST first (High Precision), Fallback to Regex (Robustness)
+		try:
+			ast_results = JavaASTParser().parse_file(file_path, content)
+			if ast_results:
+				return ast_results
+			raise ValueError("AST returned no results")
+		except Exception as e:
+			logger.warning(f"Java AST failed for {file_path}: {e}. Falling back to Regex.")
+			return JavaSpringParser().parse_file(file_path, content)
+
+	if file_path.endswith((".js", ".jsx", ".ts", ".tsx")):
+		return NodeJSParser().parse_file(file_path, content)
+
+	return []
+
+
+def parse_batch(batch: list[tuple[str, bytes]]) -> list[tuple[str, ParsedFile]]:
+	"""Worker entry point: parses `(path, raw content)` pairs; a failing file yields no endpoints."""
+	results = []
+	for file_path, content in batch:
+		try:
+			parsed = parse_source(file_path, content.decode("utf-8", errors="ignore"))
+		except Exception as e:
+			logger.warning(f"Failed to parse {file_path}: {e}")
+			parsed = ParsedFile()
+		results.append((file_path, parsed))
+	return results
+
+
+class ParseResultCache:
+	"""Thread-safe LRU of parse results keyed by `content_key`; unchanged files are never re-parsed."""
+
+	def __init__(self, max_entries: int):
+		self.max_entries = max_entries
+		self._entries: OrderedDict[str, ParsedFile] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, key: str) -> ParsedFile | None:
+		with self._lock:
+			parsed = self._entries.get(key)
+			if parsed is not None:
+				self._entries.move_to_end(key)
+			return parsed
+
+	def put(self, key: str, parsed: ParsedFile) -> None:
+		with self._lock:
+			self._entries[key] = parsed
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_parser_pool(workers: int) -> ProcessPoolExecutor:
+	"""Shared worker processes for parsing; spawned (not forked) so they never inherit loop/thread state."""
+	global _pool
+	if _pool is None:
+		with _pool_lock:
+			if _pool is None:
+				_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+	return _pool
+
+
+def shutdown_parser_pool() -> None:
+	global _pool
+	with _pool_lock:
+		if _pool is not None:
+			_pool.shutdown(wait=False, cancel_futures=True)
+			_pool = None
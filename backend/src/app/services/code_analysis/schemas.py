@@ -17,8 +17,37 @@ class ParsedEndpoint(BaseModel):
 	return_type: str | None = None
 	source_file: str
 	line_number: int
+	# Expression the route was declared on (`router` in `@router.get`); used to resolve prefixes.
+	router: str | None = None
 
 	def to_string(self) -> str:
 		"""Returns a string representation suitable for LLM context."""
 		params_str = ", ".join([f"{p.name}:{p.type_hint}" for p in self.parameters])
 		return f"- {self.method.upper()} {self.path} ({params_str}) -> {self.return_type} : {self.description or 'No docstring'}"
+
+
+class RouterInclude(BaseModel):
+	"""`parent.include_router(child, prefix=...)` or `parent.mount(prefix, child)`."""
+	parent: str
+	child: str
+	prefix: str = ""
+
+
+class ModuleRoutes(BaseModel):
+	"""Routing facts of one Python module, resolved across files by `RouterGraph`."""
+	routers: dict[str, str] = {}  # variable -> own prefix (APIRouter(prefix=...) / FastAPI())
+	includes: list[RouterInclude] = []
+	imports: dict[str, tuple[str, str | None]] = {}  # local name -> (module, imported name); module may be relative
+
+
+class ParsedFile(BaseModel):
+	"""Per-file parse result, cached by content hash."""
+	endpoints: list[ParsedEndpoint] = []
+	routes: ModuleRoutes | None = None
+
+	def with_source(self, source_file: str) -> "ParsedFile":
+		if all(ep.source_file == source_file for ep in self.endpoints):
+			return self
+		return self.model_copy(update={
+			"endpoints": [ep.model_copy(update={"source_file": source_file}) for ep in self.endpoints],
+		})
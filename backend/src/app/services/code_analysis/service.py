@@ -1,74 +1,226 @@
 import logging
 import os
-import subprocess
-import tempfile
+import time
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import BinaryIO
 from urllib.parse import urlparse, urlunparse
 
-from src.app.services.code_analysis.parsers.java_ast import JavaASTParser
-from src.app.services.code_analysis.parsers.java_simple import JavaSpringParser
-from src.app.services.code_analysis.parsers.js_ts import NodeJSParser
-from src.app.services.code_analysis.parsers.python import FastAPIParser
-from src.app.services.code_analysis.schemas import ParsedEndpoint
+from src.app.core.config import get_settings
+from src.app.services.code_analysis.repo_index import repository_index
+from src.app.services.code_analysis.routing import resolve_endpoints
+from src.app.services.code_analysis.scanner import (
+	ParseResultCache,
+	content_key,
+	get_parser_pool,
+	has_route_markers,
+	is_relevant_path,
+	iter_source_files,
+	parse_batch,
+)
+from src.app.services.code_analysis.schemas import ParsedEndpoint, ParsedFile
+from src.app.services.code_analysis.summary import endpoint_summarizer
 
 logger = logging.getLogger(__name__)
 
+# Shared by all service instances, so re-analyzing a project only parses files that changed.
+parse_cache = ParseResultCache(get_settings().CODE_ANALYSIS_CACHE_SIZE)
+
+
+class ArchiveLimitError(ValueError):
+	"""An uploaded archive exceeds the configured size/entry limits (likely a zip bomb)."""
+
+
+def progress_logger(label: str, step_percent: int = 10) -> Callable[[int, int], None]:
+	"""Progress callback for `analyze_project`/`analyze_zip` that logs every `step_percent`% of files."""
+	last_step = -1
+
+	def report(done: int, total: int) -> None:
+		nonlocal last_step
+		step = (done * 100 // total) // step_percent if total else 0
+		if step != last_step or done == total:
+			last_step = step
+			logger.info(f"{label}: parsed {done}/{total} files")
+
+	return report
+
 
 class CodeAnalysisService:
 	"""
 	Facade for analyzing source code from various sources (Local, Zip, Git).
 	"""
 
-	def analyze_project(self, root_path: str) -> list[ParsedEndpoint]:
-		endpoints = []
-
-		for root, _, files in os.walk(root_path):
-			for file in files:
-				file_path = os.path.join(root, file)
-
-				if file.endswith(".py"):
-					with open(file_path, encoding="utf-8", errors="ignore") as f:
-						content = f.read()
-						parser = FastAPIParser()
-						endpoints.extend(parser.parse_file(file_path, content))
-
-				elif file.endswith(".java"):
-					with open(file_path, encoding="utf-8", errors="ignore") as f:
-						content = f.read()
-						if "@RestController" in content or "@Controller" in content:
-							# Strategy: Try AST first (High Precision), Fallback to Regex (Robustness)
-							try:
-								ast_parser = JavaASTParser()
-								ast_results = ast_parser.parse_file(file_path, content)
-								if ast_results:
-									endpoints.extend(ast_results)
-								else:
-									raise ValueError("AST returned no results")
-							except Exception as e:
-								logger.warning(f"Java AST failed for {file_path}: {e}. Falling back to Regex.")
-								regex_parser = JavaSpringParser()
-								endpoints.extend(regex_parser.parse_file(file_path, content))
-
-				elif file.endswith(".js") or file.endswith(".ts"):
-					with open(file_path, encoding="utf-8", errors="ignore") as f:
-						content = f.read()
-						parser = NodeJSParser()
-						endpoints.extend(parser.parse_file(file_path, content))
-
-		return endpoints
-
-	def format_for_llm(self, endpoints: list[ParsedEndpoint]) -> str:
-		if not endpoints:
-			return "No endpoints found in source code."
-
-		summary = ["Source Code Analysis (Reverse Engineered API):"]
-		for ep in endpoints:
-			summary.append(ep.to_string())
-
-		return "\n".join(summary)
+	def __init__(self, cache: ParseResultCache | None = None):
+		self.settings = get_settings()
+		self.cache = cache if cache is not None else parse_cache
+
+	def analyze_project(self, root_path: str, progress: Callable[[int, int], None] | None = None) -> list[ParsedEndpoint]:
+		"""
+		Extracts endpoints from every source file under `root_path`.
+
+		Ignored directories are pruned, files without route markers are skipped before
+		parsing, unchanged files are served from the content-hash cache and the rest are
+		parsed in worker processes. FastAPI router prefixes are then resolved across modules.
+		`progress(done, total)` is called as files complete.
+		"""
+		files = list(iter_source_files(root_path))
+		return resolve_endpoints(self.analyze_files(files, progress), files, root=root_path)
+
+	def analyze_files(
+			self,
+			files: list[str],
+			progress: Callable[[int, int], None] | None = None,
+	) -> dict[str, ParsedFile]:
+		"""Parse results per file for an explicit list of source files (see `analyze_project`)."""
+		return self._analyze_contents(((path, self._read(path)) for path in files), len(files), progress)
+
+	def analyze_zip(self, archive: str | BinaryIO, progress: Callable[[int, int], None] | None = None) -> list[ParsedEndpoint]:
+		"""
+		Extracts endpoints from a zip archive without extracting it.
+
+		Members are selected by path and extension from the central directory before
+		anything is decompressed, then streamed one by one into the parser pipeline.
+		Raises `ArchiveLimitError` for archives that look like zip bombs.
+		"""
+		with zipfile.ZipFile(archive) as zf:
+			members = self._select_members(zf.infolist())
+			names = [info.filename for info in members]
+			results = self._analyze_contents(self._read_members(zf, members), len(members), progress)
+		return resolve_endpoints(results, names)
+
+	def _read(self, file_path: str) -> bytes | None:
+		try:
+			if os.path.getsize(file_path) > self.settings.CODE_ANALYSIS_MAX_FILE_BYTES:
+				return None
+			with open(file_path, "rb") as f:
+				return f.read()
+		except OSError as e:
+			logger.warning(f"Cannot read {file_path}: {e}")
+			return None
+
+	def _select_members(self, infos: list[zipfile.ZipInfo]) -> list[zipfile.ZipInfo]:
+		if len(infos) > self.settings.CODE_ANALYSIS_ZIP_MAX_MEMBERS:
+			raise ArchiveLimitError(f"Archive has {len(infos)} entries (limit {self.settings.CODE_ANALYSIS_ZIP_MAX_MEMBERS})")
+		members = []
+		for info in infos:
+			# Encrypted members can't be read; oversized ones would be skipped after decompression anyway.
+			if info.is_dir() or info.flag_bits & 0x1 or not is_relevant_path(info.filename):
+				continue
+			if info.file_size > self.settings.CODE_ANALYSIS_MAX_FILE_BYTES:
+				continue
+			if info.compress_size and info.file_size / info.compress_size > self.settings.CODE_ANALYSIS_ZIP_MAX_RATIO:
+				raise ArchiveLimitError(f"Suspicious compression ratio for {info.filename}")
+			members.append(info)
+		return members
+
+	def _read_members(self, zf: zipfile.ZipFile, members: list[zipfile.ZipInfo]) -> Iterator[tuple[str, bytes | None]]:
+		"""Decompresses members one at a time, enforcing size limits on the bytes actually produced."""
+		max_file = self.settings.CODE_ANALYSIS_MAX_FILE_BYTES
+		budget = self.settings.CODE_ANALYSIS_ZIP_MAX_TOTAL_BYTES
+		for info in members:
+			with zf.open(info) as member:
+				content = member.read(max_file + 1)
+			budget -= len(content)
+			if budget < 0:
+				raise ArchiveLimitError(
+					f"Archive sources exceed {self.settings.CODE_ANALYSIS_ZIP_MAX_TOTAL_BYTES} bytes uncompressed")
+			# Headers can understate the real size; never trust them for the limit.
+			yield info.filename, content if len(content) <= max_file else None
+
+	def _analyze_contents(
+			self,
+			items: Iterable[tuple[str, bytes | None]],
+			total: int,
+			progress: Callable[[int, int], None] | None,
+	) -> dict[str, ParsedFile]:
+		"""
+		Core pipeline over `(path, content)` pairs (content None = unreadable/too large).
+
+		Items are consumed lazily; once enough files need parsing they are submitted to the
+		process pool in batches, with a bounded number of batches in flight, so memory
+		stays proportional to the pool size rather than to the project.
+		"""
+		started = time.monotonic()
+		results: dict[str, ParsedFile] = {}
+		keys: dict[str, str] = {}
+		pending: list[tuple[str, bytes]] = []
+		in_flight: set[Future] = set()
+		pool: ProcessPoolExecutor | None = None
+		batch_size = self.settings.CODE_ANALYSIS_BATCH_SIZE
+		max_in_flight = 2 * self.settings.CODE_ANALYSIS_WORKERS
+		done = skipped = cached = parsed = 0
+
+		def report(count: int) -> None:
+			nonlocal done
+			done += count
+			if progress:
+				progress(done, total)
+
+		def collect(batch: list[tuple[str, ParsedFile]]) -> None:
+			nonlocal parsed
+			for file_path, parsed_file in batch:
+				self.cache.put(keys[file_path], parsed_file)
+				results[file_path] = parsed_file
+			parsed += len(batch)
+			report(len(batch))
+
+		for file_path, content in items:
+			if content is None or not has_route_markers(file_path, content):
+				skipped += 1
+				report(1)
+				continue
+			key = content_key(file_path, content)
+			hit = self.cache.get(key)
+			if hit is not None:
+				results[file_path] = hit.with_source(file_path)
+				cached += 1
+				report(1)
+				continue
+			keys[file_path] = key
+			pending.append((file_path, content))
+			if pool is None and len(pending) >= self.settings.CODE_ANALYSIS_PARALLEL_MIN_FILES:
+				pool = get_parser_pool(self.settings.CODE_ANALYSIS_WORKERS)
+			if pool is not None and len(pending) >= batch_size:
+				in_flight.add(pool.submit(parse_batch, pending))
+				pending = []
+				if len(in_flight) >= max_in_flight:
+					finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+					for future in finished:
+						collect(future.result())
+
+		if pool is None:
+			# Small workloads: process start-up would cost more than the parsing.
+			for item in pending:
+				collect(parse_batch([item]))
+		else:
+			if pending:
+				in_flight.add(pool.submit(parse_batch, pending))
+			for future in wait(in_flight).done:
+				collect(future.result())
+
+		logger.info(
+			f"Analyzed {done} source files in {time.monotonic() - started:.2f}s: "
+			f"{skipped} skipped, {cached} cached, {parsed} parsed, "
+			f"{sum(len(p.endpoints) for p in results.values())} endpoints."
+		)
+		return results
+
+	def format_for_llm(self, endpoints: list[ParsedEndpoint], query: str | None = None, max_tokens: int | None = None) -> str:
+		"""
+		Compact endpoint summary for LLM context: grouped by resource prefix, shared parameter
+		signatures printed once, ranked against `query` and capped at `max_tokens`
+		(CODE_ANALYSIS_SUMMARY_MAX_TOKENS by default, 0 disables the cap).
+		"""
+		if max_tokens is None:
+			max_tokens = self.settings.CODE_ANALYSIS_SUMMARY_MAX_TOKENS
+		return endpoint_summarizer.summarize(endpoints, query=query, max_tokens=max_tokens)
 
 	def clone_and_analyze(self, repo_url: str, token: str | None = None) -> list[ParsedEndpoint]:
 		"""
-		Clones a Git repository (public or private) and analyzes it.
+		Analyzes a Git repository (public or private) through the persistent repository
+		index: unchanged commits are answered from the stored index, new ones re-parse
+		only the files changed since the last indexed commit.
 		"""
 		if not repo_url.startswith("http"):
 			raise ValueError("Invalid Git URL. Must start with http/https")
@@ -81,22 +233,10 @@ class CodeAnalysisService:
 			netloc = f"oauth2:{token}@{parsed.netloc}"
 			final_url = urlunparse(parsed._replace(netloc=netloc))
 
-		with tempfile.TemporaryDirectory() as temp_dir:
-			safe_log_url = repo_url  # Don't log the token version
-			logger.info(f"Cloning {safe_log_url} to {temp_dir}...")
-
-			try:
-				subprocess.run(
-					["git", "clone", "--depth", "1", final_url, temp_dir],
-					check=True,
-					capture_output=True
-				)
-				return self.analyze_project(temp_dir)
-			except subprocess.CalledProcessError as e:
-				error_msg = e.stderr.decode('utf-8')
-				# Sanitize error message to hide token if it leaked
-				if token and token in error_msg:
-					error_msg = error_msg.replace(token, "***TOKEN***")
-
-				logger.error(f"Git clone failed: {error_msg}")
-				raise Exception(f"Failed to clone repository: {error_msg}") from e
+		return repository_index.analyze(
+			repo_url,
+			final_url,
+			self.analyze_files,
+			token=token,
+			progress=progress_logger(f"Analyzing {repo_url}"),
+		)
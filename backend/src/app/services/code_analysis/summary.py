@@ -0,0 +1,173 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from src.app.services.code_analysis.schemas import ParsedEndpoint
+from src.app.services.context_budget import TokenCounter, token_counter
+from src.app.services.text_index import BM25Index, tokenize
+
+HEADER = "Source Code Analysis (Reverse Engineered API):"
+
+# Leading segments that are shared by every route of an API and say nothing about the resource.
+_NAMESPACE_SEGMENT_RE = re.compile(r"^(?:api|rest|public|internal|v\d+(?:\.\d+)?)$", re.IGNORECASE)
+_PLACEHOLDER_DOC_PREFIX = "[Context: Defined in"
+# Signatures shorter than this are cheaper inline than as a reference.
+_MIN_SHARED_SIGNATURE_CHARS = 16
+
+
+@dataclass(slots=True)
+class EndpointRecord:
+	"""Flat view of a `ParsedEndpoint` with only what the summary prints; cheap to rank and sort."""
+
+	order: int
+	method: str
+	path: str
+	group: str
+	signature: str
+	description: str
+	return_type: str | None
+	source: str
+	score: float = 0.0
+
+	@classmethod
+	def from_endpoint(cls, order: int, endpoint: ParsedEndpoint) -> "EndpointRecord":
+		description = (endpoint.description or "").strip()
+		if description.startswith(_PLACEHOLDER_DOC_PREFIX):
+			description = ""  # the source file is printed in the group header instead
+		return cls(
+			order=order,
+			method=endpoint.method.upper(),
+			path=endpoint.path,
+			group=resource_prefix(endpoint.path),
+			signature=", ".join(f"{p.name}:{p.type_hint}" if p.type_hint else p.name for p in endpoint.parameters),
+			description=description.splitlines()[0] if description else "",
+			return_type=endpoint.return_type,
+			source=endpoint.source_file.replace("\\", "/").rsplit("/", 1)[-1],
+		)
+
+	def terms(self) -> Counter:
+		terms = Counter(tokenize(self.description))
+		# The path names the resource; weight it above the docstring.
+		for token in tokenize(self.path):
+			terms[token] += 2
+		terms.update(tokenize(self.signature))
+		terms[self.method.lower()] += 1
+		return terms
+
+	def line(self, aliases: dict[str, str]) -> str:
+		signature = aliases.get(self.signature, self.signature)
+		returns = f" -> {self.return_type}" if self.return_type else ""
+		description = f" : {self.description}" if self.description else ""
+		return f"- {self.method} {self.path} ({signature}){returns}{description}"
+
+
+def resource_prefix(path: str) -> str:
+	"""`/api/v1/users/{id}/orders` -> `/api/v1/users`: namespace segments plus the first resource."""
+	prefix = []
+	for segment in path.strip("/").split("/"):
+		if not segment:
+			break
+		prefix.append(segment)
+		if not _NAMESPACE_SEGMENT_RE.match(segment):
+			break
+	return "/" + "/".join(prefix)
+
+
+class EndpointSummarizer:
+	"""
+	Compact LLM context for a list of endpoints.
+
+	Endpoints are grouped by resource prefix, repeated parameter signatures are printed
+	once and referenced by alias, and when a request is given groups are ordered by
+	BM25 relevance. Endpoints are added best-first until `max_tokens` is reached; the
+	rest are counted in a trailer line.
+	"""
+
+	def __init__(self, counter: TokenCounter | None = None):
+		self.counter = counter or token_counter
+
+	def summarize(self, endpoints: list[ParsedEndpoint], query: str | None = None, max_tokens: int = 0) -> str:
+		if not endpoints:
+			return "No endpoints found in source code."
+
+		records = [EndpointRecord.from_endpoint(n, ep) for n, ep in enumerate(endpoints)]
+		ranked = self._rank(records, query)
+		aliases = self._aliases(records)
+		selected = self._select(ranked, aliases, max_tokens)
+		summary = self._render(records, selected, aliases, ranked_by_query=bool(query))
+		# Header costs are estimated during selection; never hand out more than the budget.
+		return self.counter.truncate(summary, max_tokens) if max_tokens > 0 else summary
+
+	@staticmethod
+	def _rank(records: list[EndpointRecord], query: str | None) -> list[EndpointRecord]:
+		"""Records best-first: by relevance when there is a query, by group then source order otherwise."""
+		first_in_group: dict[str, int] = {}
+		for record in records:
+			first_in_group.setdefault(record.group, record.order)
+		if query:
+			bm25 = BM25Index()
+			for record in records:
+				bm25.upsert(str(record.order), record.terms())
+			for doc_id, score in bm25.search(query, len(records)):
+				records[doc_id].score = score
+		return sorted(records, key=lambda r: (-r.score, first_in_group[r.group], r.order))
+
+	@staticmethod
+	def _aliases(records: list[EndpointRecord]) -> dict[str, str]:
+		counts = Counter(r.signature for r in records if len(r.signature) >= _MIN_SHARED_SIGNATURE_CHARS)
+		shared = [signature for signature, count in counts.most_common() if count > 1]
+		return {signature: f"${n}" for n, signature in enumerate(shared, 1)}
+
+	def _select(self, ranked: list[EndpointRecord], aliases: dict[str, str], max_tokens: int) -> set[int]:
+		"""Orders of the records that fit the budget; a record also pays for its group header and alias line."""
+		if max_tokens <= 0:
+			return {r.order for r in ranked}
+		used = self.counter.count(HEADER) + 16  # header line with counts, trailer, alias section title
+		groups: set[str] = set()
+		defined: set[str] = set()
+		selected: set[int] = set()
+		for record in ranked:
+			cost = self.counter.count(record.line(aliases)) + 1
+			if record.group not in groups:
+				cost += self.counter.count(f"[{record.group}] {record.source}") + 4
+			alias = aliases.get(record.signature)
+			if alias and alias not in defined:
+				cost += self.counter.count(f"  {alias} = ({record.signature})") + 1
+			if used + cost > max_tokens:
+				continue
+			used += cost
+			selected.add(record.order)
+			groups.add(record.group)
+			if alias:
+				defined.add(alias)
+		return selected
+
+	@staticmethod
+	def _render(records: list[EndpointRecord], selected: set[int], aliases: dict[str, str], ranked_by_query: bool) -> str:
+		groups: dict[str, list[EndpointRecord]] = {}
+		for record in records:
+			groups.setdefault(record.group, []).append(record)
+		kept = {group: [r for r in members if r.order in selected] for group, members in groups.items()}
+		kept = {group: members for group, members in kept.items() if members}
+		order = sorted(kept, key=lambda g: (-max(r.score for r in kept[g]), kept[g][0].order))
+
+		lines = [f"{HEADER} {len(records)} endpoints in {len(groups)} resource groups"
+				+ (", most relevant to the request first." if ranked_by_query else ".")]
+		used_aliases = {r.signature for members in kept.values() for r in members if r.signature in aliases}
+		if used_aliases:
+			lines.append("Shared parameter signatures:")
+			lines.extend(f"  {alias} = ({signature})" for signature, alias in aliases.items() if signature in used_aliases)
+		for group in order:
+			members = kept[group]
+			sources = sorted({r.source for r in members})
+			total = len(groups[group])
+			count = f"{total} endpoints" if len(members) == total else f"{len(members)} of {total} endpoints"
+			lines.append(f"[{group}] {count}, {', '.join(sources)}")
+			lines.extend(r.line(aliases) for r in members)
+		omitted = len(records) - len(selected)
+		if omitted:
+			lines.append(f"(+ {omitted} less relevant endpoints omitted)")
+		return "\n".join(lines)
+
+
+endpoint_summarizer = EndpointSummarizer()
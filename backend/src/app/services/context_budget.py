@@ -0,0 +1,195 @@
+import logging
+import re
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+from src.app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = "\n...<truncated>..."
+
+_WORD_RE = re.compile(r"[a-z0-9_]{3,}")
+
+
+class TokenCounter:
+	"""Counts and truncates text in model tokens.
+
+	Uses a `tiktoken` encoding when it can be loaded (the BPE file is downloaded once
+	and cached). Falls back to a conservative chars-per-token heuristic otherwise, so
+	budgeting never depends on network access.
+	"""
+
+	CHARS_PER_TOKEN = 3.5
+
+	def __init__(self, encoding_name: str | None = None):
+		self.encoding_name = encoding_name or get_settings().CONTEXT_TOKENIZER_ENCODING
+		self._encoding = None
+		self._loaded = False
+		self._lock = threading.Lock()
+
+	def _get_encoding(self):
+		if self._loaded:
+			return self._encoding
+		with self._lock:
+			if not self._loaded:
+				try:
+					import tiktoken
+
+					self._encoding = tiktoken.get_encoding(self.encoding_name)
+				except Exception as e:
+					logger.warning(f"TokenCounter: tokenizer '{self.encoding_name}' unavailable ({e}). Using heuristic.")
+					self._encoding = None
+				self._loaded = True
+		return self._encoding
+
+	def count(self, text: str | None) -> int:
+		if not text:
+			return 0
+		encoding = self._get_encoding()
+		if encoding is not None:
+			return len(encoding.encode(text, disallowed_special=()))
+		return int(len(text) / self.CHARS_PER_TOKEN) + 1
+
+	def truncate(self, text: str | None, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+		"""Cuts `text` to at most `max_tokens` tokens (marker included)."""
+		if not text:
+			return ""
+		if max_tokens <= 0:
+			return ""
+		if self.count(text) <= max_tokens:
+			return text
+
+		keep = max(max_tokens - self.count(marker), 0)
+		encoding = self._get_encoding()
+		if encoding is not None:
+			head = encoding.decode(encoding.encode(text, disallowed_special=())[:keep])
+		else:
+			head = text[: int(keep * self.CHARS_PER_TOKEN)]
+		return head + marker
+
+
+token_counter = TokenCounter()
+
+
+@dataclass
+class ContextItem:
+	"""A unit of context that is either packed whole or dropped."""
+
+	text: str
+	score: float = 0.0
+
+
+def keyword_score(text: str, query: str | None) -> float:
+	"""Cheap relevance score: share of query keywords present in `text`."""
+	if not query:
+		return 0.0
+	keywords = set(_WORD_RE.findall(query.lower()))
+	if not keywords:
+		return 0.0
+	haystack = text.lower()
+	return sum(1 for k in keywords if k in haystack) / len(keywords)
+
+
+class ContextBudget:
+	"""Splits the model context window between context sources.
+
+	Each source gets a share of the available window. Sources that need less than
+	their share give the rest back, and it is redistributed to the sources that
+	still need more, so no tokens are wasted while no source can starve the others.
+	"""
+
+	DEFAULT_SHARES: dict[str, float] = {
+		"source": 0.35,
+		"vision": 0.30,
+		"history": 0.15,
+		"defects": 0.05,
+		"memory": 0.05,
+		"plan": 0.10,
+	}
+
+	def __init__(
+		self,
+		window_tokens: int | None = None,
+		reserved_tokens: int | None = None,
+		shares: Mapping[str, float] | None = None,
+		counter: TokenCounter | None = None,
+	):
+		settings = get_settings()
+		self.window_tokens = window_tokens or settings.LLM_CONTEXT_WINDOW
+		self.reserved_tokens = settings.LLM_RESERVED_OUTPUT_TOKENS if reserved_tokens is None else reserved_tokens
+		self.shares = dict(shares or self.DEFAULT_SHARES)
+		self.counter = counter or token_counter
+
+	@property
+	def available_tokens(self) -> int:
+		return max(self.window_tokens - self.reserved_tokens, 0)
+
+	def share_of(self, source: str, fixed_tokens: int = 0) -> int:
+		"""Tokens a single source may use when the others are unknown."""
+		available = max(self.available_tokens - fixed_tokens, 0)
+		total = sum(self.shares.values()) or 1.0
+		return int(available * self.shares.get(source, 0.0) / total)
+
+	def allocate(self, demands: Mapping[str, int], fixed_tokens: int = 0) -> dict[str, int]:
+		"""Returns a per-source token allowance for the given demands.
+
+		`fixed_tokens` covers prompt parts that are never trimmed (system prompt,
+		the user request itself).
+		"""
+		remaining = max(self.available_tokens - fixed_tokens, 0)
+		allowance = {name: 0 for name in demands}
+		pending = {name: demand for name, demand in demands.items() if demand > 0}
+
+		while pending and remaining > 0:
+			weights = {name: self.shares.get(name, 0.05) for name in pending}
+			total_weight = sum(weights.values())
+			satisfied = []
+			spent = 0
+			for name, demand in pending.items():
+				quota = int(remaining * weights[name] / total_weight)
+				grant = min(demand, quota)
+				allowance[name] += grant
+				pending[name] -= grant
+				spent += grant
+				if pending[name] <= 0:
+					satisfied.append(name)
+			remaining -= spent
+			for name in satisfied:
+				del pending[name]
+			if not satisfied:
+				# Everyone is capped by their quota: hand out the leftover and stop.
+				for name in pending:
+					allowance[name] += int(remaining * weights[name] / total_weight)
+				break
+
+		return allowance
+
+	def fit(self, sections: Mapping[str, str], fixed_text: str = "") -> dict[str, str]:
+		"""Truncates each named section to its allocated share of the window."""
+		fixed_tokens = self.counter.count(fixed_text)
+		demands = {name: self.counter.count(text) for name, text in sections.items()}
+		allowance = self.allocate(demands, fixed_tokens=fixed_tokens)
+		return {name: self.counter.truncate(text, allowance[name]) for name, text in sections.items()}
+
+	def pack(self, items: Iterable[ContextItem], max_tokens: int, separator: str = "\n") -> list[str]:
+		"""Greedy knapsack: keeps the highest-scored items that fit in `max_tokens`.
+
+		Ties keep the original order. Items too large to fit are skipped, smaller
+		ones after them may still be packed.
+		"""
+		ranked = sorted(enumerate(items), key=lambda pair: (-pair[1].score, pair[0]))
+		separator_tokens = self.counter.count(separator)
+		used = 0
+		packed: list[str] = []
+		for _, item in ranked:
+			cost = self.counter.count(item.text) + (separator_tokens if packed else 0)
+			if used + cost > max_tokens:
+				continue
+			packed.append(item.text)
+			used += cost
+		return packed
+
+
+context_budget = ContextBudget()
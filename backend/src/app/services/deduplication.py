@@ -1,48 +1,121 @@
+import hashlib
 import logging
-import uuid
-
-import chromadb
-from chromadb.utils import embedding_functions
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+from src.app.core.concurrency import run_blocking
 from src.app.core.config import get_settings
+from src.app.core.redis import redis_client
+from src.app.services.storage.service import StorageService, storage_service
+from src.app.services.vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
+_URL_RE = re.compile(r"https?://[^\s'\"<>]+", re.IGNORECASE)
+
+
+def _normalize_url(match: re.Match) -> str:
+    url = match.group(0).rstrip(".,;:!?)")
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url.lower()
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip("/")
+    # Scheme and fragment don't change which page the test targets.
+    return urlunsplit(("", parts.netloc.lower().removeprefix("www."), path, query, "")).lstrip("/")
+
+
+def normalize_request(text: str) -> str:
+    """Canonical form of a request for exact matching: normalized URLs, lowercase, collapsed whitespace."""
+    text = _URL_RE.sub(_normalize_url, text or "")
+    return " ".join(text.lower().split())
+
+
 class DeduplicationService:
     """
     Service for semantic deduplication using ChromaDB (Server Mode).
     """
 
-    def __init__(self, embedding_function=None):
+    COLLECTION_NAME = "test_cases_v1"
+    # Generated code lives in StorageService under this namespace; the index only keeps its hash.
+    CODE_NAMESPACE = "dedup_code"
+    CODE_EXTENSION = "py"
+    EXACT_KEY_PREFIX = "dedup:exact:"
+
+    def __init__(
+        self,
+        vector_store: VectorStore | None = None,
+        embedding_function=None,
+        storage: StorageService | None = None,
+        exact_index=None,
+    ):
         self.settings = get_settings()
+        self.vector_store = vector_store or VectorStore(embedding_function)
+        self.collection = self.vector_store.collection(self.COLLECTION_NAME)
+        self.storage = storage or storage_service
+        # Async Redis client holding normalized-request-hash -> code-hash keys.
+        if exact_index is None and self.settings.DEDUP_EXACT_INDEX_ENABLED:
+            exact_index = redis_client
+        self.exact_index = exact_index
+
+    @classmethod
+    def _exact_key(cls, query: str) -> str:
+        return cls.EXACT_KEY_PREFIX + hashlib.sha256(normalize_request(query).encode()).hexdigest()
+
+    async def _find_exact(self, query: str) -> str | None:
+        """One key lookup for a request seen before (modulo case, whitespace and URL form)."""
+        if self.exact_index is None:
+            return None
+        try:
+            code_hash = await self.exact_index.get(self._exact_key(query))
+        except Exception as e:
+            logger.warning(f"Deduplication exact index unavailable: {e}")
+            return None
+        if not code_hash:
+            return None
+        code = await run_blocking(self.storage.load_content, code_hash, self.CODE_NAMESPACE, self.CODE_EXTENSION)
+        if code:
+            logger.info("✅ Found exact match for request in cache. Reusing code.")
+        return code
 
+    async def _remember_exact(self, query: str, code_hash: str) -> None:
+        if self.exact_index is None:
+            return
         try:
-            self.client = chromadb.HttpClient(
-                host=self.settings.CHROMA_HOST,
-                port=self.settings.CHROMA_PORT
+            await self.exact_index.set(
+                self._exact_key(query), code_hash, ex=self.settings.DEDUP_EXACT_INDEX_TTL_SECONDS
             )
+        except Exception as e:
+            logger.warning(f"Failed to update deduplication exact index: {e}")
 
-            if embedding_function:
-                self.embedding_fn = embedding_function
-            else:
-                self.embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+    @staticmethod
+    def _entry_id(query: str, code_hash: str) -> str:
+        """Deterministic id, so the same request/code pair maps to one entry."""
+        return hashlib.sha256(f"{query}\x00{code_hash}".encode()).hexdigest()
 
-            self.collection = self.client.get_or_create_collection(
-                name="test_cases_v1",
-                embedding_function=self.embedding_fn,
-                metadata={"hnsw:space": "cosine"}
-            )
-        except Exception as e:
-            logger.error(f"Failed to connect to ChromaDB: {e}")
-            self.collection = None
+    def _load_code(self, metadata: dict) -> str | None:
+        code_hash = metadata.get("code_hash")
+        if code_hash:
+            return self.storage.load_content(code_hash, self.CODE_NAMESPACE, self.CODE_EXTENSION)
+        # Entries written before code was stored by reference.
+        return metadata.get("code")
 
     def find_similar(self, query: str, threshold: float = 0.3) -> str | None:
         if not self.collection:
             return None
 
+        try:
+            embedding = self.vector_store.embedder.embed([query])[0]
+        except Exception as e:
+            logger.error(f"Deduplication embedding failed: {e}", exc_info=True)
+            return None
+        return self._find_similar(embedding, threshold)
+
+    def _find_similar(self, embedding, threshold: float) -> str | None:
         try:
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=[embedding],
                 n_results=1,
                 include=["metadatas", "distances"]
             )
@@ -52,32 +125,102 @@ class DeduplicationService:
 
             distance = results["distances"][0][0]
             metadata = results["metadatas"][0][0]
-            code = metadata.get("code")
 
             logger.info(f"Deduplication search: closest distance={distance:.4f} with threshold={threshold}")
 
-            if distance < threshold and code:
+            if distance >= threshold:
+                return None
+
+            # Code is fetched only for a hit that passed the threshold.
+            code = self._load_code(metadata)
+            if code:
                 logger.info("✅ Found semantically similar request in cache. Reusing code.")
                 return code
 
+            logger.warning(f"Deduplication hit has no stored code (hash={metadata.get('code_hash')}).")
             return None
 
         except Exception as e:
             logger.error(f"Deduplication query failed: {e}", exc_info=True)
             return None
 
+    async def afind_similar(self, query: str, threshold: float = 0.3) -> str | None:
+        exact = await self._find_exact(query)
+        if exact:
+            return exact
+        # Resolving the collection is blocking I/O on first use.
+        if not await run_blocking(bool, self.collection):
+            return None
+        try:
+            # Shares the batched, memoized embedding with the concurrent lesson recall.
+            embedding = await self.vector_store.embedder.aembed_one(query)
+        except Exception as e:
+            logger.error(f"Deduplication embedding failed: {e}", exc_info=True)
+            return None
+        return await run_blocking(self._find_similar, embedding, threshold)
+
+    async def asave(self, query: str, code: str) -> None:
+        if not await run_blocking(bool, self.collection):
+            return
+        entry = await run_blocking(self._prepare_entry, query, code)
+        if entry is None:
+            return
+        entry_id, code_hash, indexed = entry
+        await self._remember_exact(query, code_hash)
+        if indexed:
+            return
+        try:
+            embedding = await self.vector_store.embedder.aembed_one(query)
+        except Exception as e:
+            logger.error(f"Failed to embed test case for vector DB: {e}", exc_info=True)
+            return
+        await run_blocking(self._save, entry_id, code_hash, query, embedding)
+
     def save(self, query: str, code: str) -> None:
         if not self.collection:
             return
 
+        entry = self._prepare_entry(query, code)
+        if entry is None:
+            return
+        entry_id, code_hash, indexed = entry
+        if indexed:
+            return
+        try:
+            embedding = self.vector_store.embedder.embed([query])[0]
+        except Exception as e:
+            logger.error(f"Failed to embed test case for vector DB: {e}", exc_info=True)
+            return
+        self._save(entry_id, code_hash, query, embedding)
+
+    def _prepare_entry(self, query: str, code: str) -> tuple[str, str, bool] | None:
+        """
+        Stores the code by content hash and returns `(entry_id, code_hash, already_indexed)`,
+        or None when storing failed.
+        """
+        try:
+            code_hash = self.storage.save_content(code, self.CODE_NAMESPACE, self.CODE_EXTENSION)
+            entry_id = self._entry_id(query, code_hash)
+            existing = self.collection.get(ids=[entry_id], include=[])
+        except Exception as e:
+            logger.error(f"Failed to prepare test case for vector DB: {e}", exc_info=True)
+            return None
+
+        indexed = bool(existing.get("ids"))
+        if indexed:
+            logger.info("Test case already in vector DB. Skipping duplicate save.")
+        return entry_id, code_hash, indexed
+
+    def _save(self, entry_id: str, code_hash: str, query: str, embedding) -> None:
         try:
-            # The document for embedding is the user's request (query)
-            # The code is stored as metadata
+            # The document for embedding is the user's request (query);
+            # the code itself stays in StorageService, referenced by hash.
             self.collection.add(
                 documents=[query],
-                metadatas=[{"code": code, "original_query": query}],
-                ids=[str(uuid.uuid4())]
+                embeddings=[embedding],
+                metadatas=[{"code_hash": code_hash, "original_query": query}],
+                ids=[entry_id]
             )
-            logger.info("Saved new test case query and code to vector DB.")
+            logger.info("Saved new test case query and code reference to vector DB.")
         except Exception as e:
             logger.error(f"Failed to save to vector DB: {e}", exc_info=True)
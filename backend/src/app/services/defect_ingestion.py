@@ -0,0 +1,280 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from src.app.core.concurrency import run_blocking
+from src.app.core.config import get_settings
+from src.app.core.database import AsyncSessionLocal
+from src.app.domain.models import Defect, DefectSyncState
+from src.app.services.defects import DefectAnalysisService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DefectBatch:
+	"""Changes since the previous cursor, plus the cursor/ETag to resume from next time."""
+
+	records: list[dict[str, Any]] = field(default_factory=list)
+	cursor: str | None = None
+	etag: str | None = None
+	not_modified: bool = False
+
+
+def normalize_defect(raw: dict[str, Any], source: str) -> dict[str, Any] | None:
+	"""Maps an exported row or tracker issue onto the `defects` table columns."""
+	description = (raw.get("description") or raw.get("summary") or raw.get("title") or "").strip()
+	if not description:
+		return None
+	component = (raw.get("component") or raw.get("components") or "General")
+	if isinstance(component, list):
+		component = ", ".join(str(c) for c in component) or "General"
+	external_id = raw.get("id") or raw.get("key") or raw.get("external_id")
+	if not external_id:
+		external_id = hashlib.sha1(f"{component}|{description}".encode()).hexdigest()
+	return {
+		"source": source,
+		"external_id": str(external_id),
+		"component": str(component).strip(),
+		"description": description,
+		"severity": (raw.get("severity") or raw.get("priority") or None),
+		"source_updated_at": raw.get("updated_at") or raw.get("updated"),
+	}
+
+
+class DefectSource(ABC):
+	"""A defect feed that can be read incrementally from an opaque cursor."""
+
+	def __init__(self, name: str):
+		self.name = name
+
+	@abstractmethod
+	async def fetch(self, cursor: str | None, etag: str | None) -> DefectBatch:
+		...
+
+
+class _AppendOnlyFileSource(DefectSource):
+	"""
+	Reads a bulk export that grows by appending. The cursor is `<inode>:<byte offset>`
+	of the last complete line consumed; a replaced or truncated file is re-read from the start.
+	"""
+
+	def __init__(self, name: str, path: str | Path):
+		super().__init__(name)
+		self.path = Path(path)
+
+	async def fetch(self, cursor: str | None, etag: str | None) -> DefectBatch:
+		return await run_blocking(self._fetch, cursor)
+
+	def _fetch(self, cursor: str | None) -> DefectBatch:
+		try:
+			stat = os.stat(self.path)
+		except FileNotFoundError:
+			logger.warning(f"DefectSource '{self.name}': {self.path} not found.")
+			return DefectBatch(cursor=cursor, not_modified=True)
+
+		inode, offset = str(stat.st_ino), 0
+		if cursor:
+			cursor_inode, _, cursor_offset = cursor.partition(":")
+			if cursor_inode == inode and int(cursor_offset or 0) <= stat.st_size:
+				offset = int(cursor_offset or 0)
+		if offset == stat.st_size:
+			return DefectBatch(cursor=f"{inode}:{offset}", not_modified=True)
+
+		with self.path.open("rb") as f:
+			header = f.readline() if offset else b""
+			f.seek(offset)
+			chunk = f.read()
+		# Only consume complete lines; a half-written tail is picked up next time.
+		complete = chunk[: chunk.rfind(b"\n") + 1]
+		records = self._parse(complete.decode("utf-8"), header.decode("utf-8"), first=offset == 0)
+		return DefectBatch(records=records, cursor=f"{inode}:{offset + len(complete)}")
+
+	@abstractmethod
+	def _parse(self, text: str, header: str, first: bool) -> list[dict[str, Any]]:
+		...
+
+
+class JsonlDefectSource(_AppendOnlyFileSource):
+	def _parse(self, text: str, header: str, first: bool) -> list[dict[str, Any]]:
+		records = []
+		for line_no, line in enumerate(text.splitlines(), start=1):
+			if not line.strip():
+				continue
+			try:
+				records.append(json.loads(line))
+			except json.JSONDecodeError:
+				logger.warning(f"DefectSource '{self.name}': Skipping invalid JSON line {line_no}.")
+		return records
+
+
+class CsvDefectSource(_AppendOnlyFileSource):
+	def _parse(self, text: str, header: str, first: bool) -> list[dict[str, Any]]:
+		if first:
+			return list(csv.DictReader(io.StringIO(text)))
+		fieldnames = next(csv.reader([header]), None)
+		return list(csv.DictReader(io.StringIO(text), fieldnames=fieldnames))
+
+
+class IssueTrackerDefectSource(DefectSource):
+	"""
+	Pages through an issue tracker's `GET {base_url}/issues?updated_since=<cursor>`.
+
+	The first page is requested with `If-None-Match`, so an unchanged tracker answers
+	`304 Not Modified` without a body.
+	"""
+
+	PAGE_SIZE = 500
+
+	def __init__(self, name: str, base_url: str, client: httpx.AsyncClient | None = None):
+		super().__init__(name)
+		self.base_url = base_url.rstrip("/")
+		self.client = client
+
+	async def fetch(self, cursor: str | None, etag: str | None) -> DefectBatch:
+		if self.client is not None:
+			return await self._fetch(self.client, cursor, etag)
+		async with httpx.AsyncClient(timeout=30.0) as client:
+			return await self._fetch(client, cursor, etag)
+
+	async def _fetch(self, client: httpx.AsyncClient, cursor: str | None, etag: str | None) -> DefectBatch:
+		batch = DefectBatch(cursor=cursor, etag=etag)
+		first_page = True
+		while True:
+			params: dict[str, Any] = {"limit": self.PAGE_SIZE}
+			if batch.cursor:
+				params["updated_since"] = batch.cursor
+			headers = {"If-None-Match": etag} if first_page and etag else {}
+			response = await client.get(f"{self.base_url}/issues", params=params, headers=headers)
+			if response.status_code == 304:
+				batch.not_modified = True
+				return batch
+			response.raise_for_status()
+			if first_page:
+				# The ETag versions the whole issue set, independent of the cursor.
+				batch.etag = response.headers.get("ETag")
+				first_page = False
+			payload = response.json()
+			batch.records.extend(payload.get("issues") or [])
+			batch.cursor = payload.get("next_cursor") or batch.cursor
+			if not payload.get("has_more"):
+				return batch
+
+
+def build_sources(specs: list[str]) -> list[DefectSource]:
+	"""Builds sources from `DEFECT_SOURCES` entries (`jsonl:<path>`, `csv:<path>`, `tracker:<url>`)."""
+	kinds = {"jsonl": JsonlDefectSource, "csv": CsvDefectSource, "tracker": IssueTrackerDefectSource}
+	sources: list[DefectSource] = []
+	for spec in specs:
+		kind, _, location = spec.partition(":")
+		source_cls = kinds.get(kind.strip().lower())
+		if source_cls is None or not location:
+			logger.warning(f"Ignoring invalid defect source '{spec}'.")
+			continue
+		sources.append(source_cls(spec, location.strip()))
+	return sources
+
+
+class DefectIngestionService:
+	"""
+	Incrementally syncs defect sources into the `defects` table and feeds the
+	in-process defect index from it.
+
+	Each source keeps its cursor/ETag in `defect_sync_state`, so a sync only reads
+	what changed; readers track the newest `ingested_at` they have applied.
+	"""
+
+	# Rows per upsert statement: 7 bind parameters each, well under Postgres' 32767 limit.
+	UPSERT_CHUNK_ROWS = 2000
+
+	def __init__(self, sources: list[DefectSource] | None = None, session_factory=AsyncSessionLocal):
+		self.sources = sources if sources is not None else build_sources(get_settings().DEFECT_SOURCES)
+		self.session_factory = session_factory
+		self._index_cursor: datetime | None = None
+
+	async def sync_source(self, source: DefectSource) -> int:
+		async with self.session_factory() as db:
+			state = await db.get(DefectSyncState, source.name)
+			batch = await source.fetch(state.cursor if state else None, state.etag if state else None)
+			if batch.not_modified and not batch.records:
+				return 0
+
+			# One row per key, last record winning: an upsert cannot touch the same row twice,
+			# and exports append updated versions of a defect.
+			by_key = {}
+			for row in (normalize_defect(r, source.name) for r in batch.records):
+				if row:
+					by_key[(row["source"], row["external_id"])] = row
+			rows = list(by_key.values())
+			now = datetime.utcnow()
+			for start in range(0, len(rows), self.UPSERT_CHUNK_ROWS):
+				chunk = rows[start:start + self.UPSERT_CHUNK_ROWS]
+				stmt = insert(Defect).values([{**row, "ingested_at": now} for row in chunk])
+				stmt = stmt.on_conflict_do_update(
+					index_elements=[Defect.source, Defect.external_id],
+					set_={
+						"component": stmt.excluded.component,
+						"description": stmt.excluded.description,
+						"severity": stmt.excluded.severity,
+						"source_updated_at": stmt.excluded.source_updated_at,
+						"ingested_at": stmt.excluded.ingested_at,
+					},
+				)
+				await db.execute(stmt)
+
+			if state is None:
+				state = DefectSyncState(source=source.name)
+				db.add(state)
+			state.cursor = batch.cursor
+			state.etag = batch.etag
+			state.synced_at = now
+			await db.commit()
+
+		logger.info(f"DefectIngestionService: '{source.name}' synced {len(rows)} defects.")
+		return len(rows)
+
+	async def sync_all(self) -> dict[str, int]:
+		stats: dict[str, int] = {}
+		for source in self.sources:
+			try:
+				stats[source.name] = await self.sync_source(source)
+			except Exception as e:
+				logger.error(f"DefectIngestionService: Sync of '{source.name}' failed: {e}", exc_info=True)
+				stats[source.name] = -1
+		return stats
+
+	async def refresh_index(self, defect_service: DefectAnalysisService) -> int:
+		"""Applies table rows written since the last refresh to `defect_service`'s index."""
+		query = select(Defect).order_by(Defect.ingested_at)
+		if self._index_cursor is not None:
+			query = query.where(Defect.ingested_at > self._index_cursor)
+		async with self.session_factory() as db:
+			result = await db.execute(query)
+			rows = result.scalars().all()
+		if not rows:
+			return 0
+		defects = [
+			{
+				"source": row.source,
+				"external_id": row.external_id,
+				"component": row.component,
+				"description": row.description,
+				"severity": row.severity,
+			}
+			for row in rows
+		]
+		await run_blocking(defect_service.apply, defects)
+		self._index_cursor = rows[-1].ingested_at
+		return len(defects)
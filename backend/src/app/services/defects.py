@@ -1,22 +1,106 @@
 import json
 import logging
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from src.app.core.config import get_settings
+from src.app.services.text_index import BM25Index, tokenize
+
 logger = logging.getLogger(__name__)
 
 
+def defect_key(defect: dict[str, Any]) -> str:
+	"""Identity of a defect: its source id when ingested, else component + description."""
+	if defect.get("source") and defect.get("external_id"):
+		return f"{defect['source']}:{defect['external_id']}"
+	return f"{defect.get('component', '')}|{defect.get('description', '')}"
+
+
+class DefectIndex(BM25Index):
+	"""
+	Inverted index over defect component and description tokens, ranked with BM25.
+
+	Component tokens are counted twice (field boost), so "calculator" in a request
+	ranks defects filed against the Calculator above ones that merely mention it.
+	Supports incremental `upsert`/`remove`, so synced changes don't rebuild it.
+	"""
+
+	COMPONENT_BOOST = 2
+
+	def __init__(self, defects: list[dict[str, Any]] | None = None):
+		super().__init__()
+		self.defects: dict[int, dict[str, Any]] = {}
+		# Optional normalized embeddings per doc; the matrix is rebuilt lazily.
+		self.vectors: dict[int, np.ndarray] = {}
+		self._matrix: tuple[list[int], np.ndarray] | None = None
+		for defect in defects or []:
+			self.upsert_defect(defect)
+
+	def upsert_defect(self, defect: dict[str, Any]) -> int:
+		terms = Counter(tokenize(defect.get("description", "")))
+		for token in tokenize(defect.get("component", "")):
+			terms[token] += self.COMPONENT_BOOST
+		doc_id = self.upsert(defect_key(defect), terms)
+		self.defects[doc_id] = defect
+		if self.vectors.pop(doc_id, None) is not None:
+			self._matrix = None
+		return doc_id
+
+	def remove(self, key: str) -> int | None:
+		doc_id = super().remove(key)
+		if doc_id is not None:
+			self.defects.pop(doc_id, None)
+			if self.vectors.pop(doc_id, None) is not None:
+				self._matrix = None
+		return doc_id
+
+	def set_vector(self, doc_id: int, vector) -> None:
+		vector = np.asarray(vector, dtype=np.float32)
+		self.vectors[doc_id] = vector / (np.linalg.norm(vector) or 1.0)
+		self._matrix = None
+
+	def search_embeddings(self, query_embedding, top_k: int, min_similarity: float) -> list[tuple[int, float]]:
+		if not self.vectors:
+			return []
+		if self._matrix is None:
+			doc_ids = list(self.vectors)
+			self._matrix = (doc_ids, np.stack([self.vectors[d] for d in doc_ids]))
+		doc_ids, matrix = self._matrix
+		query = np.asarray(query_embedding, dtype=np.float32)
+		similarities = matrix @ (query / (np.linalg.norm(query) or 1.0))
+		top = np.argsort(-similarities)[:top_k]
+		return [(doc_ids[i], float(similarities[i])) for i in top if similarities[i] >= min_similarity]
+
+
 class DefectAnalysisService:
 	"""
 	Service for analyzing historical defects and providing context for test generation.
+
+	With `DEFECTS_SOURCE="file"` the defect file is read lazily on first use and
+	re-indexed whenever its mtime changes, so new exports are picked up without a
+	restart. With `"table"` the index is fed incrementally from the synced defects
+	table (see `DefectIngestionService.refresh_index`) via `apply`.
 	"""
 
-	def __init__(self, data_path: str = "src/app/data/defects.json"):
-		self.data_path = data_path
-		self._defects = self._load_defects()
+	def __init__(self, data_path: str | Path | None = None, embedder=None, source: str | None = None):
+		self.settings = get_settings()
+		self.data_path = Path(data_path or self.settings.DEFECTS_PATH)
+		self.source = source or self.settings.DEFECTS_SOURCE
+		self.embedder = embedder
+		self._index: DefectIndex | None = None
+		self._mtime: float | None = None
+		self._checked_at = 0.0
+		self._lock = threading.Lock()
 
 	def _load_defects(self) -> list[dict[str, Any]]:
 		try:
-			with open(self.data_path) as f:
+			with open(self.data_path, encoding="utf-8") as f:
 				return json.load(f)
 		except FileNotFoundError:
 			logger.warning(f"Defects file not found at {self.data_path}")
@@ -25,24 +109,95 @@ class DefectAnalysisService:
 			logger.error(f"Invalid JSON in defects file at {self.data_path}")
 			return []
 
+	def _get_embedder(self):
+		if self.embedder is None:
+			from chromadb.utils import embedding_functions
+
+			from src.app.services.embeddings import EmbeddingService
+
+			self.embedder = EmbeddingService(embedding_functions.DefaultEmbeddingFunction())
+		return self.embedder
+
+	def _embed_into(self, index: DefectIndex, doc_ids: list[int]) -> None:
+		if not self.settings.DEFECTS_EMBEDDING_SEARCH or not doc_ids:
+			return
+		try:
+			vectors = self._get_embedder().embed(
+				[f"{index.defects[d].get('component', '')}: {index.defects[d].get('description', '')}" for d in doc_ids]
+			)
+		except Exception as e:
+			logger.warning(f"DefectAnalysisService: Embedding defects failed, using BM25 only: {e}")
+			return
+		for doc_id, vector in zip(doc_ids, vectors, strict=True):
+			index.set_vector(doc_id, vector)
+
+	def _current_index(self) -> DefectIndex:
+		if self.source == "table":
+			with self._lock:
+				if self._index is None:
+					self._index = DefectIndex()
+				return self._index
+
+		now = time.monotonic()
+		if self._index is not None and now - self._checked_at < self.settings.DEFECTS_RELOAD_CHECK_SECONDS:
+			return self._index
+		with self._lock:
+			self._checked_at = now
+			try:
+				mtime = os.stat(self.data_path).st_mtime
+			except FileNotFoundError:
+				mtime = None
+			if self._index is None or mtime != self._mtime:
+				defects = self._load_defects()
+				index = DefectIndex(defects)
+				self._embed_into(index, list(index.defects))
+				self._index = index
+				self._mtime = mtime
+				logger.info(f"DefectAnalysisService: Indexed {len(defects)} defects from {self.data_path}")
+			return self._index
+
+	def apply(self, defects: list[dict[str, Any]], removed_keys: list[str] | None = None) -> None:
+		"""Upserts synced defects into the in-process index without rebuilding it."""
+		index = self._current_index()
+		with self._lock:
+			doc_ids = [index.upsert_defect(defect) for defect in defects]
+			for key in removed_keys or []:
+				index.remove(key)
+		self._embed_into(index, doc_ids)
+
+	def search(self, query: str, top_k: int | None = None) -> list[dict[str, Any]]:
+		"""Most relevant defects for `query`, best first."""
+		index = self._current_index()
+		if not len(index):
+			return []
+		top_k = top_k or self.settings.DEFECTS_TOP_K
+		with self._lock:
+			ranked = index.search(query, top_k)
+		if index.vectors:
+			# Reciprocal rank fusion of lexical and semantic hits.
+			try:
+				semantic = index.search_embeddings(
+					self._get_embedder().embed([query])[0], top_k, self.settings.DEFECTS_EMBEDDING_MIN_SIMILARITY
+				)
+			except Exception as e:
+				logger.warning(f"DefectAnalysisService: Query embedding failed: {e}")
+				semantic = []
+			fused: dict[int, float] = {}
+			for results in (ranked, semantic):
+				for rank, (doc_id, _) in enumerate(results):
+					fused[doc_id] = fused.get(doc_id, 0.0) + 1 / (60 + rank)
+			ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+		return [index.defects[doc_id] for doc_id, _ in ranked if doc_id in index.defects]
+
 	def get_relevant_defects(self, query: str) -> str:
 		"""
 		Returns a formatted string of relevant defects based on the user query.
 		"""
-		if not self._defects:
-			return ""
-
-		req_lower = query.lower()
-		relevant_defects = [
-			d for d in self._defects
-			if d['component'].lower() in req_lower or
-				 ('api' in req_lower and 'api' in d['component'].lower()) or
-				 ('calculator' in req_lower and 'calculator' in d['component'].lower())
-		]
+		relevant_defects = self.search(query)
 
 		if not relevant_defects:
 			return ""
 
 		return "\n\n[HISTORICAL DEFECTS - COVER THESE EDGE CASES]:\n" + "\n".join(
-			[f"- {d['description']} ({d['severity']})" for d in relevant_defects]
+			[f"- {d['description']} ({d.get('severity') or 'Unknown'})" for d in relevant_defects]
 		)
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from src.app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _text_key(text: str) -> str:
+	return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingService:
+	"""
+	Shared front for the embedding model.
+
+	- Memoizes embeddings by text hash in an LRU, so the same request text is embedded once
+	(the analyst recalls lessons and looks up duplicates for the same `raw_input`).
+	- Coalesces concurrent async requests into micro-batches: requests arriving within
+	a short window (or until the batch is full) are embedded in a single model call.
+	- Runs the model only on a dedicated worker thread, keeping ONNX inference off the
+	event loop and away from the shared blocking-I/O pool.
+
+	Also callable like a Chroma embedding function (`service(texts)`).
+	"""
+
+	def __init__(
+		self,
+		embedding_function,
+		max_batch_size: int | None = None,
+		batch_window_ms: int | None = None,
+		cache_size: int | None = None,
+	):
+		settings = get_settings()
+		self.embedding_fn = embedding_function
+		self.max_batch_size = max_batch_size or settings.EMBEDDING_BATCH_MAX_SIZE
+		self.batch_window = (batch_window_ms if batch_window_ms is not None else settings.EMBEDDING_BATCH_WINDOW_MS) / 1000
+		self.cache_size = cache_size or settings.EMBEDDING_CACHE_SIZE
+
+		self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+		self._cache_lock = threading.Lock()
+		self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+
+		# Async batching state (bound to the running event loop).
+		self._loop: asyncio.AbstractEventLoop | None = None
+		self._pending: list[tuple[str, str, asyncio.Future]] = []
+		self._inflight: dict[str, asyncio.Future] = {}
+		self._waiters: dict[str, int] = {}  # callers awaiting each in-flight text
+		self._flush_handle: asyncio.TimerHandle | None = None
+
+	# --- cache ---
+
+	def _cache_get(self, key: str) -> np.ndarray | None:
+		with self._cache_lock:
+			vector = self._cache.get(key)
+			if vector is not None:
+				self._cache.move_to_end(key)
+			return vector
+
+	def _cache_put(self, key: str, vector: np.ndarray) -> None:
+		with self._cache_lock:
+			self._cache[key] = vector
+			self._cache.move_to_end(key)
+			while len(self._cache) > self.cache_size:
+				self._cache.popitem(last=False)
+
+	def _compute(self, texts: list[str]) -> list[np.ndarray]:
+		vectors = self.embedding_fn(texts)
+		return [np.asarray(v, dtype=np.float32) for v in vectors]
+
+	# --- sync API ---
+
+	def embed(self, texts: list[str]) -> list[np.ndarray]:
+		"""Embeds `texts`, computing only cache misses (in one model call)."""
+		keys = [_text_key(t) for t in texts]
+		results = [self._cache_get(k) for k in keys]
+		missing = {k: t for k, t, r in zip(keys, texts, results, strict=True) if r is None}
+		if missing:
+			vectors = self._executor.submit(self._compute, list(missing.values())).result()
+			computed = dict(zip(missing.keys(), vectors, strict=True))
+			for key, vector in computed.items():
+				self._cache_put(key, vector)
+			results = [r if r is not None else computed[k] for k, r in zip(keys, results, strict=True)]
+		return results
+
+	def __call__(self, input: list[str]) -> list[np.ndarray]:
+		return self.embed(list(input))
+
+	# --- async API ---
+
+	async def aembed(self, texts: list[str]) -> list[np.ndarray]:
+		loop = asyncio.get_running_loop()
+		if self._loop is not loop:
+			self._loop = loop
+			self._pending, self._inflight, self._waiters, self._flush_handle = [], {}, {}, None
+
+		keys = [_text_key(t) for t in texts]
+		cached: dict[str, np.ndarray] = {}
+		futures: dict[str, asyncio.Future] = {}
+		for key, text in zip(keys, texts, strict=True):
+			if key in futures or key in cached:
+				continue
+			vector = self._cache_get(key)
+			if vector is not None:
+				cached[key] = vector
+				continue
+			future = self._inflight.get(key)
+			if future is None:
+				future = loop.create_future()
+				self._inflight[key] = future
+				self._pending.append((key, text, future))
+			futures[key] = future
+
+		if self._pending:
+			if len(self._pending) >= self.max_batch_size:
+				self._flush()
+			elif self._flush_handle is None:
+				self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+		for key in futures:
+			self._waiters[key] = self._waiters.get(key, 0) + 1
+		try:
+			# Futures are shared by every caller embedding the same text: a caller that is
+			# cancelled or times out must not cancel them for the others.
+			if futures:
+				await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))
+		finally:
+			self._release(futures)
+		return [cached[k] if k in cached else futures[k].result() for k in keys]
+
+	def _release(self, futures: dict[str, asyncio.Future]) -> None:
+		"""Drops this caller's interest; texts nobody waits for any more leave the pending batch."""
+		for key, future in futures.items():
+			waiters = self._waiters.get(key, 1) - 1
+			if waiters > 0:
+				self._waiters[key] = waiters
+				continue
+			self._waiters.pop(key, None)
+			if not future.done():
+				future.cancel()
+				self._inflight.pop(key, None)
+				self._pending = [entry for entry in self._pending if entry[0] != key]
+
+	async def aembed_one(self, text: str) -> np.ndarray:
+		return (await self.aembed([text]))[0]
+
+	def _flush(self) -> None:
+		if self._flush_handle is not None:
+			self._flush_handle.cancel()
+			self._flush_handle = None
+		while self._pending:
+			batch = self._pending[: self.max_batch_size]
+			self._pending = self._pending[self.max_batch_size:]
+			asyncio.ensure_future(self._run_batch(batch))
+
+	async def _run_batch(self, batch: list[tuple[str, str, asyncio.Future]]) -> None:
+		batch = [entry for entry in batch if not entry[2].cancelled()]
+		if not batch:
+			return
+		loop = asyncio.get_running_loop()
+		try:
+			vectors: list[Any] = await loop.run_in_executor(self._executor, self._compute, [text for _, text, _ in batch])
+		except Exception as e:
+			logger.error(f"EmbeddingService: batch of {len(batch)} failed: {e}")
+			for key, _, future in batch:
+				self._inflight.pop(key, None)
+				if not future.done():
+					future.set_exception(e)
+			return
+
+		for (key, _, future), vector in zip(batch, vectors, strict=True):
+			self._cache_put(key, vector)
+			self._inflight.pop(key, None)
+			if not future.done():
+				future.set_result(vector)
+
+	def close(self) -> None:
+		self._executor.shutdown(wait=False, cancel_futures=True)
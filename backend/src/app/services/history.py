@@ -88,12 +88,12 @@ class HistoryService:
 			if plan_path_val and isinstance(plan_path_val, str):
 				# Need to import storage_service here or pass it in
 				from src.app.services.storage import storage_service
-				checkpoint_plan = storage_service.load(plan_path_val)
+				checkpoint_plan = await storage_service.aload(plan_path_val)
 
 			code_path_val = channel_values.get("generated_code_path")
 			if code_path_val and isinstance(code_path_val, str):
 				from src.app.services.storage import storage_service
-				checkpoint_code = storage_service.load(code_path_val)
+				checkpoint_code = await storage_service.aload(code_path_val)
 
 		except Exception as e:
 			logger.error(f"Error loading checkpoint for run_id {run_id}: {e}", exc_info=True)
@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_INCLUDE = ("metadatas", "documents", "distances")
+
+
+def _matches(metadata: dict[str, Any], where: dict[str, Any] | None) -> bool:
+	"""Subset of Chroma's `where` syntax: equality, `$eq`, `$ne`, `$in` and `$and`."""
+	if not where:
+		return True
+	for key, condition in where.items():
+		if key == "$and":
+			if not all(_matches(metadata, clause) for clause in condition):
+				return False
+			continue
+		value = metadata.get(key)
+		if isinstance(condition, dict):
+			for op, expected in condition.items():
+				if op == "$eq" and value != expected:
+					return False
+				if op == "$ne" and value == expected:
+					return False
+				if op == "$in" and value not in expected:
+					return False
+		elif value != condition:
+			return False
+	return True
+
+
+class LocalVectorCollection:
+	"""
+	In-process vector collection with a Chroma-compatible API.
+
+	Keeps L2-normalized embeddings in a NumPy matrix and answers queries with a
+	brute-force dot product (cosine similarity), which is sub-millisecond for the
+	collection sizes this option is meant for. Data is persisted to `<dir>/<name>/`
+	as a snapshot (`embeddings.npy` memory-mapped on reload, `records.json` for ids,
+	documents and metadata) plus `journal.jsonl`, to which each write appends only the
+	rows it changed. The journal is replayed on reload and folded into a new snapshot
+	once it holds more rows than half the collection, so writes cost O(changed rows)
+	amortized and the index survives restarts without a vector server.
+	"""
+
+	# Journaled rows below which the snapshot is never rewritten.
+	COMPACT_MIN_ROWS = 256
+
+	def __init__(self, name: str, directory: Path, embedding_fn):
+		self.name = name
+		self.path = directory / name
+		self.embedding_fn = embedding_fn
+		self._lock = threading.RLock()
+		self._ids: list[str] = []
+		self._documents: list[str | None] = []
+		self._metadatas: list[dict[str, Any]] = []
+		self._matrix: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+		self._journaled_rows = 0
+		self._load()
+
+	# --- persistence ---
+
+	def _load(self) -> None:
+		records_file = self.path / "records.json"
+		matrix_file = self.path / "embeddings.npy"
+		if records_file.exists() and matrix_file.exists():
+			try:
+				records = json.loads(records_file.read_text(encoding="utf-8"))
+				matrix = np.load(matrix_file, mmap_mode="r")
+			except (OSError, ValueError) as e:
+				logger.error(f"LocalVectorCollection: Failed to load '{self.name}' from {self.path}: {e}")
+				return
+			if len(records["ids"]) != matrix.shape[0]:
+				logger.error(f"LocalVectorCollection: '{self.name}' is inconsistent on disk. Starting empty.")
+				return
+			self._ids = records["ids"]
+			self._documents = records["documents"]
+			self._metadatas = records["metadatas"]
+			self._matrix = matrix
+		self._replay_journal()
+		if self._ids:
+			logger.info(f"LocalVectorCollection: Loaded '{self.name}' ({len(self._ids)} vectors).")
+
+	def _replay_journal(self) -> None:
+		"""Re-applies writes made since the snapshot; entries are idempotent, a torn last line is skipped."""
+		journal_file = self.path / "journal.jsonl"
+		if not journal_file.exists():
+			return
+		with open(journal_file, encoding="utf-8") as f:
+			for line in f:
+				try:
+					entry = json.loads(line)
+				except ValueError:
+					logger.warning(f"LocalVectorCollection: Skipping a torn journal entry of '{self.name}'.")
+					continue
+				vectors = np.asarray(entry["vectors"], dtype=np.float32) if entry.get("vectors") is not None else None
+				if entry["op"] == "upsert":
+					self._apply_upsert(entry["ids"], vectors, entry["documents"], entry["metadatas"])
+				elif entry["op"] == "update":
+					self._apply_update(entry["ids"], entry.get("metadatas"), entry.get("documents"), vectors)
+				elif entry["op"] == "delete":
+					self._apply_delete(entry["ids"])
+				self._journaled_rows += len(entry["ids"])
+
+	def _journal(self, op: str, ids: list[str], vectors: np.ndarray | None = None, **fields: Any) -> None:
+		self.path.mkdir(parents=True, exist_ok=True)
+		entry = {"op": op, "ids": ids, "vectors": vectors.tolist() if vectors is not None else None, **fields}
+		with open(self.path / "journal.jsonl", "a", encoding="utf-8") as f:
+			f.write(json.dumps(entry) + "\n")
+		self._journaled_rows += len(ids)
+		if self._journaled_rows > max(self.COMPACT_MIN_ROWS, len(self._ids) // 2):
+			self._persist()
+
+	def _persist(self) -> None:
+		"""Writes a full snapshot and drops the journal it supersedes."""
+		self.path.mkdir(parents=True, exist_ok=True)
+		records_tmp = self.path / "records.json.tmp"
+		matrix_tmp = self.path / "embeddings.tmp.npy"
+		records_tmp.write_text(
+			json.dumps({"ids": self._ids, "documents": self._documents, "metadatas": self._metadatas}),
+			encoding="utf-8",
+		)
+		np.save(matrix_tmp, np.ascontiguousarray(self._matrix, dtype=np.float32))
+		os.replace(matrix_tmp, self.path / "embeddings.npy")
+		os.replace(records_tmp, self.path / "records.json")
+		(self.path / "journal.jsonl").unlink(missing_ok=True)
+		self._journaled_rows = 0
+
+	# --- helpers ---
+
+	def _embed(self, texts: list[str]) -> np.ndarray:
+		vectors = np.asarray(self.embedding_fn(texts), dtype=np.float32)
+		return self._normalize(vectors)
+
+	@staticmethod
+	def _normalize(vectors: Any) -> np.ndarray:
+		vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+		norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+		norms[norms == 0] = 1.0
+		return vectors / norms
+
+	def _vectors_for(self, documents: list[str] | None, embeddings: Any | None) -> np.ndarray:
+		if embeddings is not None:
+			return self._normalize(embeddings)
+		return self._embed(documents or [])
+
+	def _selected(self, ids: list[str] | None, where: dict[str, Any] | None) -> list[int]:
+		if ids is not None:
+			wanted = set(ids)
+			rows = [i for i, rid in enumerate(self._ids) if rid in wanted]
+		else:
+			rows = range(len(self._ids))
+		return [i for i in rows if _matches(self._metadatas[i], where)]
+
+	def _append(self, ids: list[str], vectors: np.ndarray, documents: list[str | None], metadatas: list[dict]) -> None:
+		if self._matrix.size == 0:
+			self._matrix = vectors
+		else:
+			self._matrix = np.vstack([self._matrix, vectors])
+		self._ids.extend(ids)
+		self._documents.extend(documents)
+		self._metadatas.extend(metadatas)
+
+	def _apply_upsert(self, ids: list[str], vectors: np.ndarray, documents: list[str | None], metadatas: list[dict]) -> None:
+		position = {rid: i for i, rid in enumerate(self._ids)}
+		if not self._matrix.flags.writeable:
+			self._matrix = np.array(self._matrix)
+		new_rows = []
+		for n, rid in enumerate(ids):
+			if rid in position:
+				row = position[rid]
+				self._matrix[row] = vectors[n]
+				self._documents[row] = documents[n]
+				self._metadatas[row] = metadatas[n]
+			else:
+				new_rows.append(n)
+		if new_rows:
+			self._append(
+				[ids[n] for n in new_rows],
+				vectors[new_rows],
+				[documents[n] for n in new_rows],
+				[metadatas[n] for n in new_rows],
+			)
+
+	def _apply_update(self, ids: list[str], metadatas: list[dict] | None, documents: list[str] | None,
+						vectors: np.ndarray | None) -> None:
+		position = {rid: i for i, rid in enumerate(self._ids)}
+		if vectors is not None and not self._matrix.flags.writeable:
+			self._matrix = np.array(self._matrix)
+		for n, rid in enumerate(ids):
+			row = position.get(rid)
+			if row is None:
+				continue
+			if metadatas:
+				self._metadatas[row] = {**self._metadatas[row], **metadatas[n]}
+			if documents:
+				self._documents[row] = documents[n]
+			if vectors is not None:
+				self._matrix[row] = vectors[n]
+
+	def _apply_delete(self, ids: list[str]) -> None:
+		doomed = set(self._selected(ids, None))
+		if not doomed:
+			return
+		keep = [i for i in range(len(self._ids)) if i not in doomed]
+		self._matrix = np.asarray(self._matrix)[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+		self._ids = [self._ids[i] for i in keep]
+		self._documents = [self._documents[i] for i in keep]
+		self._metadatas = [self._metadatas[i] for i in keep]
+
+	# --- Chroma-compatible API ---
+
+	def count(self) -> int:
+		return len(self._ids)
+
+	def add(self, ids: list[str], documents: list[str] | None = None, metadatas: list[dict] | None = None,
+			embeddings: Any | None = None) -> None:
+		with self._lock:
+			existing = set(self._ids)
+			duplicates = [i for i in ids if i in existing]
+			if duplicates:
+				raise ValueError(f"IDs already exist in '{self.name}': {duplicates}")
+			self.upsert(ids, documents, metadatas, embeddings)
+
+	def upsert(self, ids: list[str], documents: list[str] | None = None, metadatas: list[dict] | None = None,
+				embeddings: Any | None = None) -> None:
+		with self._lock:
+			vectors = self._vectors_for(documents, embeddings)
+			documents = list(documents or [None] * len(ids))
+			metadatas = list(metadatas or [{}] * len(ids))
+			self._apply_upsert(ids, vectors, documents, metadatas)
+			self._journal("upsert", ids, vectors, documents=documents, metadatas=metadatas)
+
+	def update(self, ids: list[str], metadatas: list[dict] | None = None, documents: list[str] | None = None,
+				embeddings: Any | None = None) -> None:
+		with self._lock:
+			vectors = self._vectors_for(documents, embeddings) if (documents or embeddings is not None) else None
+			self._apply_update(ids, metadatas, documents, vectors)
+			self._journal("update", ids, vectors, metadatas=metadatas, documents=documents)
+
+	def delete(self, ids: list[str] | None = None, where: dict[str, Any] | None = None) -> None:
+		with self._lock:
+			doomed = [self._ids[i] for i in self._selected(ids, where)]
+			if not doomed:
+				return
+			self._apply_delete(doomed)
+			self._journal("delete", doomed)
+
+	def get(self, ids: list[str] | None = None, where: dict[str, Any] | None = None, limit: int | None = None,
+			include: list[str] | None = None) -> dict[str, Any]:
+		include = include or ["metadatas", "documents"]
+		with self._lock:
+			rows = self._selected(ids, where)[:limit]
+			result: dict[str, Any] = {"ids": [self._ids[i] for i in rows]}
+			if "metadatas" in include:
+				result["metadatas"] = [self._metadatas[i] for i in rows]
+			if "documents" in include:
+				result["documents"] = [self._documents[i] for i in rows]
+			if "embeddings" in include:
+				result["embeddings"] = [np.array(self._matrix[i]) for i in rows]
+			return result
+
+	def query(self, query_texts: list[str] | None = None, query_embeddings: Any | None = None, n_results: int = 10,
+				where: dict[str, Any] | None = None, include: list[str] | None = None) -> dict[str, Any]:
+		include = include or list(_DEFAULT_INCLUDE)
+		queries = self._vectors_for(query_texts, query_embeddings)
+		result: dict[str, Any] = {"ids": [], "distances": [], "metadatas": [], "documents": []}
+		with self._lock:
+			rows = np.asarray(self._selected(None, where), dtype=np.int64)
+			candidates = self._matrix[rows] if rows.size else None
+			for query in queries:
+				if candidates is None:
+					hits = []
+					similarities = np.zeros(0, dtype=np.float32)
+				else:
+					similarities = candidates @ query
+					k = min(n_results, similarities.shape[0])
+					top = np.argpartition(-similarities, k - 1)[:k]
+					hits = top[np.argsort(-similarities[top])]
+				result["ids"].append([self._ids[rows[h]] for h in hits])
+				result["distances"].append([float(1.0 - similarities[h]) for h in hits])
+				result["metadatas"].append([self._metadatas[rows[h]] for h in hits])
+				result["documents"].append([self._documents[rows[h]] for h in hits])
+		return {key: value for key, value in result.items() if key == "ids" or key in include}
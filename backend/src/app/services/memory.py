@@ -1,13 +1,19 @@
 import logging
+import threading
+import time
 import uuid
-from datetime import datetime
+import weakref
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from typing import Any
 from urllib.parse import urlparse
 
-import chromadb
-from chromadb.utils import embedding_functions
+import numpy as np
 
+from src.app.core.concurrency import run_blocking
 from src.app.core.config import get_settings
+from src.app.services.vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,40 @@ def _extract_domain(url: str | None) -> str | None:
 		return None
 
 
+def _parse_time(value: Any) -> datetime | None:
+	try:
+		return datetime.fromisoformat(value) if value else None
+	except (TypeError, ValueError):
+		return None
+
+
+@dataclass
+class _DomainLessons:
+	"""Snapshot of one domain's lessons, re-ranked in process until it expires."""
+
+	expires_at: float
+	ids: list[str]
+	metadatas: list[dict]
+	# L2-normalized embeddings; None when the domain is too large to cache.
+	matrix: np.ndarray | None
+
+
+@dataclass
+class _CollectionState:
+	"""In-process state of one lesson collection, shared by every service instance over it."""
+
+	domain_cache: dict[str, _DomainLessons] = field(default_factory=dict)
+	# Recalls since the last consolidation, which writes them to the collection.
+	hits: Counter = field(default_factory=Counter)
+	last_recalled: dict[str, str] = field(default_factory=dict)
+
+
+# The scheduler consolidates through its own service instance: it must drop the snapshots
+# the graph's instance cached and flush the hits that instance buffered.
+_collection_states: "weakref.WeakKeyDictionary[Any, _CollectionState]" = weakref.WeakKeyDictionary()
+_collection_states_lock = threading.Lock()
+
+
 class KnowledgeBaseService:
 	"""Long-term memory for QA insights.
 
@@ -31,28 +71,57 @@ class KnowledgeBaseService:
 
 	COLLECTION_NAME = "qa_insights"
 
-	def __init__(self, embedding_function=None):
+	def __init__(self, vector_store: VectorStore | None = None, embedding_function=None):
 		self.settings = get_settings()
+		self.vector_store = vector_store or VectorStore(embedding_function)
+		self.collection = self.vector_store.collection(self.COLLECTION_NAME)
+		with _collection_states_lock:
+			self._state = _collection_states.setdefault(self.collection, _CollectionState())
+		self._domain_cache = self._state.domain_cache
+		self._cache_lock = _collection_states_lock
 
-		try:
-			self.client = chromadb.HttpClient(
-				host=self.settings.CHROMA_HOST,
-				port=self.settings.CHROMA_PORT,
-			)
-
-			if embedding_function:
-				self.embedding_fn = embedding_function
+	def invalidate_cache(self, domain: str | None = None) -> None:
+		with self._cache_lock:
+			if domain is None:
+				self._domain_cache.clear()
 			else:
-				self.embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+				self._domain_cache.pop(domain, None)
 
-			self.collection = self.client.get_or_create_collection(
-				name=self.COLLECTION_NAME,
-				embedding_function=self.embedding_fn,
-				metadata={"hnsw:space": "cosine"},
-			)
-		except Exception as e:
-			logger.error(f"KnowledgeBaseService: Failed to connect to ChromaDB: {e}")
-			self.collection = None
+	def _domain_lessons(self, domain: str) -> _DomainLessons:
+		with self._cache_lock:
+			cached = self._domain_cache.get(domain)
+		if cached is not None and cached.expires_at > time.monotonic():
+			return cached
+
+		limit = self.settings.LESSON_CACHE_MAX_PER_DOMAIN
+		data = self.collection.get(where={"domain": domain}, include=["metadatas", "embeddings"], limit=limit + 1)
+		ids = list(data.get("ids") or [])
+		matrix = None
+		if len(ids) <= limit:
+			matrix = np.asarray(data.get("embeddings") if ids else np.zeros((0, 0)), dtype=np.float32)
+			if matrix.size:
+				norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+				norms[norms == 0] = 1.0
+				matrix = matrix / norms
+		entry = _DomainLessons(
+			expires_at=time.monotonic() + self.settings.LESSON_CACHE_TTL_SECONDS,
+			ids=ids,
+			metadatas=[dict(meta or {}) for meta in data.get("metadatas") or []],
+			matrix=matrix,
+		)
+		with self._cache_lock:
+			self._domain_cache[domain] = entry
+		return entry
+
+	@staticmethod
+	def _rank_locally(entry: _DomainLessons, embedding, n_results: int) -> tuple[list[str], list[dict]]:
+		if not entry.ids or entry.matrix is None or not entry.matrix.size:
+			return [], []
+		query = np.asarray(embedding, dtype=np.float32)
+		query = query / (np.linalg.norm(query) or 1.0)
+		similarities = entry.matrix @ query
+		top = np.argsort(-similarities)[:n_results]
+		return [entry.ids[i] for i in top], [entry.metadatas[i] for i in top]
 
 	def learn_lesson(self, url: str | None, original_error: str, fix_summary: str) -> None:
 		"""Persist a lesson to long-term memory."""
@@ -77,14 +146,19 @@ class KnowledgeBaseService:
 			"error": original_error[:2000],
 			"timestamp": datetime.utcnow().isoformat(),
 			"source": "auto_fix",
+			# Maintained by recall and `consolidate`.
+			"hits": 0,
+			"merged": 0,
 		}
 
 		try:
 			self.collection.add(
 				documents=[doc_text],
+				embeddings=self.vector_store.embedder.embed([doc_text]),
 				metadatas=[metadata],
 				ids=[str(uuid.uuid4())],
 			)
+			self.invalidate_cache(metadata["domain"])
 			logger.info("KnowledgeBaseService: Saved lesson to qa_insights.")
 		except Exception as e:
 			logger.error(f"KnowledgeBaseService: Failed to save lesson: {e}", exc_info=True)
@@ -94,43 +168,215 @@ class KnowledgeBaseService:
 
 		Returns a formatted context block or an empty string.
 		"""
-		if not self.collection:
-			return ""
-
 		query = (query or "").strip()
-		if not query:
+		if not self.collection or not query:
 			return ""
+		try:
+			embedding = self.vector_store.embedder.embed([query])[0]
+		except Exception as e:
+			logger.error(f"KnowledgeBaseService: Embedding failed: {e}", exc_info=True)
+			return ""
+		context, recalled = self._recall_lessons(embedding, url, n_results)
+		self._record_hits(recalled)
+		return context
 
-		where = None
+	def _recall_lessons(self, embedding, url: str | None, n_results: int) -> tuple[str, dict[str, dict]]:
+		"""Returns the context block and the recalled entries (id -> metadata) for hit counting."""
 		domain = _extract_domain(url)
+		if domain and self.settings.LESSON_RECALL_MODE == "hybrid":
+			# Pre-filter by domain once, then re-rank the cached snapshot in process.
+			try:
+				entry = self._domain_lessons(domain)
+			except Exception as e:
+				logger.error(f"KnowledgeBaseService: Domain prefetch failed: {e}", exc_info=True)
+				return "", {}
+			if entry.matrix is not None:
+				return self._format_lessons(*self._rank_locally(entry, embedding, n_results))
+
+		where = None
 		# Optional filter by domain (helps avoid cross-project pollution).
 		if domain:
 			where = {"domain": domain}
 
 		try:
 			results = self.collection.query(
-				query_texts=[query],
+				query_embeddings=[embedding],
 				n_results=n_results,
 				include=["metadatas"],
 				where=where,
 			)
 		except TypeError:
 			# Older Chroma versions may not accept `where` or `include` in server mode.
-			results = self.collection.query(query_texts=[query], n_results=n_results)
+			results = self.collection.query(query_embeddings=[embedding], n_results=n_results)
 		except Exception as e:
 			logger.error(f"KnowledgeBaseService: Query failed: {e}", exc_info=True)
-			return ""
+			return "", {}
 
-		metas = (results.get("metadatas") or [[]])[0]
+		return self._format_lessons((results.get("ids") or [[]])[0], (results.get("metadatas") or [[]])[0])
+
+	@staticmethod
+	def _format_lessons(ids: list[str], metas: list[dict]) -> tuple[str, dict[str, dict]]:
 		lessons: list[str] = []
-		for meta in metas:
+		recalled: dict[str, dict] = {}
+		for lesson_id, meta in zip(ids, metas, strict=False):
 			if not isinstance(meta, dict):
 				continue
 			lesson = (meta.get("lesson") or "").strip()
 			if lesson:
 				lessons.append(f"- {lesson}")
+				recalled[lesson_id] = meta
 
 		if not lessons:
+			return "", {}
+
+		return "\n\n[KNOWN PROJECT QUIRKS / MEMORY]:\n" + "\n".join(lessons), recalled
+
+	def _record_hits(self, recalled: dict[str, dict]) -> None:
+		"""
+		Counts recalls for consolidation, which ranks and evicts lessons by them. Buffered in
+		memory and written by `consolidate`, so recalls never write to the collection; counts
+		since the last consolidation are lost on restart.
+		"""
+		now = datetime.utcnow().isoformat()
+		with self._cache_lock:
+			self._state.hits.update(recalled.keys())
+			for lesson_id in recalled:
+				self._state.last_recalled[lesson_id] = max(self._state.last_recalled.get(lesson_id, ""), now)
+
+	def _take_hits(self) -> tuple[Counter, dict[str, str]]:
+		with self._cache_lock:
+			hits, last_recalled = self._state.hits, self._state.last_recalled
+			self._state.hits, self._state.last_recalled = Counter(), {}
+		return hits, last_recalled
+
+	def _restore_hits(self, hits: Counter, last_recalled: dict[str, str]) -> None:
+		with self._cache_lock:
+			self._state.hits.update(hits)
+			for lesson_id, recalled_at in last_recalled.items():
+				self._state.last_recalled[lesson_id] = max(self._state.last_recalled.get(lesson_id, ""), recalled_at)
+
+	async def alearn_lesson(self, url: str | None, original_error: str, fix_summary: str) -> None:
+		await run_blocking(self.learn_lesson, url, original_error, fix_summary)
+
+	async def arecall_lessons(self, query: str, url: str | None = None, n_results: int = 3) -> str:
+		query = (query or "").strip()
+		# Resolving the collection is blocking I/O on first use.
+		if not query or not await run_blocking(bool, self.collection):
 			return ""
+		try:
+			# Coalesced with the dedup lookup embedding the same `raw_input`.
+			embedding = await self.vector_store.embedder.aembed_one(query)
+		except Exception as e:
+			logger.error(f"KnowledgeBaseService: Embedding failed: {e}", exc_info=True)
+			return ""
+		context, recalled = await run_blocking(self._recall_lessons, embedding, url, n_results)
+		self._record_hits(recalled)
+		return context
+
+	def consolidate(self, now: datetime | None = None) -> dict[str, int]:
+		"""
+		Compacts the lesson memory (run periodically by the scheduler).
+
+		Per domain, lessons whose embeddings are within `LESSON_MERGE_DISTANCE` of a
+		more-recalled lesson are merged into it (hit counters summed), and lessons that
+		were never recalled within `LESSON_UNUSED_TTL_DAYS`, or not used at all within
+		`LESSON_STALE_DAYS`, are evicted. Hits buffered by recalls since the last run are
+		written first.
+		"""
+		if not self.collection:
+			return {"total": 0, "merged": 0, "evicted": 0}
+		now = now or datetime.utcnow()
+		hits, last_recalled = self._take_hits()
+		try:
+			return self._consolidate(now, hits, last_recalled)
+		except Exception:
+			self._restore_hits(hits, last_recalled)
+			raise
+
+	def _consolidate(self, now: datetime, hits: Counter, last_recalled: dict[str, str]) -> dict[str, int]:
+		stats = {"total": 0, "merged": 0, "evicted": 0}
+		data = self.collection.get(include=["metadatas", "embeddings"])
+		ids = list(data.get("ids") or [])
+		if not ids:
+			return stats
+		stats["total"] = len(ids)
+		metas = [dict(meta or {}) for meta in data["metadatas"]]
+		vectors = np.asarray(data["embeddings"], dtype=np.float32)
+		norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+		norms[norms == 0] = 1.0
+		vectors = vectors / norms
+
+		updated: dict[int, dict] = {}
+		for i, (lesson_id, meta) in enumerate(zip(ids, metas, strict=True)):
+			if "hits" not in meta:
+				# Stored before recalls were counted: age it from now, not from its creation.
+				meta["hits"] = 0
+				meta["tracked_since"] = now.isoformat()
+				updated[i] = meta
+			if hits[lesson_id]:
+				meta["hits"] = int(meta["hits"] or 0) + hits[lesson_id]
+				meta["last_recalled"] = max(meta.get("last_recalled") or "", last_recalled[lesson_id])
+				updated[i] = meta
+
+		evicted = {i for i, meta in enumerate(metas) if self._is_stale(meta, now)}
+
+		by_domain: dict[str, list[int]] = defaultdict(list)
+		for i, meta in enumerate(metas):
+			if i not in evicted:
+				by_domain[meta.get("domain") or "N/A"].append(i)
+
+		min_similarity = 1.0 - self.settings.LESSON_MERGE_DISTANCE
+		merged_away: set[int] = set()
+		for rows in by_domain.values():
+			# Most-recalled (then newest) lesson of a cluster becomes its representative.
+			rows.sort(key=lambda i: (int(metas[i].get("hits") or 0), metas[i].get("timestamp") or ""), reverse=True)
+			representatives: list[int] = []
+			for i in rows:
+				if representatives:
+					similarities = vectors[representatives] @ vectors[i]
+					best = int(np.argmax(similarities))
+					if similarities[best] >= min_similarity:
+						self._merge_into(metas[representatives[best]], metas[i])
+						updated[representatives[best]] = metas[representatives[best]]
+						merged_away.add(i)
+						continue
+				representatives.append(i)
+
+		doomed = evicted | merged_away
+		updated = {i: meta for i, meta in updated.items() if i not in doomed}
+		if updated:
+			self.collection.update(ids=[ids[i] for i in updated], metadatas=list(updated.values()))
+		if doomed:
+			self.collection.delete(ids=[ids[i] for i in doomed])
+		self.invalidate_cache()
+
+		stats["merged"] = len(merged_away)
+		stats["evicted"] = len(evicted)
+		logger.info(
+			f"KnowledgeBaseService: Consolidated {stats['total']} lessons "
+			f"(merged {stats['merged']}, evicted {stats['evicted']})."
+		)
+		return stats
+
+	async def aconsolidate(self) -> dict[str, int]:
+		return await run_blocking(self.consolidate)
+
+	@staticmethod
+	def _merge_into(target: dict, duplicate: dict) -> None:
+		target["hits"] = int(target.get("hits") or 0) + int(duplicate.get("hits") or 0)
+		target["merged"] = int(target.get("merged") or 0) + 1 + int(duplicate.get("merged") or 0)
+		for key in ("timestamp", "last_recalled"):
+			latest = max(target.get(key) or "", duplicate.get(key) or "")
+			if latest:
+				target[key] = latest
 
-		return "\n\n[KNOWN PROJECT QUIRKS / MEMORY]:\n" + "\n".join(lessons)
+	def _is_stale(self, meta: dict, now: datetime) -> bool:
+		created = _parse_time(meta.get("timestamp"))
+		if created is None:
+			return False
+		# Lessons older than recall counting are aged from when consolidation started tracking them.
+		tracked = _parse_time(meta.get("tracked_since")) or created
+		last_used = _parse_time(meta.get("last_recalled"))
+		if not int(meta.get("hits") or 0) and now - tracked > timedelta(days=self.settings.LESSON_UNUSED_TTL_DAYS):
+			return True
+		return now - (last_used or tracked) > timedelta(days=self.settings.LESSON_STALE_DAYS)
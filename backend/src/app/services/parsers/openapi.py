@@ -3,6 +3,12 @@ from typing import Any
 
 import requests
 
+from src.app.core.concurrency import run_blocking
+from src.app.core.config import get_settings
+from src.app.services.context_budget import ContextItem, context_budget
+from src.app.services.parsers.openapi_index import build_index, endpoint_line, endpoint_ranker
+from src.app.services.parsers.spec_cache import openapi_spec_cache
+
 
 class OpenAPIParser:
 	"""
@@ -11,7 +17,7 @@ class OpenAPIParser:
 	"""
 
 	@staticmethod
-	def parse(source: str, query: str | None = None) -> str:
+	def parse(source: str, query: str | None = None, max_tokens: int | None = None) -> str:
 		"""
 		Parses a URL or JSON string and returns a textual summary.
 		Query: User request to filter relevant endpoints.
@@ -28,71 +34,62 @@ class OpenAPIParser:
 			else:
 				return f"Requirements Text: {source}"
 
-			return OpenAPIParser._summarize_spec(spec, query)
+			return OpenAPIParser._summarize_spec(spec, query, max_tokens)
 
 		except Exception as e:
 			return f"Error parsing OpenAPI spec: {str(e)}. Treating input as plain text requirements: {source}"
 
 	@staticmethod
-	def _summarize_spec(spec: dict[str, Any], query: str | None = None) -> str:
+	async def aparse(source: str, query: str | None = None, max_tokens: int | None = None) -> str:
 		"""
-		Extracts Paths, Methods, and Summaries.
-		If query is provided, prioritizes endpoints containing query keywords.
+		Async variant of `parse`. Remote specs go through `openapi_spec_cache`, so a
+		known spec costs no download and no re-parsing; summarization runs off the loop.
 		"""
-		summary = ["OpenAPI Specification Summary:"]
-
-		title = spec.get("info", {}).get("title", "Unknown API")
-		summary.append(f"API Title: {title}")
-
-		paths = spec.get("paths", {})
-
-		keywords = []
-		if query:
-			keywords = [w.lower() for w in query.split() if len(w) > 3]
-
-		relevant_endpoints = []
-		other_endpoints = []
-
-		for path, methods in paths.items():
-			for method, details in methods.items():
-				if method.lower() not in ['get', 'post', 'put', 'delete', 'patch']:
-					continue
-
-				desc = details.get("summary") or details.get("description", "No description")
-
-				params = []
-				if "parameters" in details:
-					for p in details["parameters"]:
-						name = p.get("name")
-						required = "*" if p.get("required") else ""
-						params.append(f"{name}{required}")
-
-				if "requestBody" in details:
-					params.append("BODY")
-
-				param_str = f"[{', '.join(params)}]" if params else ""
-				line = f"- {method.upper()} {path} {param_str} : {desc}"
-
-				is_relevant = False
-				if keywords:
-					content_to_search = (path + " " + desc).lower()
-					if any(k in content_to_search for k in keywords):
-						is_relevant = True
-
-				if is_relevant:
-					relevant_endpoints.append(line)
-				else:
-					other_endpoints.append(line)
+		if not source.startswith("http"):
+			return await run_blocking(OpenAPIParser.parse, source, query, max_tokens)
+		url = source.split()[0]
+		try:
+			index = await openapi_spec_cache.get(url)
+		except Exception as e:
+			return f"Error parsing OpenAPI spec: {str(e)}. Treating input as plain text requirements: {source}"
+		return await run_blocking(OpenAPIParser._summarize_index, index, query, max_tokens)
 
-		final_list = relevant_endpoints
-		remaining_slots = 25 - len(final_list)
+	@staticmethod
+	def _summarize_spec(spec: dict[str, Any], query: str | None = None, max_tokens: int | None = None) -> str:
+		return OpenAPIParser._summarize_index(build_index(spec), query, max_tokens)
 
-		if remaining_slots > 0:
-			final_list.extend(other_endpoints[:remaining_slots])
+	@staticmethod
+	def _summarize_index(index: dict[str, Any], query: str | None = None, max_tokens: int | None = None) -> str:
+		"""
+		Lists the endpoints most relevant to `query` (BM25 over path, summary, tags,
+		parameters and schemas), at most `OPENAPI_TOP_K` of them, packed into `max_tokens`
+		(defaults to the source share of the window). Without matches the spec order is kept.
+		"""
+		summary = ["OpenAPI Specification Summary:"]
+		summary.append(f"API Title: {index['title']}")
+
+		endpoints = index["endpoints"]
+		top_k = get_settings().OPENAPI_TOP_K
+		ranked = endpoint_ranker.rank(index, query or "", top_k)
+		items = [ContextItem(text=endpoint_line(endpoint), score=score) for endpoint, score in ranked]
+		if len(items) < top_k:
+			# Fill the remaining slots with endpoints in spec order.
+			chosen = {id(endpoint) for endpoint, _ in ranked}
+			for endpoint in endpoints:
+				if len(items) >= top_k:
+					break
+				if id(endpoint) not in chosen:
+					items.append(ContextItem(text=endpoint_line(endpoint), score=0.0))
+
+		budget = max_tokens if max_tokens is not None else context_budget.share_of("source")
+		budget -= context_budget.counter.count("\n".join(summary))
+		final_list = context_budget.pack(items, budget)
 
 		summary.extend(final_list)
 
-		if len(relevant_endpoints) + len(other_endpoints) > 25:
-			summary.append("... (Truncated for context limit, optimized by relevance)")
+		if len(final_list) < len(endpoints):
+			summary.append(
+				f"... ({len(final_list)} of {len(endpoints)} endpoints shown; truncated for context limit, optimized by relevance)"
+			)
 
 		return "\n".join(summary)
@@ -0,0 +1,274 @@
+import hashlib
+import io
+import json
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any
+
+import yaml
+
+from src.app.services.text_index import BM25Index, tokenize
+
+logger = logging.getLogger(__name__)
+
+HTTP_METHODS = ("get", "post", "put", "delete", "patch")
+# Top-level sections `$ref`s can point into (OpenAPI 3 and Swagger 2).
+_REF_SECTIONS = ("components", "definitions", "parameters")
+_MAX_SCHEMA_FIELDS = 8
+
+
+def _parse_document(content: bytes) -> dict[str, Any]:
+	try:
+		return json.loads(content)
+	except ValueError:
+		spec = yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+		if not isinstance(spec, dict):
+			raise ValueError("Spec is neither a JSON nor a YAML object") from None
+		return spec
+
+
+def _stream_json(content: bytes) -> tuple[dict[str, Any], list[dict[str, Any]]] | None:
+	"""
+	Incremental pass over a JSON spec with `ijson` (optional dependency).
+
+	Only `info` and the `$ref` target sections are materialized; every path item is
+	reduced to compact raw endpoints as soon as it is parsed and then dropped, so the
+	full `paths` tree is never held in memory. Returns None when `ijson` is missing.
+	"""
+	try:
+		import ijson
+	except ImportError:
+		return None
+
+	sections: dict[str, Any] = {}
+	raw_endpoints: list[dict[str, Any]] = []
+	builder = None
+	builder_prefix = ""
+	current_path: str | None = None
+	for prefix, event, value in ijson.parse(io.BytesIO(content), use_float=True):
+		if builder is not None:
+			builder.event(event, value)
+			if prefix == builder_prefix and event in ("end_map", "end_array"):
+				if builder_prefix.startswith("paths."):
+					raw_endpoints.extend(_raw_endpoints(current_path, builder.value))
+				else:
+					sections[builder_prefix] = builder.value
+				builder = None
+			continue
+		if prefix == "paths" and event == "map_key":
+			current_path = value
+		elif event == "start_map" and (
+			prefix in ("info", *_REF_SECTIONS) or (current_path is not None and prefix == f"paths.{current_path}")
+		):
+			builder = ijson.ObjectBuilder()
+			builder_prefix = prefix
+			builder.event(event, value)
+	return sections, raw_endpoints
+
+
+def _raw_endpoints(path: str, item: Any) -> list[dict[str, Any]]:
+	"""Operations of one path item, keeping only what the index needs (refs unresolved)."""
+	if not isinstance(item, dict):
+		return []
+	shared_params = item.get("parameters") or []
+	endpoints = []
+	for method, details in item.items():
+		if method.lower() not in HTTP_METHODS or not isinstance(details, dict):
+			continue
+		responses = details.get("responses") or {}
+		success = next((responses[code] for code in sorted(responses, key=str) if str(code).startswith("2")), None)
+		endpoints.append({
+			"method": method.upper(),
+			"path": path,
+			"summary": details.get("summary") or details.get("description", "No description"),
+			"operation_id": details.get("operationId"),
+			"tags": list(details.get("tags") or []),
+			"parameters": [*shared_params, *(details.get("parameters") or [])],
+			"request_body": details.get("requestBody"),
+			"response": success,
+		})
+	return endpoints
+
+
+class _RefResolver:
+	def __init__(self, sections: dict[str, Any]):
+		self.sections = sections
+
+	def resolve(self, obj: Any, depth: int = 0) -> Any:
+		"""Follows local `$ref`s (`#/components/...`, `#/definitions/...`); cycles stop at depth 8."""
+		while isinstance(obj, dict) and "$ref" in obj and depth < 8:
+			obj = self._lookup(obj["$ref"])
+			depth += 1
+		return obj
+
+	def _lookup(self, ref: str) -> Any:
+		if not isinstance(ref, str) or not ref.startswith("#/"):
+			return {}
+		parts = [p.replace("~1", "/").replace("~0", "~") for p in ref[2:].split("/")]
+		node: Any = self.sections.get(parts[0], {})
+		for part in parts[1:]:
+			if not isinstance(node, dict):
+				return {}
+			node = node.get(part, {})
+		return node
+
+	def schema_summary(self, schema: Any) -> str | None:
+		"""Compact signature of a schema, e.g. `Pet{id*, name*, tag}` or `Pet[]`."""
+		if not isinstance(schema, dict):
+			return None
+		name = schema["$ref"].rsplit("/", 1)[-1] if "$ref" in schema else None
+		schema = self.resolve(schema)
+		if not isinstance(schema, dict):
+			return name
+		if schema.get("type") == "array":
+			item = self.schema_summary(schema.get("items"))
+			return f"{item or 'object'}[]"
+		properties: dict[str, Any] = dict(schema.get("properties") or {})
+		required = set(schema.get("required") or [])
+		for part in schema.get("allOf") or []:
+			part = self.resolve(part)
+			if isinstance(part, dict):
+				properties.update(part.get("properties") or {})
+				required.update(part.get("required") or [])
+		if not properties:
+			return name or schema.get("type")
+		fields = [f"{field}{'*' if field in required else ''}" for field in list(properties)[:_MAX_SCHEMA_FIELDS]]
+		if len(properties) > _MAX_SCHEMA_FIELDS:
+			fields.append("...")
+		return f"{name or ''}{{{', '.join(fields)}}}"
+
+	def content_schema(self, obj: Any) -> str | None:
+		"""Schema of a request body / response (OpenAPI 3 `content` or Swagger 2 `schema`)."""
+		obj = self.resolve(obj)
+		if not isinstance(obj, dict):
+			return None
+		if "schema" in obj:
+			return self.schema_summary(obj["schema"])
+		for media in (obj.get("content") or {}).values():
+			if isinstance(media, dict) and "schema" in media:
+				return self.schema_summary(media["schema"])
+		return None
+
+
+def _finalize(raw: dict[str, Any], resolver: _RefResolver) -> dict[str, Any]:
+	params = []
+	body = None
+	for param in raw["parameters"]:
+		param = resolver.resolve(param)
+		if not isinstance(param, dict) or not param.get("name"):
+			continue
+		if param.get("in") == "body":  # Swagger 2 body parameter
+			body = resolver.schema_summary(param.get("schema")) or "BODY"
+			continue
+		params.append(f"{param['name']}{'*' if param.get('required') else ''}")
+	if raw["request_body"] is not None:
+		body = resolver.content_schema(raw["request_body"]) or "BODY"
+	return {
+		"method": raw["method"],
+		"path": raw["path"],
+		"summary": raw["summary"],
+		"operation_id": raw["operation_id"],
+		"tags": raw["tags"],
+		"params": params,
+		"body": body,
+		"response": resolver.content_schema(raw["response"]) if raw["response"] is not None else None,
+	}
+
+
+def _index_from(sections: dict[str, Any], raw_endpoints: list[dict[str, Any]], fingerprint: str) -> dict[str, Any]:
+	resolver = _RefResolver(sections)
+	return {
+		"title": (sections.get("info") or {}).get("title", "Unknown API"),
+		"fingerprint": fingerprint,
+		"endpoints": [_finalize(raw, resolver) for raw in raw_endpoints],
+	}
+
+
+def build_index(spec: dict[str, Any]) -> dict[str, Any]:
+	"""
+	Reduces a parsed spec to the compact endpoint index the summarizer works from:
+	path, method, summary, tags, parameters and `$ref`-resolved body/response schemas.
+
+	The index is plain JSON, so it can be cached on disk and reused without
+	keeping (or re-parsing) the full spec.
+	"""
+	raw_endpoints = []
+	for path, item in (spec.get("paths") or {}).items():
+		raw_endpoints.extend(_raw_endpoints(path, item))
+	sections = {key: spec.get(key) for key in ("info", *_REF_SECTIONS) if isinstance(spec.get(key), dict)}
+	fingerprint = hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+	return _index_from(sections, raw_endpoints, fingerprint)
+
+
+def build_index_from_bytes(content: bytes) -> dict[str, Any]:
+	"""Like `build_index`, parsing JSON incrementally when possible (YAML is loaded whole)."""
+	fingerprint = hashlib.sha1(content).hexdigest()
+	if content.lstrip()[:1] in (b"{", b"["):
+		try:
+			streamed = _stream_json(content)
+		except Exception as e:
+			logger.warning(f"Streaming OpenAPI parse failed ({e}). Falling back to a full parse.")
+			streamed = None
+		if streamed is not None:
+			return _index_from(*streamed, fingerprint)
+	index = build_index(_parse_document(content))
+	index["fingerprint"] = fingerprint
+	return index
+
+
+def endpoint_line(endpoint: dict[str, Any]) -> str:
+	params = list(endpoint["params"])
+	body = endpoint.get("body")
+	if body:
+		params.append("BODY" if body is True or body == "BODY" else f"BODY {body}")
+	param_str = f"[{', '.join(params)}]" if params else ""
+	response = f" -> {endpoint['response']}" if endpoint.get("response") else ""
+	return f"- {endpoint['method']} {endpoint['path']} {param_str} : {endpoint['summary']}{response}"
+
+
+def _endpoint_terms(endpoint: dict[str, Any]) -> Counter:
+	terms = Counter(tokenize(endpoint.get("summary") or ""))
+	# Path, tags and operation id describe the resource; weight them above free text.
+	for text in (endpoint["path"], " ".join(endpoint.get("tags") or []), endpoint.get("operation_id") or ""):
+		for token in tokenize(text):
+			terms[token] += 2
+	for text in (" ".join(endpoint["params"]), endpoint.get("body") or "", endpoint.get("response") or "", endpoint["method"]):
+		if isinstance(text, str):
+			terms.update(tokenize(text))
+	return terms
+
+
+class EndpointRanker:
+	"""BM25 over endpoint indexes; the inverted index is built once per spec fingerprint."""
+
+	CACHED_SPECS = 16
+
+	def __init__(self):
+		self._indexes: OrderedDict[str, BM25Index] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def _bm25_for(self, index: dict[str, Any]) -> BM25Index:
+		key = index["fingerprint"]
+		with self._lock:
+			bm25 = self._indexes.get(key)
+			if bm25 is not None:
+				self._indexes.move_to_end(key)
+				return bm25
+		bm25 = BM25Index()
+		for n, endpoint in enumerate(index["endpoints"]):
+			bm25.upsert(str(n), _endpoint_terms(endpoint))
+		with self._lock:
+			self._indexes[key] = bm25
+			while len(self._indexes) > self.CACHED_SPECS:
+				self._indexes.popitem(last=False)
+		return bm25
+
+	def rank(self, index: dict[str, Any], query: str, top_k: int) -> list[tuple[dict[str, Any], float]]:
+		"""Top-k endpoints with a positive score, best first."""
+		if not query or not index["endpoints"]:
+			return []
+		return [(index["endpoints"][doc_id], score) for doc_id, score in self._bm25_for(index).search(query, top_k)]
+
+
+endpoint_ranker = EndpointRanker()
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from src.app.core.concurrency import run_blocking
+from src.app.core.config import get_settings
+from src.app.services.parsers.openapi_index import build_index_from_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class OpenAPISpecCache:
+	"""
+	Async loader for remote OpenAPI specs with a two-level cache of endpoint indexes.
+
+	- In memory (LRU) and on disk under `OPENAPI_CACHE_DIR/<sha256(url)>.json`, so a
+	restart doesn't re-download or re-parse known specs.
+	- Within `OPENAPI_CACHE_TTL_SECONDS` the cached index is used without any request;
+	after that the spec is revalidated with `If-None-Match`/`If-Modified-Since` and a
+	`304` keeps the index. If the server is unreachable a stale index is served.
+	"""
+
+	MEMORY_ENTRIES = 32
+	# Bumped whenever the index format changes; disk entries of other versions are misses.
+	FORMAT_VERSION = 2
+
+	def __init__(self, cache_dir: Path | None = None, ttl_seconds: int | None = None, client: httpx.AsyncClient | None = None):
+		settings = get_settings()
+		self.cache_dir = cache_dir or settings.OPENAPI_CACHE_DIR
+		self.ttl = ttl_seconds if ttl_seconds is not None else settings.OPENAPI_CACHE_TTL_SECONDS
+		self.timeout = settings.OPENAPI_FETCH_TIMEOUT_SECONDS
+		self.client = client
+		self._memory: OrderedDict[str, dict[str, Any]] = OrderedDict()
+		self._locks: dict[str, asyncio.Lock] = {}
+
+	def _path_for(self, url: str) -> Path:
+		return self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+	def _read_disk(self, url: str) -> dict[str, Any] | None:
+		try:
+			entry = json.loads(self._path_for(url).read_text(encoding="utf-8"))
+		except (OSError, ValueError):
+			return None
+		if entry.get("url") != url or entry.get("version") != self.FORMAT_VERSION:
+			return None
+		return entry
+
+	def _write_disk(self, entry: dict[str, Any]) -> None:
+		self.cache_dir.mkdir(parents=True, exist_ok=True)
+		path = self._path_for(entry["url"])
+		tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+		tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+		os.replace(tmp_path, path)
+
+	def _remember(self, entry: dict[str, Any]) -> None:
+		self._memory[entry["url"]] = entry
+		self._memory.move_to_end(entry["url"])
+		while len(self._memory) > self.MEMORY_ENTRIES:
+			self._memory.popitem(last=False)
+
+	async def get(self, url: str) -> dict[str, Any]:
+		"""Returns the endpoint index for the spec at `url` (see `build_index`)."""
+		lock = self._locks.setdefault(url, asyncio.Lock())
+		async with lock:
+			entry = self._memory.get(url) or await run_blocking(self._read_disk, url)
+			if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+				self._remember(entry)
+				return entry["index"]
+
+			try:
+				entry = await self._fetch(url, entry)
+			except Exception as e:
+				if entry is None:
+					raise
+				logger.warning(f"OpenAPISpecCache: Revalidating {url} failed ({e}). Serving cached index.")
+			self._remember(entry)
+			return entry["index"]
+
+	async def _fetch(self, url: str, cached: dict[str, Any] | None) -> dict[str, Any]:
+		headers = {}
+		if cached:
+			if cached.get("etag"):
+				headers["If-None-Match"] = cached["etag"]
+			if cached.get("last_modified"):
+				headers["If-Modified-Since"] = cached["last_modified"]
+
+		if self.client is not None:
+			response = await self.client.get(url, headers=headers, timeout=self.timeout)
+		else:
+			async with httpx.AsyncClient(follow_redirects=True) as client:
+				response = await client.get(url, headers=headers, timeout=self.timeout)
+
+		if response.status_code == 304 and cached:
+			logger.info(f"OpenAPISpecCache: {url} not modified.")
+			entry = {**cached, "fetched_at": time.time()}
+		else:
+			response.raise_for_status()
+			index = await run_blocking(build_index_from_bytes, response.content)
+			entry = {
+				"version": self.FORMAT_VERSION,
+				"url": url,
+				"etag": response.headers.get("ETag"),
+				"last_modified": response.headers.get("Last-Modified"),
+				"fetched_at": time.time(),
+				"index": index,
+			}
+			logger.info(f"OpenAPISpecCache: Indexed {len(index['endpoints'])} endpoints from {url}.")
+		await run_blocking(self._write_disk, entry)
+		return entry
+
+
+openapi_spec_cache = OpenAPISpecCache()
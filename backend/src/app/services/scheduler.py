@@ -1,14 +1,19 @@
 import logging
+from datetime import UTC, datetime
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from langgraph.graph import StateGraph
 from sqlalchemy import func
 from sqlalchemy.future import select
 
+from src.app.core.config import get_settings
 from src.app.core.database import AsyncSessionLocal
 from src.app.domain.enums import ProcessingStatus
 from src.app.domain.models import TestRun
+from src.app.services.defect_ingestion import DefectIngestionService
+from src.app.services.defects import DefectAnalysisService
 from src.app.services.executor import TestExecutorService
+from src.app.services.memory import KnowledgeBaseService
 from src.app.services.notification_service import NotificationService
 
 logger = logging.getLogger(__name__)
@@ -89,12 +94,44 @@ async def run_health_checks(agent_graph: StateGraph):
 				logger.error(f"❌ [Scheduler] An error occurred during health check for run #{run.id}: {e}", exc_info=True)
 
 
+async def consolidate_lessons(memory_service: KnowledgeBaseService):
+	"""
+	Scheduled job that merges near-duplicate lessons and evicts stale ones.
+	"""
+	logger.info("🧠 [Scheduler] Consolidating lesson memory...")
+	try:
+		stats = await memory_service.aconsolidate()
+		logger.info(f"✅ [Scheduler] Lesson memory consolidated: {stats}")
+	except Exception as e:
+		logger.error(f"❌ [Scheduler] Lesson consolidation failed: {e}", exc_info=True)
+
+
+async def sync_defects(ingestion: DefectIngestionService, defect_service: DefectAnalysisService):
+	"""
+	Scheduled job that pulls new defects from the configured sources into the defects
+	table and applies the changes to the analyst's defect index.
+	"""
+	try:
+		stats = await ingestion.sync_all()
+		if any(count > 0 for count in stats.values()):
+			logger.info(f"🐞 [Scheduler] Defect sources synced: {stats}")
+		if defect_service.source == "table":
+			await ingestion.refresh_index(defect_service)
+	except Exception as e:
+		logger.error(f"❌ [Scheduler] Defect sync failed: {e}", exc_info=True)
+
+
 class SchedulerService:
 	def __init__(self):
 		self.scheduler = AsyncIOScheduler(timezone="UTC")
 		self.agent_graph = None
 
-	def start(self, agent_graph: StateGraph):
+	def start(
+		self,
+		agent_graph: StateGraph,
+		memory_service: KnowledgeBaseService | None = None,
+		defect_sync: tuple[DefectIngestionService, DefectAnalysisService] | None = None,
+	):
 		self.agent_graph = agent_graph
 		logger.info("Starting scheduler...")
 		self.scheduler.add_job(
@@ -104,6 +141,23 @@ class SchedulerService:
 			id='test_health_check',
 			args=[self.agent_graph]
 		)
+		if memory_service is not None:
+			self.scheduler.add_job(
+				consolidate_lessons,
+				'interval',
+				hours=get_settings().LESSON_CONSOLIDATION_INTERVAL_HOURS,
+				id='lesson_consolidation',
+				args=[memory_service]
+			)
+		if defect_sync is not None:
+			self.scheduler.add_job(
+				sync_defects,
+				'interval',
+				minutes=get_settings().DEFECT_SYNC_INTERVAL_MINUTES,
+				id='defect_sync',
+				args=list(defect_sync),
+				next_run_time=datetime.now(UTC),
+			)
 		self.scheduler.start()
 		logger.info("✅ Scheduler started. Health checks will run every 6 hours.")
 
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from src.app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def plan_fingerprint(plan: str, tech_context: str = "", scenarios: list[str] | None = None) -> str:
+	"""Hash of everything the coder reads; any edit to the plan changes it."""
+	digest = hashlib.sha256()
+	for part in (plan or "", tech_context or "", *(scenarios or [])):
+		digest.update(part.encode("utf-8"))
+		digest.update(b"\x00")
+	return digest.hexdigest()
+
+
+@dataclass
+class _Speculation:
+	fingerprint: str
+	task: asyncio.Task
+	started_at: float
+
+
+class SpeculativeCoderService:
+	"""
+	Runs code generation in the background while the graph waits for human approval.
+
+	Results are keyed by run and plan fingerprint: on approval the coder node takes the
+	result if the plan was not edited, otherwise the speculative work is discarded.
+	"""
+
+	def __init__(self, ttl_seconds: int | None = None):
+		settings = get_settings()
+		self.enabled = settings.SPECULATIVE_CODER_ENABLED
+		self.ttl_seconds = ttl_seconds or settings.SPECULATIVE_CODER_TTL_SECONDS
+		self._speculations: dict[str, _Speculation] = {}
+
+	def start(self, run_id: Any, fingerprint: str, factory: Callable[[], Awaitable[Any]]) -> bool:
+		"""Schedules `factory()` for the run. Returns False when speculation is disabled."""
+		if not self.enabled:
+			return False
+		self._evict_expired()
+		self.discard(run_id)
+
+		task = asyncio.create_task(factory())
+		task.add_done_callback(self._log_failure)
+		self._speculations[str(run_id)] = _Speculation(fingerprint, task, time.monotonic())
+		logger.info(f"⚡ [Speculation] Started background generation for run {run_id}.")
+		return True
+
+	async def take(self, run_id: Any, fingerprint: str) -> Any | None:
+		"""Returns the speculative result for an unchanged plan, or None.
+
+		If generation is still running it is awaited: it started earlier than a fresh
+		call would, so waiting is never slower.
+		"""
+		speculation = self._speculations.pop(str(run_id), None)
+		if speculation is None:
+			return None
+		if speculation.fingerprint != fingerprint:
+			logger.info(f"⚡ [Speculation] Plan for run {run_id} was edited. Discarding speculative result.")
+			speculation.task.cancel()
+			return None
+		try:
+			result = await speculation.task
+		except (asyncio.CancelledError, Exception) as e:
+			logger.warning(f"⚡ [Speculation] Background generation for run {run_id} failed: {e!r}")
+			return None
+		logger.info(f"⚡ [Speculation] Reusing speculative result for run {run_id}.")
+		return result
+
+	def discard(self, run_id: Any) -> None:
+		speculation = self._speculations.pop(str(run_id), None)
+		if speculation is not None and not speculation.task.done():
+			speculation.task.cancel()
+
+	def _evict_expired(self) -> None:
+		now = time.monotonic()
+		for run_id, speculation in list(self._speculations.items()):
+			if now - speculation.started_at > self.ttl_seconds:
+				logger.info(f"⚡ [Speculation] Run {run_id} was not approved in time. Discarding.")
+				self.discard(run_id)
+
+	@staticmethod
+	def _log_failure(task: asyncio.Task) -> None:
+		if not task.cancelled() and task.exception() is not None:
+			logger.warning(f"⚡ [Speculation] Background generation failed: {task.exception()!r}")
+
+
+speculative_coder = SpeculativeCoderService()
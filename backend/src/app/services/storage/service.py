@@ -1,8 +1,10 @@
+import hashlib
 import json
 import uuid
 from pathlib import Path
 from typing import Any
 
+from src.app.core.concurrency import run_blocking
 from src.app.core.config import get_settings
 
 
@@ -36,6 +38,31 @@ class StorageService:
             json.dump(data, f, indent=2)
         return str(path)
 
+    def save_content(self, data: str, namespace: str, extension: str = "txt") -> str:
+        """
+        Content-addressed save: the file is named by the SHA-256 of `data`, so
+        identical content is written once. Returns the hex digest.
+        """
+        digest = hashlib.sha256(data.encode("utf-8")).hexdigest()
+        path = self._content_path(digest, namespace, extension)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            tmp_path.write_text(data, encoding="utf-8")
+            tmp_path.replace(path)
+        return digest
+
+    def load_content(self, digest: str, namespace: str, extension: str = "txt") -> str | None:
+        """Loads content saved with `save_content`, or None if it is missing."""
+        path = self._content_path(digest, namespace, extension)
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _content_path(self, digest: str, namespace: str, extension: str) -> Path:
+        return self.base_path / namespace / digest[:2] / f"{digest}.{extension}"
+
     def load(self, path: str) -> str:
         """Loads text data from the given relative path."""
         full_path = self.base_path / path
@@ -52,5 +79,17 @@ class StorageService:
         with full_path.open("r", encoding="utf-8") as f:
             return json.load(f)
 
+    async def asave(self, data: str | bytes, run_id: int | str, extension: str = "txt") -> str:
+        return await run_blocking(self.save, data, run_id, extension)
+
+    async def asave_json(self, data: Any, run_id: int | str) -> str:
+        return await run_blocking(self.save_json, data, run_id)
+
+    async def aload(self, path: str) -> str:
+        return await run_blocking(self.load, path)
+
+    async def aload_json(self, path: str) -> Any:
+        return await run_blocking(self.load_json, path)
+
 
 storage_service = StorageService()
@@ -11,6 +11,7 @@ from langgraph.types import StateSnapshot
 from src.app.api.models import ChatMessageRequest, ApprovalRequest
 from src.app.domain.enums import ProcessingStatus
 from src.app.services.history import HistoryService
+from src.app.services.speculation import speculative_coder
 from src.app.services.storage import storage_service
 
 logger = logging.getLogger(__name__)
@@ -85,7 +86,7 @@ class StreamingService:
 
 					# Handle Logs
 					if "log_path" in state_update and state_update["log_path"]:
-						log_content = storage_service.load(state_update["log_path"])
+						log_content = await storage_service.aload(state_update["log_path"])
 						data = json.dumps({"type": "log", "content": log_content})
 						yield f"data: {data}\n\n"
 
@@ -99,13 +100,13 @@ class StreamingService:
 
 					# Handle Plan Updates
 					if "test_plan_path" in state_update and state_update["test_plan_path"]:
-						plan_content = storage_service.load(state_update["test_plan_path"])
+						plan_content = await storage_service.aload(state_update["test_plan_path"])
 						data = json.dumps({"type": "plan", "content": plan_content})
 						yield f"data: {data}\n\n"
 
 					# Handle Code Updates
 					if "generated_code_path" in state_update and state_update["generated_code_path"]:
-						code_content = storage_service.load(state_update["generated_code_path"])
+						code_content = await storage_service.aload(state_update["generated_code_path"])
 						data = json.dumps({"type": "code", "content": code_content})
 						yield f"data: {data}\n\n"
 
@@ -163,8 +164,10 @@ class StreamingService:
 		# Optional: update the plan before resuming.
 		if request_body.feedback and request_body.feedback.strip():
 			run_id = request_body.run_id
+			# The edited plan invalidates any speculative generation for the draft.
+			speculative_coder.discard(run_id)
 			# Save feedback to a file and update the path in LangGraph
-			feedback_path = storage_service.save(request_body.feedback.strip(), run_id, "md")
+			feedback_path = await storage_service.asave(request_body.feedback.strip(), run_id, "md")
 
 			# Update the persisted History row with the new plan path
 			await self.history_service.update_run(
@@ -195,7 +198,7 @@ class StreamingService:
 						continue
 
 					if "log_path" in state_update and state_update["log_path"]:
-						log_content = storage_service.load(state_update["log_path"])
+						log_content = await storage_service.aload(state_update["log_path"])
 						data = json.dumps({"type": "log", "content": log_content})
 						yield f"data: {data}\n\n"
 
@@ -207,12 +210,12 @@ class StreamingService:
 							sent_messages.add(last_message.id)
 
 					if "test_plan_path" in state_update and state_update["test_plan_path"]:
-						plan_content = storage_service.load(state_update["test_plan_path"])
+						plan_content = await storage_service.aload(state_update["test_plan_path"])
 						data = json.dumps({"type": "plan", "content": plan_content})
 						yield f"data: {data}\n\n"
 
 					if "generated_code_path" in state_update and state_update["generated_code_path"]:
-						code_content = storage_service.load(state_update["generated_code_path"])
+						code_content = await storage_service.aload(state_update["generated_code_path"])
 						data = json.dumps({"type": "code", "content": code_content})
 						yield f"data: {data}\n\n"
 
@@ -0,0 +1,87 @@
+import math
+import re
+from collections import Counter
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_STOPWORDS = frozenset({
+	"a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+	"the", "to", "when", "with", "test", "tests", "check", "write",
+	"и", "в", "во", "на", "с", "со", "по", "для", "не", "что", "как", "к", "о", "из", "у", "за",
+	"тест", "тесты", "проверь", "проверить", "напиши", "написать",
+})
+
+
+def tokenize(text: str) -> list[str]:
+	"""Lowercased word tokens without stopwords; camelCase and snake_case identifiers are split."""
+	text = _CAMEL_RE.sub(" ", text or "").replace("_", " ")
+	return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+class BM25Index:
+	"""
+	Inverted index with Okapi BM25 ranking over keyed documents.
+
+	Documents are term counters (callers weight fields by repeating tokens). Supports
+	incremental `upsert`/`remove`; IDF and average length are derived at query time.
+	"""
+
+	K1 = 1.5
+	B = 0.75
+
+	def __init__(self):
+		self.postings: dict[str, dict[int, int]] = {}
+		self._terms: dict[int, Counter] = {}
+		self._lengths: dict[int, int] = {}
+		self._ids: dict[str, int] = {}
+		self._next_id = 0
+		self._total_length = 0
+
+	def __len__(self) -> int:
+		return len(self._ids)
+
+	def upsert(self, key: str, terms: Counter) -> int:
+		doc_id = self._ids.get(key)
+		if doc_id is None:
+			doc_id = self._next_id
+			self._next_id += 1
+			self._ids[key] = doc_id
+		else:
+			self._unindex(doc_id)
+		self._terms[doc_id] = terms
+		self._lengths[doc_id] = sum(terms.values())
+		self._total_length += self._lengths[doc_id]
+		for token, tf in terms.items():
+			self.postings.setdefault(token, {})[doc_id] = tf
+		return doc_id
+
+	def remove(self, key: str) -> int | None:
+		doc_id = self._ids.pop(key, None)
+		if doc_id is not None:
+			self._unindex(doc_id)
+		return doc_id
+
+	def _unindex(self, doc_id: int) -> None:
+		terms = self._terms.pop(doc_id, Counter())
+		self._total_length -= self._lengths.pop(doc_id, 0)
+		for token in terms:
+			posting = self.postings.get(token)
+			if posting is not None:
+				posting.pop(doc_id, None)
+				if not posting:
+					del self.postings[token]
+
+	def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+		"""Returns up to `top_k` `(doc_id, score)` pairs with a positive BM25 score."""
+		n = len(self._ids)
+		avg_length = (self._total_length / n) if n else 1.0
+		scores: dict[int, float] = {}
+		for token in set(tokenize(query)):
+			posting = self.postings.get(token)
+			if not posting:
+				continue
+			idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+			for doc_id, tf in posting.items():
+				norm = self.K1 * (1 - self.B + self.B * self._lengths[doc_id] / (avg_length or 1.0))
+				scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+		return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
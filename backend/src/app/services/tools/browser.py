@@ -9,6 +9,8 @@ from playwright.async_api import (
     async_playwright,
 )
 
+from src.app.services.context_budget import ContextItem, context_budget, keyword_score
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,7 +54,13 @@ class WebInspector:
     Uses a shared browser instance for efficiency.
     """
 
-    async def inspect_page(self, url: str) -> str:
+    INTERACTIVE_TAGS = ("button", "a", "input", "select", "textarea", "label")
+
+    async def inspect_page(self, url: str, query: str | None = None, max_tokens: int | None = None) -> str:
+        """
+        Returns the semantic DOM of `url`, ranked by locator usefulness and relevance
+        to `query`, packed into `max_tokens` (defaults to the vision share of the window).
+        """
         logger.info(f"WebInspector: Visiting {url}...")
         try:
             browser = await BrowserManager.get_browser()
@@ -70,7 +78,7 @@ class WebInspector:
                     logger.warning(f"Timeout visiting {url}, extracting what loaded.")
 
                 content = await page.content()
-                structure = self._parse_html_to_context(content)
+                structure = self._parse_html_to_context(content, query=query, max_tokens=max_tokens)
             finally:
                 await context.close()
 
@@ -80,7 +88,7 @@ class WebInspector:
             logger.error(f"Inspection failed: {e}", exc_info=True)
             return f"Error inspecting {url}: {str(e)}"
 
-    def _parse_html_to_context(self, html: str) -> str:
+    def _parse_html_to_context(self, html: str, query: str | None = None, max_tokens: int | None = None) -> str:
         soup = BeautifulSoup(html, "html.parser")
 
         elements = []
@@ -112,9 +120,24 @@ class WebInspector:
             if elem_info and len(elem_info) < 200:  # Skip huge blobs
                 elements.append(elem_info)
 
-        # Deduplicate and Format
-        unique_elements = sorted(list(set(elements)))
-        return "\n".join(unique_elements[:150])  # Limit context window
+        # Deduplicate, rank and pack into the vision budget
+        unique_elements = sorted(set(elements))
+        budget = max_tokens if max_tokens is not None else context_budget.share_of("vision")
+        items = [ContextItem(text=e, score=self._score_element(e, query)) for e in unique_elements]
+        return "\n".join(context_budget.pack(items, budget))
+
+    def _score_element(self, element: str, query: str | None) -> float:
+        """Stable locators first (testid > id > name), interactive tags next, then relevance."""
+        score = 0.0
+        if "data-testid=" in element:
+            score += 3.0
+        if " id=" in element:
+            score += 2.0
+        if "name=" in element or "placeholder=" in element or "role=" in element:
+            score += 1.0
+        if element.startswith(tuple(f"<{t} " for t in self.INTERACTIVE_TAGS)):
+            score += 1.0
+        return score + 2.0 * keyword_score(element, query)
 
     def _get_element_info(self, tag, include_text=True) -> str:
         name = tag.name
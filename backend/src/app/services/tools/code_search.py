@@ -0,0 +1,406 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from src.app.core.config import get_settings
+from src.app.services.code_analysis.scanner import is_ignored_dir
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+_MAX_LINE_CHARS = 200
+_MAX_HITS_PER_FILE = 10
+_BINARY_SNIFF_BYTES = 8192
+
+# Definition sites per language family; the first pattern matching a line wins.
+_JS_SYMBOLS = [
+	("class", r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(\w+)"),
+	("function", r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(\w+)"),
+	("function", r"^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|\w+\s*=>)"),
+	("interface", r"^\s*(?:export\s+)?interface\s+(\w+)"),
+	("type", r"^\s*(?:export\s+)?type\s+(\w+)\s*="),
+	("constant", r"^\s*(?:export\s+)?const\s+(\w+)\s*="),
+	("method", r"^\s+(?:(?:public|private|protected|static|async|readonly|override|get|set)\s+)*(\w+)\s*\([^)]*\)\s*(?::\s*[^{;]+)?\{"),
+]
+_JVM_SYMBOLS = [
+	("class", r"^\s*(?:[\w@]+\s+)*(?:class|interface|enum|record|object)\s+(\w+)"),
+	("function", r"^\s*(?:[\w@]+\s+)*fun\s+(?:<[^>]+>\s*)?(?:[\w.]+\.)?(\w+)\s*\("),
+	("method", r"^\s+(?:(?:public|private|protected|static|final|abstract|synchronized|default)\s+)+[\w<>\[\],.? ]+\s+(\w+)\s*\("),
+]
+_SYMBOL_PATTERNS = {
+	".py": [
+		("class", r"^\s*class\s+(\w+)"),
+		("function", r"^\s*(?:async\s+)?def\s+(\w+)"),
+		("constant", r"^([A-Z][A-Z0-9_]*)\s*(?::[^=]+)?="),
+	],
+	".go": [
+		("function", r"^func\s+(?:\([^)]*\)\s*)?(\w+)"),
+		("type", r"^type\s+(\w+)"),
+	],
+	".java": _JVM_SYMBOLS,
+	".kt": _JVM_SYMBOLS,
+	**{ext: _JS_SYMBOLS for ext in (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")},
+}
+_COMPILED_SYMBOLS = {
+	ext: [(kind, re.compile(pattern)) for kind, pattern in patterns] for ext, patterns in _SYMBOL_PATTERNS.items()
+}
+_NOT_SYMBOLS = frozenset({"if", "for", "while", "switch", "catch", "return", "function", "new", "else", "super", "this"})
+# Arguments of escapes that take them (`\x41`, `\u00e9`, `\N{...}`, octal, group references).
+_ESCAPE_ARGUMENT_RE = re.compile(r"x[0-9a-fA-F]{0,2}|u[0-9a-fA-F]{0,4}|U[0-9a-fA-F]{0,8}|N\{[^}]*\}?|\d+")
+
+
+@dataclass(slots=True)
+class SearchHit:
+	path: str
+	line: int
+	text: str
+	kind: str = ""
+
+
+def _trigrams(data: bytes) -> np.ndarray:
+	"""Distinct case-folded byte trigrams of `data` as sorted uint32 keys."""
+	if len(data) < 3:
+		return np.zeros(0, dtype=np.uint32)
+	b = np.frombuffer(data.lower(), dtype=np.uint8).astype(np.uint32)
+	return np.unique((b[:-2] << 16) | (b[1:-1] << 8) | b[2:])
+
+
+def _class_end(pattern: str, start: int) -> int:
+	"""Index of the `]` closing the character class opened at `start`, or -1."""
+	i = start + 1
+	if i < len(pattern) and pattern[i] == "^":
+		i += 1
+	if i < len(pattern) and pattern[i] == "]":  # a leading `]` is a member
+		i += 1
+	while i < len(pattern):
+		if pattern[i] == "\\":
+			i += 2
+			continue
+		if pattern[i] == "]":
+			return i
+		i += 1
+	return -1
+
+
+def _required_literals(pattern: str) -> list[str] | None:
+	"""
+	Literal runs (3+ ASCII chars) every match of regex `pattern` must contain, used to pick
+	candidate files from the trigram postings. None when the pattern cannot be narrowed
+	down this way (alternations, optional groups, `(?...)` extensions such as lookarounds,
+	named groups and inline flags); the caller then scans every file.
+	"""
+	if "|" in pattern or "(?" in pattern or re.search(r"\)[?*{]", pattern):
+		return None
+	runs: list[str] = []
+	current: list[str] = []
+
+	def flush():
+		if current:
+			runs.append("".join(current))
+			current.clear()
+
+	i = 0
+	while i < len(pattern):
+		ch = pattern[i]
+		if ch == "\\" and i + 1 < len(pattern):
+			escaped = pattern[i + 1]
+			if escaped.isalnum():  # \d, \w, \b, \x41... are classes, assertions or encoded chars
+				flush()
+				argument = _ESCAPE_ARGUMENT_RE.match(pattern, i + 1)
+				i += 1 + (len(argument.group()) if argument else 1)
+			else:
+				current.append(escaped)
+				i += 2
+			continue
+		if ch in "?*{":  # the previous character is optional
+			if current:
+				current.pop()
+			flush()
+			if ch == "{":
+				end = pattern.find("}", i)
+				i = end + 1 if end != -1 else len(pattern)
+				continue
+		elif ch == "[":
+			flush()
+			end = _class_end(pattern, i)
+			i = end + 1 if end != -1 else len(pattern)
+			continue
+		elif ch in ".^$+()":
+			flush()
+		else:
+			current.append(ch)
+		i += 1
+	flush()
+	return [run for run in runs if len(run) >= 3 and run.isascii()]
+
+
+def _symbols_in(path: str, text: str) -> list[tuple[str, int, str]]:
+	patterns = _COMPILED_SYMBOLS.get(os.path.splitext(path)[1])
+	if not patterns:
+		return []
+	symbols = []
+	for line_number, line in enumerate(text.splitlines(), 1):
+		for kind, regex in patterns:
+			match = regex.match(line)
+			if match and match.group(1) not in _NOT_SYMBOLS:
+				symbols.append((match.group(1), line_number, kind))
+				break
+	return symbols
+
+
+class CodeSearchIndex:
+	"""
+	Trigram and symbol index of one repository snapshot (a commit), stored on disk.
+
+	Layout of the index directory:
+	`content.npy` (all indexed files concatenated), `trigrams.npy` (sorted case-folded
+	trigram keys), `offsets.npy`/`postings.npy` (file ids per trigram), `meta.json` (file
+	paths and their spans in `content.npy`) and `symbols.json` (definition sites by name).
+	The arrays are memory-mapped, so opening an index is cheap and searches only touch
+	the postings of the query's trigrams and the candidate files' bytes.
+	"""
+
+	def __init__(self, index_dir: Path):
+		meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+		if meta.get("version") != INDEX_VERSION:
+			raise ValueError(f"Unsupported code search index version in {index_dir}")
+		self.index_dir = index_dir
+		self.files: list[tuple[str, int, int]] = [tuple(f) for f in meta["files"]]
+		self._content = np.load(index_dir / "content.npy", mmap_mode="r")
+		self._keys = np.load(index_dir / "trigrams.npy", mmap_mode="r")
+		self._offsets = np.load(index_dir / "offsets.npy", mmap_mode="r")
+		self._postings = np.load(index_dir / "postings.npy", mmap_mode="r")
+		self.symbols: dict[str, list[list[int | str]]] = json.loads((index_dir / "symbols.json").read_text(encoding="utf-8"))
+
+	@classmethod
+	def build(cls, root: Path, index_dir: Path, max_file_bytes: int) -> "CodeSearchIndex":
+		"""Indexes the tracked text files under `root` into `index_dir` (written atomically)."""
+		tmp_dir = index_dir.with_name(f"{index_dir.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+		shutil.rmtree(tmp_dir, ignore_errors=True)
+		tmp_dir.mkdir(parents=True)
+
+		files: list[tuple[str, int, int]] = []
+		symbols: dict[str, list[list[int | str]]] = {}
+		chunks: list[bytes] = []
+		file_keys: list[np.ndarray] = []
+		position = 0
+		for path in cls._list_files(root):
+			try:
+				data = (root / path).read_bytes()
+			except OSError:
+				continue
+			if len(data) > max_file_bytes or b"\0" in data[:_BINARY_SNIFF_BYTES]:
+				continue
+			file_id = len(files)
+			files.append((path, position, len(data)))
+			chunks.append(data)
+			position += len(data)
+			file_keys.append(_trigrams(data))
+			for name, line, kind in _symbols_in(path, data.decode("utf-8", errors="ignore")):
+				symbols.setdefault(name, []).append([file_id, line, kind])
+
+		if file_keys:
+			keys = np.concatenate(file_keys)
+			owners = np.repeat(np.arange(len(file_keys), dtype=np.uint32), [len(k) for k in file_keys])
+			order = np.argsort(keys, kind="stable")  # stable: file ids stay ascending within a trigram
+			keys, owners = keys[order], owners[order]
+			unique, starts = np.unique(keys, return_index=True)
+		else:
+			unique, starts, owners = np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint32)
+		offsets = np.append(starts, len(owners)).astype(np.int64)
+
+		np.save(tmp_dir / "content.npy", np.frombuffer(b"".join(chunks), dtype=np.uint8))
+		np.save(tmp_dir / "trigrams.npy", unique.astype(np.uint32))
+		np.save(tmp_dir / "offsets.npy", offsets)
+		np.save(tmp_dir / "postings.npy", owners.astype(np.uint32))
+		(tmp_dir / "symbols.json").write_text(json.dumps(symbols), encoding="utf-8")
+		(tmp_dir / "meta.json").write_text(json.dumps({"version": INDEX_VERSION, "files": files}), encoding="utf-8")
+
+		try:
+			os.replace(tmp_dir, index_dir)
+		except OSError:
+			shutil.rmtree(tmp_dir, ignore_errors=True)  # another process finished the same index first
+		logger.info(f"CodeSearchIndex: Indexed {len(files)} files of {root} ({position} bytes, {len(unique)} trigrams).")
+		return cls(index_dir)
+
+	@staticmethod
+	def _list_files(root: Path) -> list[str]:
+		"""Files tracked by git (so .gitignore is honoured); a directory walk for non-git trees."""
+		try:
+			listed = subprocess.run(
+				["git", "ls-files", "-z"], cwd=root, check=True, capture_output=True, timeout=60,
+			).stdout.decode("utf-8", errors="ignore")
+			return sorted(path for path in listed.split("\0") if path)
+		except (subprocess.SubprocessError, OSError):
+			paths = []
+			for current, dirs, names in os.walk(root):
+				dirs[:] = sorted(d for d in dirs if not is_ignored_dir(d))
+				relative = os.path.relpath(current, root)
+				paths.extend(os.path.normpath(os.path.join(relative, n)).replace(os.sep, "/") for n in names)
+			return sorted(paths)
+
+	# --- lookups ---
+
+	def _text(self, file_id: int) -> str:
+		_, start, length = self.files[file_id]
+		return self._content[start:start + length].tobytes().decode("utf-8", errors="ignore")
+
+	def _files_with(self, literal: str) -> np.ndarray:
+		"""Ids of files containing every trigram of `literal` (case-insensitive)."""
+		candidates = None
+		for key in _trigrams(literal.encode()):
+			i = int(np.searchsorted(self._keys, key))
+			if i >= len(self._keys) or self._keys[i] != key:
+				return np.zeros(0, dtype=np.uint32)
+			posting = self._postings[int(self._offsets[i]):int(self._offsets[i + 1])]
+			candidates = posting if candidates is None else np.intersect1d(candidates, posting, assume_unique=True)
+			if not len(candidates):
+				break
+		return candidates if candidates is not None else np.arange(len(self.files), dtype=np.uint32)
+
+	def _candidates(self, literals: list[str] | None) -> list[int]:
+		if not literals:
+			return list(range(len(self.files)))
+		candidates = None
+		for literal in literals:
+			ids = self._files_with(literal)
+			candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+		return [int(i) for i in candidates]
+
+	def _grep(self, regex: re.Pattern, file_ids: list[int], skip: set[tuple[int, int]] | None = None) -> dict[int, list[SearchHit]]:
+		"""Matching lines per file (at most _MAX_HITS_PER_FILE each); `(file id, line)` pairs in `skip` are left out."""
+		skip = skip or set()
+		hits: dict[int, list[SearchHit]] = {}
+		for file_id in file_ids:
+			text = self._text(file_id)
+			line_number, line_start = 1, 0
+			for match in regex.finditer(text):
+				line_number += text.count("\n", line_start, match.start())
+				line_start = text.rfind("\n", 0, match.start()) + 1
+				if (file_id, line_number) in skip:
+					continue
+				file_hits = hits.setdefault(file_id, [])
+				if file_hits and file_hits[-1].line == line_number:
+					continue
+				line_end = text.find("\n", match.start())
+				line = text[line_start:line_end if line_end != -1 else len(text)].strip()
+				file_hits.append(SearchHit(self.files[file_id][0], line_number, line[:_MAX_LINE_CHARS]))
+				if len(file_hits) >= _MAX_HITS_PER_FILE:
+					break
+		return hits
+
+	def search(self, pattern: str) -> list[SearchHit]:
+		"""Case-insensitive regex search (a literal when `pattern` is not a valid regex), best files first."""
+		try:
+			regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+			literals = _required_literals(pattern)
+		except re.error:
+			regex = re.compile(re.escape(pattern), re.IGNORECASE)
+			literals = [pattern] if len(pattern) >= 3 and pattern.isascii() else None
+		hits = self._grep(regex, self._candidates(literals))
+		# Files where the query also matches with its exact case and on a definition rank first.
+		defined = self.files_defining(pattern)
+		ranked = sorted(hits.items(), key=lambda item: (
+			item[0] not in defined,
+			-sum(pattern in h.text for h in item[1]),
+			-len(item[1]),
+			item[1][0].path,
+		))
+		return [hit for _, file_hits in ranked for hit in file_hits]
+
+	def files_defining(self, name: str) -> set[int]:
+		return {int(site[0]) for site in self.symbols.get(name, [])}
+
+	def find_symbol(self, name: str) -> list[SearchHit]:
+		"""Definition sites: exact name, then case-insensitive, prefix and substring matches."""
+		needle = name.lower()
+
+		def tier(symbol: str) -> int:
+			if symbol == name:
+				return 0
+			lowered = symbol.lower()
+			if lowered == needle:
+				return 1
+			if lowered.startswith(needle):
+				return 2
+			return 3 if needle in lowered else 4
+
+		matches = sorted((tier(symbol), len(symbol), symbol) for symbol in self.symbols if needle and needle in symbol.lower())
+		hits = []
+		texts: dict[int, list[str]] = {}
+		for _, _, symbol in matches:
+			for file_id, line, kind in sorted(self.symbols[symbol], key=lambda site: self.files[site[0]][0]):
+				lines = texts.get(file_id)
+				if lines is None:
+					lines = texts[file_id] = self._text(file_id).splitlines()
+				text = lines[line - 1].strip() if line <= len(lines) else symbol
+				hits.append(SearchHit(self.files[file_id][0], line, text[:_MAX_LINE_CHARS], kind))
+		return hits
+
+	def find_references(self, name: str) -> list[SearchHit]:
+		"""Whole-word, case-sensitive uses of `name` outside its definitions; files with most uses first."""
+		if not name:
+			return []
+		definitions = {(int(site[0]), int(site[1])) for site in self.symbols.get(name, [])}
+		literals = [name] if len(name) >= 3 and name.isascii() else None
+		hits = self._grep(re.compile(rf"\b{re.escape(name)}\b"), self._candidates(literals), skip=definitions)
+		ranked = sorted(hits.values(), key=lambda file_hits: (-len(file_hits), file_hits[0].path))
+		return [hit for file_hits in ranked for hit in file_hits]
+
+
+class CodeSearchIndexes:
+	"""Open indexes by directory: built on first use for a snapshot, memory-mapped from disk afterwards."""
+
+	CACHED_INDEXES = 8
+
+	def __init__(self):
+		self._indexes: OrderedDict[Path, CodeSearchIndex] = OrderedDict()
+		self._lock = threading.Lock()
+		self._build_locks: dict[Path, threading.Lock] = {}
+
+	def get(self, root: Path, index_dir: Path) -> CodeSearchIndex:
+		with self._lock:
+			index = self._indexes.get(index_dir)
+			if index is not None:
+				self._indexes.move_to_end(index_dir)
+				return index
+			build_lock = self._build_locks.setdefault(index_dir, threading.Lock())
+		with build_lock:
+			with self._lock:
+				index = self._indexes.get(index_dir)
+			if index is None:
+				index = self._load_or_build(root, index_dir)
+			with self._lock:
+				self._indexes[index_dir] = index
+				self._indexes.move_to_end(index_dir)
+				while len(self._indexes) > self.CACHED_INDEXES:
+					self._indexes.popitem(last=False)
+		return index
+
+	@staticmethod
+	def _load_or_build(root: Path, index_dir: Path) -> CodeSearchIndex:
+		if (index_dir / "meta.json").exists():
+			try:
+				return CodeSearchIndex(index_dir)
+			except (OSError, ValueError, KeyError) as e:
+				logger.warning(f"CodeSearchIndex: Rebuilding unreadable index {index_dir}: {e}")
+				shutil.rmtree(index_dir, ignore_errors=True)
+		index_dir.parent.mkdir(parents=True, exist_ok=True)
+		return CodeSearchIndex.build(root, index_dir, get_settings().CODE_SEARCH_MAX_FILE_BYTES)
+
+	def discard(self, index_dir: Path) -> None:
+		with self._lock:
+			self._indexes.pop(index_dir, None)
+			self._build_locks.pop(index_dir, None)
+
+
+code_search_indexes = CodeSearchIndexes()
@@ -1,9 +1,20 @@
+import hashlib
+import itertools
 import logging
 import os
+import shutil
 import subprocess
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
+from src.app.core.concurrency import run_blocking
 from src.app.core.config import get_settings
+from src.app.services.code_analysis.scanner import is_ignored_dir
+from src.app.services.context_budget import context_budget
+from src.app.services.tools.code_search import CodeSearchIndex, SearchHit, code_search_indexes
+from src.app.services.tools.file_tree import summarize_tree
 
 logger = logging.getLogger(__name__)
 
@@ -11,122 +22,230 @@ logger = logging.getLogger(__name__)
 class CodebaseNavigator:
 	"""A service for cloning and inspecting local git repositories."""
 
+	HEAD_REF = "refs/navigator/head"
+	FETCH_STAMP = "last_fetch"
+	CACHED_TREES = 32
+
 	def __init__(self):
 		self.settings = get_settings()
 		self.clone_dir = self.settings.TEMP_DIR / "cloned_repos"
 		self.clone_dir.mkdir(parents=True, exist_ok=True)
-		self.ignore_patterns = [
-			'.git', '__pycache__', 'node_modules', '.DS_Store',
-			'*.pyc', '*.pyo', '*.o', '*.so', '*.egg',
-			'dist', 'build', '.pytest_cache', '.ruff_cache'
-		]
+		self._locks: dict[str, threading.Lock] = {}
+		self._locks_guard = threading.Lock()
+		self._trees: OrderedDict[tuple[str, str, int], str] = OrderedDict()
+
+	def _repo_dir(self, repo_url: str) -> Path:
+		"""Cache directory of a repository, keyed by its full URL (same-named repos never collide)."""
+		return self.clone_dir / hashlib.sha256(repo_url.encode()).hexdigest()[:32]
+
+	def _lock_for(self, key: str) -> threading.Lock:
+		with self._locks_guard:
+			return self._locks.setdefault(key, threading.Lock())
 
-	def _get_repo_path(self, repo_url: str) -> Path:
-		"""Generates a local path from a repo URL."""
-		repo_name = repo_url.split('/')[-1].replace('.git', '')
-		return self.clone_dir / repo_name
+	def _git(self, args: list[str], cwd: Path | None = None) -> str:
+		result = subprocess.run(
+			['git', *args],
+			cwd=cwd,
+			check=True,
+			capture_output=True,
+			text=True,
+			timeout=self.settings.CODEBASE_GIT_TIMEOUT_SECONDS,
+			env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+		)
+		return result.stdout.strip()
+
+	def _history_args(self) -> list[str]:
+		"""Blobless (file contents fetched on checkout only) and, unless disabled, shallow."""
+		depth = self.settings.CODEBASE_CLONE_DEPTH
+		return ['--filter=blob:none', *(['--depth', str(depth)] if depth > 0 else [])]
+
+	def _fetch_due(self, repo_dir: Path) -> bool:
+		try:
+			age = time.time() - (repo_dir / self.FETCH_STAMP).stat().st_mtime
+		except OSError:
+			return True
+		return age >= self.settings.CODEBASE_FETCH_INTERVAL_SECONDS
 
 	def clone_repo(self, repo_url: str) -> Path:
 		"""
-		Clones a git repository. If it already exists, pulls the latest changes.
-		Returns the local path to the repository.
+		Returns a checkout of the remote HEAD of `repo_url`.
+
+		Every repository has one blobless bare mirror (`<sha256(url)>/mirror.git`), fetched at
+		most once per CODEBASE_FETCH_INTERVAL_SECONDS, and one detached worktree per commit
+		(`<sha256(url)>/worktrees/<commit>`). A worktree never changes once created, so runs
+		exploring it are unaffected by later updates; unused worktrees expire after
+		CODEBASE_WORKTREE_TTL_SECONDS.
 		"""
-		repo_path = self._get_repo_path(repo_url)
+		repo_dir = self._repo_dir(repo_url)
+		mirror = repo_dir / "mirror.git"
 
-		if repo_path.exists():
-			logger.info(f"Repo {repo_path.name} already exists. Fetching latest changes.")
+		with self._lock_for(repo_dir.name):
 			try:
-				subprocess.run(
-					['git', 'fetch'],
-					cwd=repo_path,
-					check=True,
-					capture_output=True,
-					text=True
-				)
-				# Reset to remote main/master
-				remote_head = subprocess.run(
-					['git', 'rev-parse', 'origin/main'],
-					cwd=repo_path, capture_output=True, text=True
-				).stdout.strip()
-				if not remote_head:
-					remote_head = subprocess.run(
-						['git', 'rev-parse', 'origin/master'],
-						cwd=repo_path, capture_output=True, text=True
-					).stdout.strip()
-
-				if remote_head:
-					subprocess.run(
-						['git', 'reset', '--hard', remote_head],
-						cwd=repo_path, check=True, capture_output=True, text=True
-					)
-				logger.info("Repo updated successfully.")
+				if not (mirror / "HEAD").exists():
+					logger.info(f"Cloning {repo_url} into {mirror}...")
+					shutil.rmtree(mirror, ignore_errors=True)  # leftovers of an interrupted clone
+					self._git(['clone', '-q', '--bare', '--no-tags', *self._history_args(), repo_url, str(mirror)])
+					self._git(['update-ref', self.HEAD_REF, 'HEAD'], cwd=mirror)
+					(repo_dir / self.FETCH_STAMP).touch()
+				elif self._fetch_due(repo_dir):
+					logger.info(f"Fetching latest changes of {repo_url}.")
+					self._git(['fetch', '-q', '--no-tags', *self._history_args(), 'origin', 'HEAD'], cwd=mirror)
+					self._git(['update-ref', self.HEAD_REF, 'FETCH_HEAD'], cwd=mirror)
+					(repo_dir / self.FETCH_STAMP).touch()
+				else:
+					logger.info(f"{repo_url} was fetched recently; using the cached mirror.")
+
+				commit = self._git(['rev-parse', self.HEAD_REF], cwd=mirror)
+				worktree = repo_dir / "worktrees" / commit
+				if not (worktree / ".git").exists():
+					shutil.rmtree(worktree, ignore_errors=True)
+					self._git(['worktree', 'prune'], cwd=mirror)
+					self._git(['worktree', 'add', '-q', '--detach', str(worktree), commit], cwd=mirror)
+					logger.info(f"Checked out {repo_url}@{commit[:12]}.")
+				os.utime(worktree)
+				self._prune_worktrees(mirror, worktree)
 			except subprocess.CalledProcessError as e:
-				logger.error(f"Failed to update repo {repo_path.name}: {e.stderr}")
+				logger.error(f"Failed to clone or update repo {repo_url}: {e.stderr}")
 				raise
-		else:
-			logger.info(f"Cloning {repo_url} into {repo_path}...")
+
+		return worktree
+
+	def _prune_worktrees(self, mirror: Path, current: Path) -> None:
+		"""Removes worktrees of older commits that no run has used for CODEBASE_WORKTREE_TTL_SECONDS."""
+		cutoff = time.time() - self.settings.CODEBASE_WORKTREE_TTL_SECONDS
+		for worktree in current.parent.iterdir():
+			if worktree == current or worktree.stat().st_mtime >= cutoff:
+				continue
 			try:
-				subprocess.run(
-					['git', 'clone', repo_url, str(repo_path)],
-					check=True,
-					capture_output=True,
-					text=True
-				)
-				logger.info("Repo cloned successfully.")
-			except subprocess.CalledProcessError as e:
-				logger.error(f"Failed to clone repo {repo_url}: {e.stderr}")
-				raise
+				self._git(['worktree', 'remove', '--force', str(worktree)], cwd=mirror)
+			except subprocess.CalledProcessError:
+				shutil.rmtree(worktree, ignore_errors=True)
+			index_dir = self._index_dir(worktree)
+			code_search_indexes.discard(index_dir)
+			shutil.rmtree(index_dir, ignore_errors=True)
+		self._git(['worktree', 'prune'], cwd=mirror)
+
+	def _list_files(self, repo_path: Path) -> list[str]:
+		"""Tracked files (`git ls-files`, so .gitignore is honoured); a directory walk for non-git trees."""
+		try:
+			return [path for path in self._git(['ls-files', '-z'], cwd=repo_path).split("\0") if path]
+		except (subprocess.SubprocessError, OSError):
+			paths = []
+			for root, dirs, files in os.walk(repo_path):
+				dirs[:] = [d for d in dirs if not is_ignored_dir(d)]
+				relative = Path(root).relative_to(repo_path)
+				paths.extend((relative / f).as_posix() for f in files)
+			return paths
 
-		return repo_path
+	def _snapshot_key(self, repo_path: Path) -> str | None:
+		"""Commit the tree of `repo_path` belongs to; None when it cannot be cached (not a clean checkout)."""
+		if repo_path.parent.name == "worktrees":  # per-commit worktree of a cached mirror, never modified
+			return repo_path.name
+		try:
+			if self._git(['status', '--porcelain', '--untracked-files=no'], cwd=repo_path):
+				return None
+			return self._git(['rev-parse', 'HEAD'], cwd=repo_path)
+		except (subprocess.SubprocessError, OSError):
+			return None
 
 	def get_file_tree(self, repo_path: Path, max_items: int = 100) -> str:
-		"""Generates a text-based file tree for the given path."""
-		tree = []
-		item_count = 0
-
-		for root, dirs, files in os.walk(repo_path):
-			# Exclude ignored directories
-			dirs[:] = [d for d in dirs if d not in self.ignore_patterns]
-			files[:] = [f for f in files if all(p not in f for p in self.ignore_patterns)]
-
-			level = root.replace(str(repo_path), '').count(os.sep)
-			indent = ' ' * 4 * level
-
-			if item_count < max_items:
-				tree.append(f"{indent}{os.path.basename(root)}/")
-				item_count += 1
-
-			sub_indent = ' ' * 4 * (level + 1)
-			for f in sorted(files):
-				if item_count >= max_items:
-					tree.append(f"{sub_indent}...")
-					return "\n".join(tree)
-				tree.append(f"{sub_indent}{f}")
-				item_count += 1
-
-		return "\n".join(tree)
-
-	def read_file_content(self, file_path: Path, max_lines: int = 500) -> str:
-		"""Reads the content of a file, with a line limit."""
+		"""
+		A ranked, depth-limited tree of the repository (see `summarize_tree`): test, page-object
+		and API client directories are expanded first. Cached per commit.
+		"""
+		commit = self._snapshot_key(repo_path)
+		key = (str(repo_path), commit or "", max_items)
+		if commit is not None:
+			with self._locks_guard:
+				if key in self._trees:
+					self._trees.move_to_end(key)
+					return self._trees[key]
+
+		tree = summarize_tree(self._list_files(repo_path), repo_path.name, max_items)
+		if commit is not None:
+			with self._locks_guard:
+				self._trees[key] = tree
+				while len(self._trees) > self.CACHED_TREES:
+					self._trees.popitem(last=False)
+		return tree
+
+	def read_file_content(
+		self, file_path: Path, max_lines: int = 500, max_tokens: int | None = None, start_line: int = 1
+	) -> str:
+		"""
+		Reads a window of `max_lines` lines starting at `start_line` (1-based), with a token limit.
+		The file is streamed: lines after the window are never read.
+		"""
 		if not file_path.is_file():
 			return f"Error: File not found at {file_path}"
+		start_line = max(start_line, 1)
 		try:
 			with open(file_path, encoding='utf-8') as f:
-				lines = f.readlines()
+				# One line past the window tells whether the file continues.
+				lines = list(itertools.islice(f, start_line - 1, start_line - 1 + max_lines + 1))
 
+			if start_line > 1 and not lines:
+				return f"Error: {file_path.name} has fewer than {start_line} lines."
 			if len(lines) > max_lines:
-				content = "".join(lines[:max_lines]) + f"\n... (file truncated at {max_lines} lines)"
+				next_line = start_line + max_lines
+				content = "".join(lines[:max_lines]) + (
+					f"\n... (file truncated at line {next_line - 1}; read again with start_line={next_line} to continue)"
+				)
 			else:
 				content = "".join(lines)
-			return content
+			budget = max_tokens if max_tokens is not None else context_budget.share_of("source") // 4
+			return context_budget.counter.truncate(content, budget, marker=f"\n... (file truncated at {budget} tokens)")
 		except Exception as e:
 			return f"Error reading file: {e}"
 
+	def _index_dir(self, repo_path: Path) -> Path:
+		if repo_path.parent.name == "worktrees":  # a per-commit worktree of a cached mirror
+			return repo_path.parent.parent / "search_index" / repo_path.name
+		head = self._git(['rev-parse', 'HEAD'], cwd=repo_path)
+		return self.clone_dir / "search_index" / hashlib.sha256(f"{repo_path.resolve()}@{head}".encode()).hexdigest()[:32]
+
+	def _search_index(self, repo_path: Path) -> CodeSearchIndex:
+		return code_search_indexes.get(repo_path, self._index_dir(repo_path))
+
+	def _format_hits(self, hits: list[SearchHit], max_tokens: int | None = None) -> str:
+		"""`path:line:text` lines (rg style), capped by count and by tokens."""
+		if not hits:
+			return "No results found."
+		limit = self.settings.CODE_SEARCH_MAX_RESULTS
+		lines = [f"{h.path}:{h.line}:{f'[{h.kind}] ' if h.kind else ''}{h.text}" for h in hits[:limit]]
+		if len(hits) > limit:
+			lines.append(f"... ({len(hits) - limit} more results not shown; refine the query)")
+		budget = max_tokens if max_tokens is not None else context_budget.share_of("source") // 4
+		return context_budget.counter.truncate("\n".join(lines), budget, marker="\n... (results truncated)")
+
 	def search_in_codebase(self, repo_path: Path, query: str) -> str:
 		"""
-		Uses ripgrep (rg) to search the codebase.
-		Falls back to git grep if rg is not available.
+		Searches the repository through its per-commit code search index (case-insensitive
+		regex, best-matching files first). Falls back to ripgrep / git grep if the index
+		cannot be built.
 		"""
+		try:
+			return self._format_hits(self._search_index(repo_path).search(query))
+		except Exception as e:
+			logger.warning(f"Code search index unavailable for {repo_path} ({e}); falling back to grep.")
+			return self._grep(repo_path, query)
+
+	def find_symbol(self, repo_path: Path, name: str) -> str:
+		"""Definitions (classes, functions, methods, constants, types) whose name matches `name`."""
+		try:
+			return self._format_hits(self._search_index(repo_path).find_symbol(name))
+		except Exception as e:
+			return f"Error: Could not look up symbols: {e}"
+
+	def find_references(self, repo_path: Path, name: str) -> str:
+		"""Whole-word uses of `name` outside its definitions, files with most uses first."""
+		try:
+			return self._format_hits(self._search_index(repo_path).find_references(name))
+		except Exception as e:
+			return f"Error: Could not look up references: {e}"
+
+	def _grep(self, repo_path: Path, query: str) -> str:
+		"""Uses ripgrep (rg), or git grep if rg is not available."""
 		try:
 			# Use ripgrep with ignore files
 			result = subprocess.run(
@@ -155,3 +274,23 @@ class CodebaseNavigator:
 				return "Error: Could not perform search. Neither ripgrep (rg) nor git are available."
 		except subprocess.TimeoutExpired:
 			return "Error: Search operation timed out."
+
+	async def aclone_repo(self, repo_url: str) -> Path:
+		return await run_blocking(self.clone_repo, repo_url)
+
+	async def aget_file_tree(self, repo_path: Path, max_items: int = 100) -> str:
+		return await run_blocking(self.get_file_tree, repo_path, max_items)
+
+	async def aread_file_content(
+		self, file_path: Path, max_lines: int = 500, max_tokens: int | None = None, start_line: int = 1
+	) -> str:
+		return await run_blocking(self.read_file_content, file_path, max_lines, max_tokens, start_line)
+
+	async def asearch_in_codebase(self, repo_path: Path, query: str) -> str:
+		return await run_blocking(self.search_in_codebase, repo_path, query)
+
+	async def afind_symbol(self, repo_path: Path, name: str) -> str:
+		return await run_blocking(self.find_symbol, repo_path, name)
+
+	async def afind_references(self, repo_path: Path, name: str) -> str:
+		return await run_blocking(self.find_references, repo_path, name)
@@ -0,0 +1,114 @@
+import heapq
+import math
+from dataclasses import dataclass, field
+
+from src.app.services.code_analysis.scanner import is_ignored_dir
+
+MAX_DEPTH = 5
+FILES_PER_DIR = 8
+
+# Directories a test author looks for first: existing tests, page objects and API clients.
+_PRIORITY_DIRS: dict[str, float] = {
+	**dict.fromkeys(("tests", "test", "e2e", "__tests__", "autotests", "testing", "it"), 3.0),
+	**dict.fromkeys(("spec", "specs", "integration", "acceptance", "features", "fixtures"), 2.0),
+	**dict.fromkeys(("pages", "page_objects", "pageobjects", "page-objects", "pom", "screens"), 3.0),
+	**dict.fromkeys(("api", "client", "clients", "api_client", "api-client", "sdk", "openapi"), 2.5),
+	**dict.fromkeys(("endpoints", "routes", "routers", "controllers", "handlers", "services"), 2.0),
+	**dict.fromkeys(("src", "app", "lib", "pkg", "internal", "components", "models", "schemas"), 1.0),
+}
+# Project and test-runner configuration, listed before other files of their directory.
+_KEY_FILES = frozenset({
+	"conftest.py", "pytest.ini", "tox.ini", "setup.cfg", "pyproject.toml", "requirements.txt", "package.json",
+	"playwright.config.ts", "playwright.config.js", "cypress.config.ts", "cypress.config.js", "jest.config.js",
+	"jest.config.ts", "openapi.json", "openapi.yaml", "openapi.yml", "swagger.json", "swagger.yaml",
+	"pom.xml", "build.gradle", "build.gradle.kts", "go.mod", "docker-compose.yml", "README.md",
+})
+
+
+@dataclass
+class _Dir:
+	name: str
+	depth: int
+	score: float = 0.0
+	files: list[str] = field(default_factory=list)
+	dirs: dict[str, "_Dir"] = field(default_factory=dict)
+	file_count: int = 0  # recursive
+
+	def child(self, name: str) -> "_Dir":
+		if name not in self.dirs:
+			self.dirs[name] = _Dir(name, self.depth + 1)
+		return self.dirs[name]
+
+
+def _build(paths: list[str]) -> _Dir:
+	root = _Dir("", 0)
+	for path in paths:
+		*parts, name = path.split("/")
+		if any(is_ignored_dir(part) for part in parts):
+			continue
+		node = root
+		node.file_count += 1
+		for part in parts:
+			node = node.child(part)
+			node.file_count += 1
+		node.files.append(name)
+	return root
+
+
+def _score(node: _Dir, inherited: float = 0.0) -> None:
+	"""Own keyword priority, half of the parent's, and a small bonus for larger subtrees."""
+	own = _PRIORITY_DIRS.get(node.name.lower(), 0.0)
+	node.score = max(own, inherited * 0.5) + 0.1 * math.log1p(node.file_count)
+	for child in node.dirs.values():
+		_score(child, max(own, inherited * 0.5))
+
+
+def _sorted_files(files: list[str]) -> list[str]:
+	return sorted(files, key=lambda name: (name not in _KEY_FILES, name.lower()))
+
+
+def summarize_tree(paths: list[str], root_name: str, max_items: int = 100) -> str:
+	"""
+	Renders `paths` (repository-relative, `/`-separated) as an indented tree of at most
+	`max_items` lines. Directories are expanded best-first by priority (tests, page objects,
+	API clients, then source roots) down to MAX_DEPTH; the rest are shown collapsed with
+	their file counts, and each directory lists at most FILES_PER_DIR files.
+	"""
+	root = _build(paths)
+	_score(root)
+
+	expanded: set[int] = set()
+	used = 1 + len(root.dirs) + min(len(root.files), FILES_PER_DIR + 1)
+	expanded.add(id(root))
+	frontier = [(-d.score, n, d) for n, d in enumerate(root.dirs.values())]
+	heapq.heapify(frontier)
+	counter = len(frontier)
+	while frontier:
+		_, _, node = heapq.heappop(frontier)
+		if node.depth >= MAX_DEPTH:
+			continue
+		cost = len(node.dirs) + min(len(node.files), FILES_PER_DIR + 1)
+		if used + cost > max_items:
+			continue
+		used += cost
+		expanded.add(id(node))
+		for child in node.dirs.values():
+			heapq.heappush(frontier, (-child.score, counter, child))
+			counter += 1
+
+	lines = [f"{root_name}/ ({root.file_count} files)"]
+
+	def render(node: _Dir, indent: str) -> None:
+		for child in sorted(node.dirs.values(), key=lambda d: (-d.score, d.name.lower())):
+			if id(child) in expanded:
+				lines.append(f"{indent}{child.name}/")
+				render(child, indent + "    ")
+			else:
+				lines.append(f"{indent}{child.name}/ ({child.file_count} files)")
+		files = _sorted_files(node.files)
+		lines.extend(f"{indent}{name}" for name in files[:FILES_PER_DIR])
+		if len(files) > FILES_PER_DIR:
+			lines.append(f"{indent}... (+{len(files) - FILES_PER_DIR} more files)")
+
+	render(root, "    ")
+	return "\n".join(lines[:max_items] + (["    ..."] if len(lines) > max_items else []))
@@ -4,7 +4,9 @@ import zipfile
 from pathlib import Path
 from typing import Any
 
+from src.app.core.concurrency import run_blocking
 from src.app.core.config import get_settings
+from src.app.services.context_budget import context_budget
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +64,8 @@ class TraceInspector:
 
 		dom_data = trace_data.get(snapshot_file, {})
 		# The actual DOM content is usually in the first element of the list
-		return json.dumps(dom_data[0] if isinstance(dom_data, list) and dom_data else dom_data, indent=2)
+		snapshot = json.dumps(dom_data[0] if isinstance(dom_data, list) and dom_data else dom_data, indent=1)
+		return context_budget.counter.truncate(snapshot, context_budget.share_of("vision"))
 
 	def _get_network_errors(self, trace_data: dict[str, Any]) -> list[str]:
 		"""Gets all network requests that resulted in an error."""
@@ -121,3 +124,7 @@ class TraceInspector:
 			"network_errors": network_errors,
 			"console_logs": console_logs,
 		}
+
+	async def aget_failure_context(self, run_id: int, original_error: str) -> dict[str, Any] | None:
+		"""Async variant: zip extraction and JSON parsing run off the event loop."""
+		return await run_blocking(self.get_failure_context, run_id, original_error)
@@ -1,4 +1,7 @@
 import logging
+
+from src.app.core.concurrency import run_blocking
+
 from .executor import TestExecutorService
 from .tools.static_analyzer import StaticCodeAnalyzer
 
@@ -11,8 +14,8 @@ class ValidationService:
         self.executor_service = executor_service or TestExecutorService()
 
     async def validate(self, code: str) -> tuple[bool, str, str | None]:
-        # Step 1: Perform static analysis first
-        is_statically_valid, message, fixed_code = self.static_analyzer.validate(code)
+        # Step 1: Perform static analysis first (AST + ruff subprocesses, so off the event loop)
+        is_statically_valid, message, fixed_code = await run_blocking(self.static_analyzer.validate, code)
 
         if not is_statically_valid:
             return False, message, fixed_code
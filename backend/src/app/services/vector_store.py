@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from typing import Any
+
+import chromadb
+import httpx
+from chromadb.config import Settings as ChromaSettings
+from chromadb.errors import NotFoundError
+from chromadb.utils import embedding_functions
+
+from src.app.core.config import get_settings
+from src.app.services.embeddings import EmbeddingService
+from src.app.services.local_vector_index import LocalVectorCollection
+
+logger = logging.getLogger(__name__)
+
+# Failures that mean the connection (or the collection handle) went stale.
+_RECONNECT_ERRORS = (ConnectionError, OSError, httpx.TransportError, NotFoundError)
+
+
+class CollectionHandle:
+	"""
+	App-lifetime proxy to a Chroma collection.
+
+	The collection is resolved once (one `get_or_create_collection` round-trip) and
+	reused. If a call fails because the server restarted or the connection dropped,
+	the client is rebuilt and the call retried once.
+
+	Truthiness is an availability check: False while the collection cannot be resolved,
+	so services can skip vector work instead of failing inside every call.
+	"""
+
+	# After the server was found unreachable, availability checks fail fast for this long.
+	RETRY_AFTER_SECONDS = 30.0
+
+	def __init__(self, store: "VectorStore", name: str):
+		self.store = store
+		self.name = name
+		self._collection = None
+		self._lock = threading.Lock()
+		self._retry_at = 0.0
+
+	def __bool__(self) -> bool:
+		"""Resolves the collection if needed (blocking on first use); False when unreachable."""
+		if self._collection is not None:
+			return True
+		if time.monotonic() < self._retry_at:
+			return False
+		try:
+			self._get()
+		except Exception as e:
+			logger.warning(f"VectorStore: Collection '{self.name}' is unavailable ({e!r}).")
+			self._retry_at = time.monotonic() + self.RETRY_AFTER_SECONDS
+			return False
+		return True
+
+	def _get(self):
+		if self._collection is None:
+			with self._lock:
+				if self._collection is None:
+					self._collection = self.store.open_collection(self.name)
+		return self._collection
+
+	def invalidate(self) -> None:
+		with self._lock:
+			self._collection = None
+
+	def _call(self, method: str, **kwargs: Any) -> Any:
+		try:
+			return getattr(self._get(), method)(**kwargs)
+		except _RECONNECT_ERRORS as e:
+			logger.warning(f"VectorStore: '{self.name}.{method}' failed ({e!r}). Reconnecting and retrying once.")
+			self.store.reset()
+			try:
+				return getattr(self._get(), method)(**kwargs)
+			except _RECONNECT_ERRORS:
+				self._retry_at = time.monotonic() + self.RETRY_AFTER_SECONDS
+				raise
+
+	def add(self, **kwargs: Any) -> Any:
+		return self._call("add", **kwargs)
+
+	def upsert(self, **kwargs: Any) -> Any:
+		return self._call("upsert", **kwargs)
+
+	def query(self, **kwargs: Any) -> Any:
+		return self._call("query", **kwargs)
+
+	def get(self, **kwargs: Any) -> Any:
+		return self._call("get", **kwargs)
+
+	def update(self, **kwargs: Any) -> Any:
+		return self._call("update", **kwargs)
+
+	def delete(self, **kwargs: Any) -> Any:
+		return self._call("delete", **kwargs)
+
+	def count(self) -> int:
+		return self._call("count")
+
+
+class VectorStore:
+	"""
+	Single vector backend shared by all vector-backed services.
+
+	Created once in `bootstrap_application`. With the Chroma backend the underlying
+	HTTP client keeps a pooled keep-alive connection set, so queries skip the connect
+	handshake; with the local backend collections live in-process (`LocalVectorCollection`).
+	"""
+
+	def __init__(self, embedding_function=None, backend: str | None = None):
+		self.settings = get_settings()
+		self.backend = backend or self.settings.VECTOR_BACKEND
+		self.embedding_fn = embedding_function or embedding_functions.DefaultEmbeddingFunction()
+		# Services embed through this shared, batching and memoizing front.
+		self.embedder = EmbeddingService(self.embedding_fn)
+		self._client = None
+		self._collections: dict[str, CollectionHandle] = {}
+		self._lock = threading.Lock()
+
+	@property
+	def client(self):
+		if self._client is None:
+			with self._lock:
+				if self._client is None:
+					self._client = chromadb.HttpClient(
+						host=self.settings.CHROMA_HOST,
+						port=self.settings.CHROMA_PORT,
+						settings=ChromaSettings(
+							anonymized_telemetry=False,
+							chroma_http_max_connections=self.settings.CHROMA_HTTP_MAX_CONNECTIONS,
+							chroma_http_max_keepalive_connections=self.settings.CHROMA_HTTP_MAX_CONNECTIONS,
+						),
+					)
+		return self._client
+
+	def open_collection(self, name: str):
+		if self.backend == "local":
+			return LocalVectorCollection(name, self.settings.VECTOR_INDEX_PATH, self.embedder)
+		return self.client.get_or_create_collection(
+			name=name,
+			embedding_function=self.embedding_fn,
+			metadata={"hnsw:space": "cosine"},
+		)
+
+	def collection(self, name: str) -> CollectionHandle:
+		with self._lock:
+			if name not in self._collections:
+				self._collections[name] = CollectionHandle(self, name)
+			return self._collections[name]
+
+	def warmup(self) -> None:
+		"""Opens every registered collection (loads local indexes from disk) ahead of the first request."""
+		for name, handle in list(self._collections.items()):
+			try:
+				handle._get()
+			except Exception as e:
+				logger.warning(f"VectorStore: Failed to open collection '{name}' at startup: {e}")
+
+	def reset(self) -> None:
+		"""Drops the client and every cached collection; the next call reconnects."""
+		if self.backend == "local":
+			return
+		with self._lock:
+			self._client = None
+			handles = list(self._collections.values())
+		for handle in handles:
+			handle.invalidate()
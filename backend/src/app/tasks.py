@@ -48,7 +48,7 @@ async def _run_task_logic(run_id: int, generated_code_path: str):
                 await session.commit()
 
         # Load the code from the path
-        code = storage_service.load(generated_code_path)
+        code = await storage_service.aload(generated_code_path)
 
         # --- EXECUTE (Blocking Docker call wrapped in executor) ---
         success, raw_logs, report_url = await executor.execute_test(run_id, code)
@@ -56,7 +56,7 @@ async def _run_task_logic(run_id: int, generated_code_path: str):
         # Publish Logs to Redis (Chunked if too large)
         if raw_logs:
             # Save raw logs to file
-            execution_logs_path = storage_service.save(raw_logs, run_id, "log")
+            execution_logs_path = await storage_service.asave(raw_logs, run_id, "log")
 
             # Send logs in chunks to avoid Redis message size limits
             # Only send a summary or relevant parts to Redis, not the entire raw_logs
@@ -84,7 +84,7 @@ async def _run_task_logic(run_id: int, generated_code_path: str):
 
     except Exception as e:
         logger.error(f"Task failed: {e}", exc_info=True)
-        error_log_path = storage_service.save(str(e), run_id, "log")
+        error_log_path = await storage_service.asave(str(e), run_id, "log")
         await redis_client.publish(log_channel, f"Error: {str(e)}")
         # Update DB error
         async with AsyncSessionLocal() as session:
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from src.app.agents import nodes
+from src.app.agents.nodes import _gather_source, _run_tool_call
+from src.app.domain.enums import ProcessingStatus
+
+
+@pytest.mark.asyncio
+async def test_gather_source_returns_default_on_timeout() -> None:
+	logs: list[str] = []
+
+	result = await _gather_source("vision", asyncio.sleep(5, result="dom"), 0.01, "", logs)
+
+	assert result == ""
+	assert any("timed out" in line for line in logs)
+
+
+@pytest.mark.asyncio
+async def test_gather_source_returns_default_on_error() -> None:
+	logs: list[str] = []
+
+	async def broken() -> str:
+		raise RuntimeError("chroma down")
+
+	result = await _gather_source("memory", broken(), 1, "", logs)
+
+	assert result == ""
+	assert any("chroma down" in line for line in logs)
+
+
+class _SlowSources:
+	"""Context sources for `analyst_node` that each take `delay` seconds."""
+
+	def __init__(self, delay: float, cached_code: str | None = None, dedup_delay: float | None = None) -> None:
+		self.delay = delay
+		self.cached_code = cached_code
+		self.dedup_delay = delay if dedup_delay is None else dedup_delay
+		self.cancelled: list[str] = []
+		self.released = threading.Event()
+
+	def defects(self, query: str) -> str:
+		self.released.wait(self.delay)  # blocking, like the real lookup on the worker pool
+		return ""
+
+	async def _sleep(self, name: str, delay: float, result):
+		try:
+			await asyncio.sleep(delay)
+		except asyncio.CancelledError:
+			self.cancelled.append(name)
+			raise
+		return result
+
+	async def arecall_lessons(self, query: str, url: str | None = None) -> str:
+		return await self._sleep("memory", self.delay, "")
+
+	async def afind_similar(self, query: str) -> str | None:
+		return await self._sleep("dedup", self.dedup_delay, self.cached_code)
+
+	async def code(self, raw_input: str, git_url_match, logs: list[str]):
+		return await self._sleep("code", self.delay, (raw_input, None))
+
+
+async def _run_analyst(sources: _SlowSources) -> tuple[dict, float, MagicMock]:
+	llm = MagicMock()
+	llm.ainvoke = AsyncMock(return_value=AIMessage(content="### SCENARIO: Login\nOpen the login page."))
+	state = {"user_request": "Test the login flow", "run_id": "run-1", "messages": [HumanMessage(content="Test the login flow")]}
+	with patch.object(nodes.llm_service, "get_model", return_value=llm), \
+			patch.object(nodes.storage_service, "asave", AsyncMock(return_value="artifact")), \
+			patch.object(nodes.defect_service, "get_relevant_defects", sources.defects), \
+			patch.object(nodes, "_gather_code_context", sources.code), \
+			patch.object(nodes, "_start_speculative_generation", return_value=False):
+		started = time.perf_counter()
+		try:
+			result = await nodes.analyst_node(state, dedup_service=sources, memory_service=sources)
+		finally:
+			sources.released.set()
+	return result, time.perf_counter() - started, llm
+
+
+@pytest.mark.asyncio
+async def test_analyst_gathers_sources_concurrently() -> None:
+	result, elapsed, llm = await _run_analyst(_SlowSources(delay=0.3))
+
+	assert result["status"] == ProcessingStatus.WAITING_FOR_APPROVAL
+	llm.ainvoke.assert_awaited_once()
+	# Four 0.3s sources: sequential gathering would take 1.2s.
+	assert elapsed < 0.7
+
+
+@pytest.mark.asyncio
+async def test_analyst_dedup_hit_short_circuits_other_sources() -> None:
+	sources = _SlowSources(delay=5, cached_code="def test_login(): ...", dedup_delay=0.05)
+
+	result, elapsed, llm = await _run_analyst(sources)
+
+	assert result["status"] == ProcessingStatus.COMPLETED
+	assert elapsed < 1
+	llm.ainvoke.assert_not_called()
+	assert sorted(sources.cancelled) == ["code", "memory"]
+
+
+@pytest.mark.asyncio
+async def test_explorer_tool_calls_time_out_individually() -> None:
+	@tool
+	async def slow(query: str) -> str:
+		"""Slow search."""
+		await asyncio.sleep(5)
+		return "late"
+
+	@tool
+	async def fast(query: str) -> str:
+		"""Fast search."""
+		return f"found {query}"
+
+	started = time.perf_counter()
+	outputs = await asyncio.gather(
+		_run_tool_call(slow, {"query": "a"}, 0.05),
+		_run_tool_call(fast, {"query": "b"}, 1),
+		_run_tool_call(fast, {}, 1),
+	)
+
+	assert outputs[0].startswith("Error: slow timed out")
+	assert outputs[1] == "found b"
+	assert outputs[2].startswith("Error: fast failed")
+	assert time.perf_counter() - started < 0.5
@@ -0,0 +1,168 @@
+import hashlib
+import io
+import subprocess
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from src.app.services.code_analysis.repo_index import RepositoryIndex
+from src.app.services.code_analysis.scanner import (
+    ParseResultCache,
+    iter_source_files,
+    parse_batch,
+    shutdown_parser_pool,
+)
+from src.app.services.code_analysis.service import ArchiveLimitError, CodeAnalysisService
+
+FASTAPI_ROUTES = '''
+from fastapi import APIRouter
+router = APIRouter()
+
+@router.get("/users/{user_id}")
+def get_user(user_id: int):
+    """Get a user"""
+'''
+
+EXPRESS_ROUTES = "router.post('/orders', (req, res) => res.send('ok'))\n"
+
+
+def _project(tmp_path):
+    (tmp_path / "api").mkdir()
+    (tmp_path / "api" / "users.py").write_text(FASTAPI_ROUTES)
+    (tmp_path / "api" / "models.py").write_text("class User:\n    name: str\n")
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / "orders.js").write_text(EXPRESS_ROUTES)
+    (tmp_path / "web" / "app.min.js").write_text(EXPRESS_ROUTES)
+    for ignored in ("node_modules/lib", "build", ".venv"):
+        (tmp_path / ignored).mkdir(parents=True)
+        (tmp_path / ignored / "routes.js").write_text(EXPRESS_ROUTES)
+    return tmp_path
+
+
+def test_iter_source_files_prunes_ignored_dirs(tmp_path):
+    files = [p.replace(str(tmp_path), "") for p in iter_source_files(str(_project(tmp_path)))]
+
+    assert files == ["/api/models.py", "/api/users.py", "/web/orders.js"]
+
+
+def test_analyze_project_skips_files_without_routes_and_reports_progress(tmp_path):
+    service = CodeAnalysisService(cache=ParseResultCache(100))
+    progress = []
+
+    with patch("src.app.services.code_analysis.service.parse_batch", side_effect=parse_batch) as parsed:
+        endpoints = service.analyze_project(str(_project(tmp_path)), progress=lambda done, total: progress.append((done, total)))
+
+    assert [(ep.method, ep.path) for ep in endpoints] == [("get", "/users/{user_id}"), ("post", "/orders")]
+    # models.py has no route markers and is never handed to a parser.
+    assert parsed.call_count == 2
+    assert progress[-1] == (3, 3)
+
+
+def test_analyze_project_reuses_cached_results_for_unchanged_files(tmp_path):
+    project = _project(tmp_path)
+    service = CodeAnalysisService(cache=ParseResultCache(100))
+    service.analyze_project(str(project))
+
+    (project / "web" / "orders.js").write_text(EXPRESS_ROUTES + "router.delete('/orders/:id', handler)\n")
+    with patch("src.app.services.code_analysis.service.parse_batch", side_effect=parse_batch) as parsed:
+        endpoints = service.analyze_project(str(project))
+
+    assert parsed.call_count == 1
+    assert parsed.call_args[0][0][0][0].endswith("orders.js")
+    assert [ep.path for ep in endpoints] == ["/users/{user_id}", "/orders", "/orders/:id"]
+
+
+def test_analyze_project_parses_on_process_pool(tmp_path):
+    for n in range(3):
+        (tmp_path / f"routes_{n}.py").write_text(FASTAPI_ROUTES.replace("/users", f"/users{n}"))
+    service = CodeAnalysisService(cache=ParseResultCache(100))
+    service.settings = service.settings.model_copy(update={"CODE_ANALYSIS_PARALLEL_MIN_FILES": 2, "CODE_ANALYSIS_BATCH_SIZE": 2})
+
+    try:
+        endpoints = service.analyze_project(str(tmp_path))
+    finally:
+        shutdown_parser_pool()
+
+    assert [ep.path for ep in endpoints] == ["/users0/{user_id}", "/users1/{user_id}", "/users2/{user_id}"]
+    assert all(ep.source_file.startswith(str(tmp_path)) for ep in endpoints)
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+def _commit_all(repo, message):
+    _git(repo, "add", "-A")
+    _git(repo, "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", message)
+
+
+def test_repository_index_reparses_only_changed_files(tmp_path):
+    origin = tmp_path / "origin"
+    (origin / "api").mkdir(parents=True)
+    _git(origin, "init", "-q")
+    (origin / "api" / "users.py").write_text(FASTAPI_ROUTES)
+    (origin / "orders.js").write_text(EXPRESS_ROUTES)
+    _commit_all(origin, "initial")
+
+    index = RepositoryIndex(cache_dir=tmp_path / "cache")
+    service = CodeAnalysisService(cache=ParseResultCache(100))
+    url = origin.as_uri()
+
+    with patch.object(service, "analyze_files", wraps=service.analyze_files) as analyze_files:
+        first = index.analyze(url, url, service.analyze_files)
+        unchanged = index.analyze(url, url, service.analyze_files)
+        assert analyze_files.call_count == 1
+
+        (origin / "orders.js").write_text(EXPRESS_ROUTES + "router.delete('/orders/:id', handler)\n")
+        _commit_all(origin, "add delete")
+        updated = index.analyze(url, url, service.analyze_files)
+
+    assert [(ep.source_file, ep.path) for ep in first] == [("api/users.py", "/users/{user_id}"), ("orders.js", "/orders")]
+    assert unchanged == first
+    assert analyze_files.call_args[0][0] == [str(tmp_path / "cache" / hashlib.sha256(url.encode()).hexdigest() / "checkout" / "orders.js")]
+    assert [ep.path for ep in updated] == ["/users/{user_id}", "/orders", "/orders/:id"]
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def test_analyze_zip_streams_only_relevant_members():
+    archive = _zip({
+        "app/api/users.py": FASTAPI_ROUTES,
+        "app/node_modules/lib/routes.js": EXPRESS_ROUTES,
+        "app/static/logo.png": b"\x89PNG" * 100,
+        "app/web/orders.js": EXPRESS_ROUTES,
+    })
+    service = CodeAnalysisService(cache=ParseResultCache(100))
+
+    with patch("src.app.services.code_analysis.service.zipfile.ZipFile.open", autospec=True,
+               side_effect=zipfile.ZipFile.open) as opened, \
+            patch("zipfile.ZipFile.extract") as extract, patch("zipfile.ZipFile.extractall") as extractall, \
+            patch("tempfile.mkdtemp") as mkdtemp:
+        endpoints = service.analyze_zip(archive)
+
+    assert [(ep.source_file, ep.path) for ep in endpoints] == [
+        ("app/api/users.py", "/users/{user_id}"), ("app/web/orders.js", "/orders"),
+    ]
+    assert sorted(call.args[1].filename for call in opened.call_args_list) == ["app/api/users.py", "app/web/orders.js"]
+    extract.assert_not_called()
+    extractall.assert_not_called()
+    mkdtemp.assert_not_called()
+
+
+def test_analyze_zip_rejects_zip_bombs():
+    service = CodeAnalysisService(cache=ParseResultCache(100))
+
+    with pytest.raises(ArchiveLimitError):
+        service.analyze_zip(_zip({"src/routes.py": "#" * 500_000}))
+
+    service.settings = service.settings.model_copy(update={"CODE_ANALYSIS_ZIP_MAX_TOTAL_BYTES": len(FASTAPI_ROUTES) + 10})
+    with pytest.raises(ArchiveLimitError):
+        service.analyze_zip(_zip({"a/users.py": FASTAPI_ROUTES, "b/users.py": FASTAPI_ROUTES}))
@@ -0,0 +1,110 @@
+import subprocess
+
+import pytest
+
+from src.app.services.tools.code_search import CodeSearchIndex, CodeSearchIndexes, _required_literals
+
+FILES = {
+    "app/api/users.py": '''
+from app.services import UserService
+
+MAX_PAGE_SIZE = 100
+
+
+class UsersApi:
+    def get_user(self, user_id: int):
+        return UserService().load(user_id)
+
+
+async def list_users(page: int):
+    return UserService().page(page, MAX_PAGE_SIZE)
+''',
+    "app/services.py": '''
+class UserService:
+    def load(self, user_id):
+        """Loads a user from the DB"""
+''',
+    "web/pages/login.page.ts": '''
+export class LoginPage {
+  async open(url: string): Promise<void> {
+    await this.page.goto(url);
+  }
+}
+export const loginAs = async (user) => new LoginPage().open("/login");
+''',
+    "ignored.log": "UserService debug output\n",
+    "logo.png": "\x00PNG UserService",
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    for path, content in FILES.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+    (root / ".gitignore").write_text("*.log\n")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=root, check=True)
+    return root
+
+
+@pytest.fixture
+def index(repo, tmp_path):
+    return CodeSearchIndex.build(repo, tmp_path / "index", max_file_bytes=1_000_000)
+
+
+def test_required_literals():
+    assert _required_literals("def get_user") == ["def get_user"]
+    assert _required_literals(r"colou?r\s+value") == ["colo", "value"]
+    assert _required_literals(r"User\w+Service") == ["User", "Service"]
+    assert _required_literals("get|post") is None
+    assert _required_literals("(abc)?def") is None
+    assert _required_literals("(?P<n>get)_user") is None
+    assert _required_literals(r"(?<!x = )get_user\(") is None
+    assert _required_literals(r"\x41bcd") == ["bcd"]
+    assert _required_literals(r"\u0041bcd \U00000041xyz \N{LATIN SMALL LETTER A}bcd \0101bcd") == ["bcd ", "xyz ", "bcd ", "bcd"]
+    assert _required_literals(r"[\]a]xyz") == ["xyz"]
+
+
+def test_search_with_extension_groups(index):
+    assert [h.text for h in index.search("(?P<n>get)_user")] == ["def get_user(self, user_id: int):"]
+    assert [h.text for h in index.search(r"(?<!x = )get_user\(")] == ["def get_user(self, user_id: int):"]
+
+
+def test_index_skips_ignored_and_binary_files(index):
+    assert [path for path, _, _ in index.files] == [
+        ".gitignore", "app/api/users.py", "app/services.py", "web/pages/login.page.ts",
+    ]
+
+
+def test_search_is_case_insensitive_and_ranks_definitions_first(index):
+    hits = index.search("userservice")
+
+    assert [(h.path, h.line) for h in hits] == [
+        ("app/api/users.py", 2), ("app/api/users.py", 9), ("app/api/users.py", 13), ("app/services.py", 2),
+    ]
+    assert [h.path for h in index.search("UserService")][0] == "app/services.py"
+    assert index.search(r"def \w+_user\(")[0].text == "def get_user(self, user_id: int):"
+    assert index.search("(unbalanced") == []
+
+
+def test_find_symbol_and_references(index):
+    assert [(h.path, h.line, h.kind) for h in index.find_symbol("UserService")] == [("app/services.py", 2, "class")]
+    assert [(h.kind, h.text) for h in index.find_symbol("login")] == [
+        ("function", 'export const loginAs = async (user) => new LoginPage().open("/login");'),
+        ("class", "export class LoginPage {"),
+    ]
+    assert [h.kind for h in index.find_symbol("MAX_PAGE")] == ["constant"]
+
+    references = index.find_references("UserService")
+    assert [(h.path, h.line) for h in references] == [("app/api/users.py", 2), ("app/api/users.py", 9), ("app/api/users.py", 13)]
+
+
+def test_indexes_are_loaded_from_disk(repo, tmp_path):
+    CodeSearchIndex.build(repo, tmp_path / "index", max_file_bytes=1_000_000)
+    (repo / "app" / "services.py").unlink()  # a stored index never re-reads the tree
+
+    index = CodeSearchIndexes().get(repo, tmp_path / "index")
+
+    assert [h.path for h in index.find_symbol("UserService")] == ["app/services.py"]
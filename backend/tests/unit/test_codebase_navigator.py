@@ -0,0 +1,140 @@
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from src.app.services.tools.codebase_navigator import CodebaseNavigator
+from src.app.services.tools.file_tree import summarize_tree
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.email=t@example.com", "-c", "user.name=t", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def _origin(path, content="v1"):
+    path.mkdir(parents=True)
+    _git(path, "init", "-q")
+    (path / "README.md").write_text(content)
+    _git(path, "add", "-A")
+    _git(path, "commit", "-q", "-m", content)
+    return path
+
+
+@pytest.fixture
+def navigator(tmp_path):
+    navigator = CodebaseNavigator()
+    navigator.clone_dir = tmp_path / "clones"
+    return navigator
+
+
+def _configure(navigator, **settings):
+    navigator.settings = navigator.settings.model_copy(update=settings)
+
+
+def test_clone_uses_shared_mirror_and_worktree_per_commit(tmp_path, navigator):
+    origin = _origin(tmp_path / "origin")
+    _configure(navigator, CODEBASE_FETCH_INTERVAL_SECONDS=0)
+
+    first = navigator.clone_repo(origin.as_uri())
+    assert (first / "README.md").read_text() == "v1"
+    assert first.name == _git(origin, "rev-parse", "HEAD")
+    assert _git(first.parent.parent / "mirror.git", "rev-parse", "--is-shallow-repository") == "true"
+
+    (origin / "README.md").write_text("v2")
+    _git(origin, "commit", "-q", "-am", "v2")
+    second = navigator.clone_repo(origin.as_uri())
+
+    assert second.parent == first.parent and second != first
+    assert (second / "README.md").read_text() == "v2"
+    assert (first / "README.md").read_text() == "v1"  # a running exploration keeps its snapshot
+
+
+def test_fetch_is_throttled(tmp_path, navigator):
+    origin = _origin(tmp_path / "origin")
+    _configure(navigator, CODEBASE_FETCH_INTERVAL_SECONDS=3600)
+    first = navigator.clone_repo(origin.as_uri())
+
+    (origin / "README.md").write_text("v2")
+    _git(origin, "commit", "-q", "-am", "v2")
+
+    assert navigator.clone_repo(origin.as_uri()) == first
+
+
+def test_same_named_repositories_do_not_collide(tmp_path, navigator):
+    one = navigator.clone_repo(_origin(tmp_path / "a" / "repo", "one").as_uri())
+    two = navigator.clone_repo(_origin(tmp_path / "b" / "repo", "two").as_uri())
+
+    assert (one / "README.md").read_text() == "one"
+    assert (two / "README.md").read_text() == "two"
+
+
+def test_unused_worktrees_expire(tmp_path, navigator):
+    origin = _origin(tmp_path / "origin")
+    _configure(navigator, CODEBASE_FETCH_INTERVAL_SECONDS=0, CODEBASE_WORKTREE_TTL_SECONDS=0)
+    first = navigator.clone_repo(origin.as_uri())
+
+    (origin / "README.md").write_text("v2")
+    _git(origin, "commit", "-q", "-am", "v2")
+    second = navigator.clone_repo(origin.as_uri())
+
+    assert not first.exists()
+    assert second.exists()
+
+
+def test_search_uses_per_commit_index(tmp_path, navigator):
+    origin = _origin(tmp_path / "origin", "def find_me():\n    pass\n")
+    worktree = navigator.clone_repo(origin.as_uri())
+
+    assert navigator.search_in_codebase(worktree, "FIND_ME") == "README.md:1:def find_me():"
+    assert navigator.find_references(worktree, "nothing") == "No results found."
+    assert (worktree.parent.parent / "search_index" / worktree.name / "meta.json").exists()
+
+
+def test_read_file_streams_a_line_window(tmp_path, navigator):
+    source = tmp_path / "big.py"
+    source.write_text("".join(f"line {n}\n" for n in range(1, 1001)))
+
+    first = navigator.read_file_content(source, max_lines=3, max_tokens=1000)
+    window = navigator.read_file_content(source, max_lines=3, max_tokens=1000, start_line=999)
+
+    assert first.startswith("line 1\nline 2\nline 3\n")
+    assert "start_line=4" in first
+    assert window == "line 999\nline 1000\n"
+    assert navigator.read_file_content(source, start_line=2000).startswith("Error:")
+
+
+def test_file_tree_prioritizes_tests_page_objects_and_api_clients():
+    paths = [f"docs/page{n}.md" for n in range(30)] + [f"assets/img{n}.png" for n in range(30)] + [
+        "tests/e2e/test_login.py", "tests/conftest.py", "src/pages/login_page.py", "src/api/client.py",
+        "src/utils/strings.py", "node_modules/lib/index.js", "README.md", "pyproject.toml",
+    ]
+
+    tree = summarize_tree(paths, "repo", max_items=16)
+
+    assert tree.splitlines()[0] == "repo/ (67 files)"  # committed node_modules is skipped
+    for line in ("    tests/", "        conftest.py", "            test_login.py", "        pages/", "        api/",
+                 "    docs/ (30 files)", "    assets/ (30 files)", "    pyproject.toml"):
+        assert line in tree.splitlines()
+    assert len(tree.splitlines()) <= 16
+
+
+def test_file_tree_is_cached_per_commit(tmp_path, navigator):
+    origin = _origin(tmp_path / "origin")
+    (origin / "build.log").write_text("ignored")
+    (origin / ".gitignore").write_text("*.log\n")
+    _git(origin, "add", ".gitignore")
+    _git(origin, "commit", "-q", "-m", "ignore logs")
+
+    tree = navigator.get_file_tree(origin)
+    assert "build.log" not in tree and "README.md" in tree
+
+    with patch.object(navigator, "_list_files", side_effect=AssertionError("tree should be cached")):
+        assert navigator.get_file_tree(origin) == tree
+
+    (origin / "CHANGELOG.md").write_text("v2")
+    _git(origin, "add", "-A")
+    _git(origin, "commit", "-q", "-m", "v2")
+    assert "CHANGELOG.md" in navigator.get_file_tree(origin)
@@ -0,0 +1,31 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from src.app.core.concurrency import LoopBlockingDetector, run_blocking
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_runs_off_the_loop_thread() -> None:
+	loop_thread = threading.get_ident()
+
+	worker_thread = await run_blocking(threading.get_ident)
+
+	assert worker_thread != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_loop_blocking_detector_reports_stall(caplog: pytest.LogCaptureFixture) -> None:
+	detector = LoopBlockingDetector(threshold_ms=50, interval_ms=10)
+	detector.start()
+	await asyncio.sleep(0.05)
+
+	with caplog.at_level(logging.WARNING, logger="src.app.core.concurrency"):
+		time.sleep(0.3)  # deliberately hold the loop
+		await asyncio.sleep(0.05)
+	await detector.stop()
+
+	assert any("Event loop blocked" in r.message and "time.sleep" in r.message for r in caplog.records)
@@ -0,0 +1,48 @@
+from src.app.services.context_budget import ContextBudget, ContextItem, TokenCounter
+
+
+def _budget(window: int, shares: dict[str, float] | None = None) -> ContextBudget:
+	counter = TokenCounter()
+	counter._loaded = True  # force the offline heuristic
+	return ContextBudget(window_tokens=window, reserved_tokens=0, shares=shares, counter=counter)
+
+
+def test_allocate_redistributes_unused_share() -> None:
+	budget = _budget(1000, {"source": 0.5, "vision": 0.5})
+
+	allowance = budget.allocate({"source": 100, "vision": 5000})
+
+	assert allowance["source"] == 100
+	# Vision gets its own half plus what source did not use.
+	assert allowance["vision"] == 900
+
+
+def test_allocate_respects_fixed_tokens() -> None:
+	budget = _budget(1000, {"source": 1.0})
+
+	allowance = budget.allocate({"source": 5000}, fixed_tokens=400)
+
+	assert allowance["source"] == 600
+
+
+def test_fit_truncates_only_oversized_sections() -> None:
+	budget = _budget(200, {"source": 0.5, "memory": 0.5})
+	long_text = "x" * 5000
+
+	fitted = budget.fit({"source": long_text, "memory": "short lesson"})
+
+	assert fitted["memory"] == "short lesson"
+	assert fitted["source"].endswith("<truncated>...")
+	assert budget.counter.count(fitted["source"]) <= 200
+
+
+def test_pack_prefers_high_scores() -> None:
+	budget = _budget(1000)
+	items = [
+		ContextItem(text="low relevance " * 10, score=0.0),
+		ContextItem(text="<button data-testid='login'>Login</button>", score=3.0),
+	]
+
+	packed = budget.pack(items, max_tokens=20)
+
+	assert packed == ["<button data-testid='login'>Login</button>"]
@@ -0,0 +1,155 @@
+import json
+import re
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.endpoints import mock_tracker
+from src.app.services.defect_ingestion import (
+	CsvDefectSource,
+	DefectBatch,
+	DefectIngestionService,
+	DefectSource,
+	IssueTrackerDefectSource,
+	JsonlDefectSource,
+	normalize_defect,
+)
+from src.app.services.defects import DefectAnalysisService
+
+
+@pytest.mark.asyncio
+async def test_jsonl_source_reads_only_appended_complete_lines(tmp_path) -> None:
+	path = tmp_path / "defects.jsonl"
+	path.write_text(json.dumps({"id": "D-1", "component": "Cart", "description": "Total not updated"}) + "\n")
+	source = JsonlDefectSource("jsonl", path)
+
+	first = await source.fetch(None, None)
+	assert [r["id"] for r in first.records] == ["D-1"]
+
+	with path.open("a") as f:
+		f.write(json.dumps({"id": "D-2", "component": "Cart", "description": "Coupon ignored"}) + "\n")
+		f.write('{"id": "D-3", "comp')  # half-written tail
+	second = await source.fetch(first.cursor, None)
+	assert [r["id"] for r in second.records] == ["D-2"]
+
+	third = await source.fetch(second.cursor, None)
+	assert third.records == []
+
+
+@pytest.mark.asyncio
+async def test_csv_source_keeps_header_across_increments(tmp_path) -> None:
+	path = tmp_path / "defects.csv"
+	path.write_text("id,component,description,severity\nD-1,Login,Captcha loops,High\n")
+	source = CsvDefectSource("csv", path)
+
+	first = await source.fetch(None, None)
+	with path.open("a") as f:
+		f.write("D-2,Login,SSO redirect drops state,Medium\n")
+	second = await source.fetch(first.cursor, None)
+
+	assert first.records[0]["description"] == "Captcha loops"
+	assert second.records == [{"id": "D-2", "component": "Login", "description": "SSO redirect drops state", "severity": "Medium"}]
+
+
+@pytest.mark.asyncio
+async def test_tracker_source_pages_and_honours_etag() -> None:
+	app = FastAPI()
+	app.include_router(mock_tracker.router, prefix="/tracker")
+	client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+	source = IssueTrackerDefectSource("tracker", "http://test/tracker", client=client)
+	source.PAGE_SIZE = 1
+
+	batch = await source.fetch(None, None)
+	assert len(batch.records) >= 2 and batch.etag
+	assert normalize_defect(batch.records[0], "tracker")["description"]
+
+	again = await source.fetch(batch.cursor, batch.etag)
+	assert again.not_modified and again.records == []
+	await client.aclose()
+
+
+def test_table_mode_applies_incremental_changes() -> None:
+	service = DefectAnalysisService(source="table")
+	assert service.get_relevant_defects("checkout") == ""
+
+	row = {"source": "tracker", "external_id": "D-1", "component": "Checkout", "description": "Double charge", "severity": "High"}
+	service.apply([row])
+	assert "Double charge" in service.get_relevant_defects("checkout flow")
+
+	service.apply([{**row, "description": "Double charge on retry"}])
+	results = service.search("checkout")
+	assert [d["description"] for d in results] == ["Double charge on retry"]
+
+
+class _FakeDefectsDb:
+	"""Session factory over an in-memory `defects` table that enforces Postgres upsert rules."""
+
+	def __init__(self) -> None:
+		self.table: dict[tuple[str, str], dict] = {}
+		self.states: dict[str, object] = {}
+		self.upserts: list[int] = []
+
+	def __call__(self) -> "_FakeDefectsDb":
+		return self
+
+	async def __aenter__(self) -> "_FakeDefectsDb":
+		return self
+
+	async def __aexit__(self, *exc) -> None:
+		return None
+
+	async def get(self, model, key):
+		return self.states.get(key)
+
+	def add(self, state) -> None:
+		self.states[state.source] = state
+
+	async def commit(self) -> None:
+		pass
+
+	async def execute(self, stmt):
+		if not stmt.is_insert:
+			rows = sorted(self.table.values(), key=lambda r: r["ingested_at"])
+			return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [SimpleNamespace(**r) for r in rows]))
+		params = stmt.compile(dialect=postgresql.dialect()).params
+		assert len(params) <= 32767, "too many bind parameters"
+		rows: dict[int, dict] = {}
+		for name, value in params.items():
+			column, n = re.match(r"(.+)_m(\d+)$", name).groups()
+			rows.setdefault(int(n), {})[column] = value
+		keys = [(row["source"], row["external_id"]) for row in rows.values()]
+		assert len(keys) == len(set(keys)), "ON CONFLICT DO UPDATE command cannot affect row a second time"
+		for key, row in zip(keys, rows.values()):
+			self.table[key] = row
+		self.upserts.append(len(rows))
+
+
+class _StaticSource(DefectSource):
+	def __init__(self, records: list[dict]) -> None:
+		super().__init__("jsonl:export")
+		self.records = records
+
+	async def fetch(self, cursor, etag) -> DefectBatch:
+		return DefectBatch(records=self.records, cursor="42")
+
+
+@pytest.mark.asyncio
+async def test_sync_source_dedupes_and_chunks_upserts() -> None:
+	records = [{"id": f"D-{n}", "component": "Cart", "description": f"Defect {n}"} for n in range(5000)]
+	records.append({"id": "D-7", "component": "Cart", "description": "Defect 7, reopened"})
+	db = _FakeDefectsDb()
+	service = DefectIngestionService(sources=[], session_factory=db)
+
+	synced = await service.sync_source(_StaticSource(records))
+
+	assert synced == 5000
+	assert db.upserts == [2000, 2000, 1000]
+	assert db.table[("jsonl:export", "D-7")]["description"] == "Defect 7, reopened"
+	assert db.states["jsonl:export"].cursor == "42"
+
+	defect_service = DefectAnalysisService(source="table")
+	assert await service.refresh_index(defect_service) == 5000
+	assert [d["description"] for d in defect_service.search("reopened")] == ["Defect 7, reopened"]
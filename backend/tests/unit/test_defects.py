@@ -0,0 +1,51 @@
+import json
+import os
+
+from src.app.services.defects import DefectAnalysisService, DefectIndex
+
+DEFECTS = [
+	{"component": "Calculator", "description": "Negative price when selecting 0 CPU", "severity": "Critical"},
+	{"component": "Calculator", "description": "GPU toggle not resetting on VM type change", "severity": "Medium"},
+	{"component": "API /vms", "description": "500 Error when name contains cyrillic characters", "severity": "High"},
+	{"component": "API /auth", "description": "Token expires faster than stated in ttl", "severity": "Low"},
+]
+
+
+def _write(path, defects) -> None:
+	path.write_text(json.dumps(defects), encoding="utf-8")
+
+
+def test_bm25_ranks_component_and_description_matches() -> None:
+	index = DefectIndex(DEFECTS)
+
+	ranked = [DEFECTS[doc_id]["description"] for doc_id, _ in index.search("Test the API token expiry on /auth", 5)]
+
+	assert ranked[0] == "Token expires faster than stated in ttl"
+	assert "500 Error when name contains cyrillic characters" in ranked
+	assert not any("price" in d for d in ranked)
+
+
+def test_service_is_lazy_and_caps_results(tmp_path) -> None:
+	path = tmp_path / "defects.json"
+	_write(path, DEFECTS)
+	service = DefectAnalysisService(path)
+
+	assert service._index is None
+	context = service.get_relevant_defects("Cover the calculator page")
+	assert "Negative price" in context and "GPU toggle" in context
+	assert len(service.search("calculator api", top_k=1)) == 1
+	assert service.get_relevant_defects("unrelated request") == ""
+
+
+def test_service_reloads_when_file_changes(tmp_path) -> None:
+	path = tmp_path / "defects.json"
+	_write(path, DEFECTS[:1])
+	service = DefectAnalysisService(path)
+	service.settings = service.settings.model_copy(update={"DEFECTS_RELOAD_CHECK_SECONDS": 0})
+	assert service.get_relevant_defects("checkout flow") == ""
+
+	_write(path, DEFECTS + [{"component": "Checkout", "description": "Double charge on retry", "severity": "High"}])
+	stat = path.stat()
+	os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+	assert "Double charge" in service.get_relevant_defects("checkout flow")
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from src.app.services.embeddings import EmbeddingService
+
+
+class _CountingModel:
+	def __init__(self) -> None:
+		self.calls: list[list[str]] = []
+
+	def __call__(self, texts: list[str]) -> list[list[float]]:
+		self.calls.append(list(texts))
+		return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_embed_reuses_cached_vectors() -> None:
+	model = _CountingModel()
+	service = EmbeddingService(model, cache_size=8)
+
+	first = service.embed(["login test"])
+	second = service.embed(["login test", "logout test"])
+
+	assert model.calls == [["login test"], ["logout test"]]
+	assert list(first[0]) == list(second[0])
+
+
+def test_cache_evicts_least_recently_used() -> None:
+	model = _CountingModel()
+	service = EmbeddingService(model, cache_size=2)
+
+	service.embed(["a"])
+	service.embed(["b"])
+	service.embed(["a"])
+	service.embed(["c"])  # evicts "b"
+	service.embed(["a", "b"])
+
+	assert model.calls == [["a"], ["b"], ["c"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced_into_one_batch() -> None:
+	model = _CountingModel()
+	service = EmbeddingService(model, batch_window_ms=20, max_batch_size=16)
+
+	results = await asyncio.gather(
+		service.aembed_one("dedup query"),
+		service.aembed_one("dedup query"),
+		service.aembed_one("lesson query"),
+	)
+
+	assert len(model.calls) == 1
+	assert sorted(model.calls[0]) == ["dedup query", "lesson query"]
+	assert list(results[0]) == list(results[1])
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting() -> None:
+	model = _CountingModel()
+	service = EmbeddingService(model, batch_window_ms=10_000, max_batch_size=2)
+
+	vectors = await asyncio.wait_for(service.aembed(["one", "two"]), timeout=1)
+
+	assert len(vectors) == 2
+	assert model.calls == [["one", "two"]]
+
+
+@pytest.mark.asyncio
+async def test_timed_out_caller_does_not_cancel_shared_batch() -> None:
+	model = _CountingModel()
+	service = EmbeddingService(model, batch_window_ms=50, max_batch_size=16)
+
+	async def impatient() -> None:
+		await asyncio.wait_for(service.aembed_one("shared query"), timeout=0.01)
+
+	patient = asyncio.create_task(service.aembed_one("shared query"))
+	with pytest.raises(asyncio.TimeoutError):
+		await impatient()
+	vector = await asyncio.wait_for(patient, timeout=1)
+
+	assert list(vector) == [12.0, 1.0]
+	assert model.calls == [["shared query"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_entry_without_waiters_is_dropped() -> None:
+	model = _CountingModel()
+	service = EmbeddingService(model, batch_window_ms=50, max_batch_size=16)
+
+	with pytest.raises(asyncio.TimeoutError):
+		await asyncio.wait_for(service.aembed_one("abandoned"), timeout=0.01)
+	await service.aembed_one("kept")
+
+	assert model.calls == [["kept"]]
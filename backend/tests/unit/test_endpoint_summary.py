@@ -0,0 +1,69 @@
+from src.app.services.code_analysis.schemas import ParsedEndpoint, ParsedParameter
+from src.app.services.code_analysis.summary import EndpointSummarizer, resource_prefix
+from src.app.services.context_budget import TokenCounter
+
+PAGING = [ParsedParameter(name="page", type_hint="int"), ParsedParameter(name="page_size", type_hint="int")]
+
+
+def _endpoint(method, path, description=None, parameters=None, source="api/routes.py"):
+    return ParsedEndpoint(
+        method=method, path=path, function_name=path.strip("/").replace("/", "_") or "root",
+        description=description, parameters=parameters or [], source_file=source, line_number=1,
+    )
+
+
+def _endpoints():
+    return [
+        _endpoint("get", "/api/v1/users", "List users", PAGING, source="api/users.py"),
+        _endpoint("get", "/api/v1/users/{user_id}", "Get a user", [ParsedParameter(name="user_id", type_hint="int")],
+                  source="api/users.py"),
+        _endpoint("get", "/api/v1/orders", "List orders", PAGING, source="api/orders.py"),
+        _endpoint("post", "/api/v1/orders/{order_id}/refund", "Refund a paid order", source="api/orders.py"),
+        _endpoint("get", "/health", "[Context: Defined in main.py]", source="main.py"),
+    ]
+
+
+def _summarizer():
+    return EndpointSummarizer(counter=TokenCounter())
+
+
+def test_resource_prefix_skips_namespace_segments():
+    assert resource_prefix("/api/v1/users/{id}/orders") == "/api/v1/users"
+    assert resource_prefix("/health") == "/health"
+    assert resource_prefix("/") == "/"
+
+
+def test_summary_groups_endpoints_and_shares_signatures():
+    summary = _summarizer().summarize(_endpoints())
+    lines = summary.splitlines()
+
+    assert lines[0].endswith("5 endpoints in 3 resource groups.")
+    assert "  $1 = (page:int, page_size:int)" in lines
+    assert "- GET /api/v1/users ($1) : List users" in lines
+    assert "[/api/v1/orders] 2 endpoints, orders.py" in lines
+    assert "- GET /health ()" in lines  # placeholder docstring dropped, file is in the group header
+    assert lines.index("[/api/v1/users] 2 endpoints, users.py") < lines.index("[/api/v1/orders] 2 endpoints, orders.py")
+
+
+def test_summary_ranks_groups_by_request_relevance():
+    summary = _summarizer().summarize(_endpoints(), query="Проверь возврат денег: refund an order")
+    lines = summary.splitlines()
+
+    assert lines[0].endswith("most relevant to the request first.")
+    assert lines.index("[/api/v1/orders] 2 endpoints, orders.py") < lines.index("[/api/v1/users] 2 endpoints, users.py")
+
+
+def test_summary_respects_token_cap():
+    endpoints = [_endpoint("get", f"/api/resource{n}/{{item_id}}", f"Fetch item of resource {n}") for n in range(500)]
+    endpoints.append(_endpoint("delete", "/api/invoices/{invoice_id}", "Cancel an invoice"))
+    counter = TokenCounter()
+
+    summary = EndpointSummarizer(counter=counter).summarize(endpoints, query="cancel invoice", max_tokens=300)
+
+    assert counter.count(summary) <= 300
+    assert "- DELETE /api/invoices/{invoice_id} () : Cancel an invoice" in summary
+    assert summary.splitlines()[-1].endswith("less relevant endpoints omitted)")
+
+
+def test_empty_summary():
+    assert _summarizer().summarize([]) == "No endpoints found in source code."
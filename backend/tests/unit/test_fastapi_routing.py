@@ -0,0 +1,123 @@
+from src.app.services.code_analysis.parsers.python import FastAPIParser
+from src.app.services.code_analysis.routing import resolve_endpoints
+from src.app.services.code_analysis.schemas import ParsedFile
+
+MAIN = '''
+from fastapi import FastAPI
+from app.api import api_router
+from .admin import create_admin
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+    app.mount("/admin", create_admin())
+    return app
+'''
+
+API_INIT = '''
+from fastapi import APIRouter
+from . import users
+from .items import router as items_router
+
+api_router = APIRouter()
+api_router.include_router(users.router)
+api_router.include_router(items_router, prefix="/items")
+'''
+
+USERS = '''
+from fastapi import APIRouter
+router: APIRouter = APIRouter(prefix="/users", tags=["users"])
+
+@router.get("/{user_id}")
+def get_user(user_id: int):
+    """Get a user"""
+'''
+
+ITEMS = '''
+from fastapi import APIRouter
+router = APIRouter()
+
+@router.post("")
+async def create_item(item: dict):
+    pass
+'''
+
+ADMIN = '''
+from fastapi import FastAPI
+admin = FastAPI()
+
+@admin.get("/stats")
+def stats():
+    pass
+
+def create_admin():
+    return admin
+'''
+
+MODULES = {
+    "app/main.py": MAIN,
+    "app/api/__init__.py": API_INIT,
+    "app/api/users.py": USERS,
+    "app/api/items.py": ITEMS,
+    "app/admin.py": ADMIN,
+}
+
+
+def _parse(modules):
+    parser = FastAPIParser()
+    files = {}
+    for path, code in modules.items():
+        endpoints, routes = parser.parse_module(path, code)
+        files[path] = ParsedFile(endpoints=endpoints, routes=routes)
+    return files
+
+
+def test_module_routes_are_collected():
+    _, routes = FastAPIParser().parse_module("app/api/__init__.py", API_INIT)
+
+    assert routes.routers == {"api_router": ""}
+    assert [(i.parent, i.child, i.prefix) for i in routes.includes] == [
+        ("api_router", "users.router", ""), ("api_router", "items_router", "/items"),
+    ]
+    assert routes.imports["items_router"] == (".items", "router")
+
+
+def test_prefixes_resolve_across_modules():
+    files = _parse(MODULES)
+    endpoints = resolve_endpoints(files, sorted(files))
+
+    assert sorted((ep.method, ep.path) for ep in endpoints) == [
+        ("get", "/api/v1/users/{user_id}"),
+        ("get", "/stats"),  # mounted through a factory call: left as declared
+        ("post", "/api/v1/items"),
+    ]
+    user = next(ep for ep in endpoints if ep.function_name == "get_user")
+    assert user.source_file == "app/api/users.py"
+
+
+def test_mounted_sub_application_gets_mount_prefix():
+    modules = dict(MODULES)
+    modules["app/main.py"] = MAIN.replace("import create_admin", "import admin").replace("create_admin()", "admin")
+    files = _parse(modules)
+
+    paths = {ep.function_name: ep.path for ep in resolve_endpoints(files, sorted(files))}
+
+    assert paths["stats"] == "/admin/stats"
+
+
+def test_router_included_twice_yields_both_paths():
+    modules = dict(MODULES)
+    modules["app/api/__init__.py"] = API_INIT + 'api_router.include_router(users.router, prefix="/legacy")\n'
+    files = _parse(modules)
+
+    paths = sorted(ep.path for ep in resolve_endpoints(files, sorted(files)) if ep.function_name == "get_user")
+
+    assert paths == ["/api/v1/legacy/users/{user_id}", "/api/v1/users/{user_id}"]
+
+
+def test_include_cycles_do_not_recurse_forever():
+    code = USERS + "router.include_router(router)\nother = APIRouter()\nother.include_router(router)\nrouter.include_router(other)\n"
+    files = _parse({"users.py": code})
+
+    assert [ep.path for ep in resolve_endpoints(files, ["users.py"])] == ["/users/{user_id}"]
@@ -0,0 +1,81 @@
+import numpy as np
+
+from src.app.services.local_vector_index import LocalVectorCollection
+
+
+def _embed(texts: list[str]) -> list[np.ndarray]:
+	"""Deterministic toy embedding: letter frequencies."""
+	vectors = []
+	for text in texts:
+		vec = np.zeros(26, dtype=np.float32)
+		for ch in text.lower():
+			if "a" <= ch <= "z":
+				vec[ord(ch) - ord("a")] += 1
+		vectors.append(vec)
+	return vectors
+
+
+def test_query_returns_nearest_with_cosine_distance(tmp_path) -> None:
+	collection = LocalVectorCollection("test_cases_v1", tmp_path, _embed)
+	collection.add(
+		ids=["a", "b"],
+		documents=["login page test", "zzz qqq xxx"],
+		metadatas=[{"code": "login"}, {"code": "other"}],
+	)
+
+	result = collection.query(query_texts=["login page test"], n_results=1, include=["metadatas", "distances"])
+
+	assert result["ids"] == [["a"]]
+	assert result["metadatas"][0][0]["code"] == "login"
+	assert result["distances"][0][0] < 1e-5
+
+
+def test_index_is_persisted_and_reloaded(tmp_path) -> None:
+	collection = LocalVectorCollection("qa_insights", tmp_path, _embed)
+	collection.add(ids=["l1"], documents=["modal overlay"], metadatas=[{"domain": "site.example", "lesson": "close modal"}])
+
+	reloaded = LocalVectorCollection("qa_insights", tmp_path, _embed)
+
+	assert reloaded.count() == 1
+	result = reloaded.query(query_texts=["modal"], n_results=3, where={"domain": "site.example"})
+	assert result["metadatas"][0][0]["lesson"] == "close modal"
+
+
+def test_where_filter_update_and_delete(tmp_path) -> None:
+	collection = LocalVectorCollection("qa_insights", tmp_path, _embed)
+	collection.add(
+		ids=["l1", "l2"],
+		documents=["timeout", "timeout"],
+		metadatas=[{"domain": "a.example"}, {"domain": "b.example"}],
+	)
+
+	assert collection.query(query_texts=["timeout"], n_results=5, where={"domain": "b.example"})["ids"] == [["l2"]]
+
+	collection.update(ids=["l2"], metadatas=[{"hits": 3}])
+	assert collection.get(ids=["l2"])["metadatas"][0] == {"domain": "b.example", "hits": 3}
+
+	collection.delete(where={"domain": "a.example"})
+	assert collection.get()["ids"] == ["l2"]
+
+
+def test_writes_are_journaled_and_compacted(tmp_path, monkeypatch) -> None:
+	collection = LocalVectorCollection("qa_insights", tmp_path, _embed)
+	collection.COMPACT_MIN_ROWS = 5
+	collection.add(ids=["l1", "l2", "l3"], documents=["modal", "timeout", "captcha"], metadatas=[{}, {}, {}])
+	saves = []
+	monkeypatch.setattr(np, "save", lambda *args, **kwargs: saves.append(args))
+
+	collection.update(ids=["l1"], metadatas=[{"hits": 1}])
+	collection.delete(ids=["l2"])
+	assert saves == []
+	assert not (tmp_path / "qa_insights" / "embeddings.npy").exists()
+
+	reloaded = LocalVectorCollection("qa_insights", tmp_path, _embed)
+	assert reloaded.get()["ids"] == ["l1", "l3"]
+	assert reloaded.get(ids=["l1"])["metadatas"][0] == {"hits": 1}
+	assert reloaded.query(query_texts=["captcha"], n_results=1)["ids"] == [["l3"]]
+
+	monkeypatch.undo()
+	collection.upsert(ids=["l4"], documents=["overlay"], metadatas=[{}])
+	assert not (tmp_path / "qa_insights" / "journal.jsonl").exists()
+	assert LocalVectorCollection("qa_insights", tmp_path, _embed).get()["ids"] == ["l1", "l3", "l4"]
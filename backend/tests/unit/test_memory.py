@@ -1,14 +1,22 @@
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
+import numpy as np
+
+from src.app.services.local_vector_index import LocalVectorCollection
 from src.app.services.memory import KnowledgeBaseService
 
 
-@patch("src.app.services.memory.chromadb.HttpClient")
+def _fake_embed(texts: list[str]) -> list[list[float]]:
+	return [[0.1, 0.2, 0.3] for _ in texts]
+
+
+@patch("src.app.services.vector_store.chromadb.HttpClient")
 def test_memory_learn_lesson_saves_to_collection(mock_chroma: MagicMock) -> None:
 	mock_collection = MagicMock()
 	mock_chroma.return_value.get_or_create_collection.return_value = mock_collection
 
-	service = KnowledgeBaseService()
+	service = KnowledgeBaseService(embedding_function=_fake_embed)
 	service.learn_lesson(
 		url="https://site.example/path",
 		original_error="Element not interactable",
@@ -25,7 +33,7 @@ def test_memory_learn_lesson_saves_to_collection(mock_chroma: MagicMock) -> None
 	assert "lesson" in meta and "force click" in meta["lesson"]
 
 
-@patch("src.app.services.memory.chromadb.HttpClient")
+@patch("src.app.services.vector_store.chromadb.HttpClient")
 def test_memory_recall_lessons_formats_context(mock_chroma: MagicMock) -> None:
 	mock_collection = MagicMock()
 	mock_chroma.return_value.get_or_create_collection.return_value = mock_collection
@@ -38,7 +46,8 @@ def test_memory_recall_lessons_formats_context(mock_chroma: MagicMock) -> None:
 		]],
 	}
 
-	service = KnowledgeBaseService()
+	service = KnowledgeBaseService(embedding_function=_fake_embed)
+	service.settings = service.settings.model_copy(update={"LESSON_RECALL_MODE": "vector"})
 	ctx = service.recall_lessons("login test", url="https://site.example/login")
 
 	assert "[KNOWN PROJECT QUIRKS / MEMORY]" in ctx
@@ -46,13 +55,117 @@ def test_memory_recall_lessons_formats_context(mock_chroma: MagicMock) -> None:
 	assert "networkidle" in ctx
 
 
-@patch("src.app.services.memory.chromadb.HttpClient")
+@patch("src.app.services.vector_store.chromadb.HttpClient")
 def test_memory_recall_lessons_empty_when_no_results(mock_chroma: MagicMock) -> None:
 	mock_collection = MagicMock()
 	mock_chroma.return_value.get_or_create_collection.return_value = mock_collection
 
 	mock_collection.query.return_value = {"ids": [[]], "metadatas": [[]]}
 
-	service = KnowledgeBaseService()
+	service = KnowledgeBaseService(embedding_function=_fake_embed)
 	ctx = service.recall_lessons("something")
 	assert ctx == ""
+
+
+def _letter_embed(texts: list[str]) -> list[np.ndarray]:
+	vectors = []
+	for text in texts:
+		vec = np.zeros(26, dtype=np.float32)
+		for ch in text.lower():
+			if "a" <= ch <= "z":
+				vec[ord(ch) - ord("a")] += 1
+		vectors.append(vec)
+	return vectors
+
+
+def _local_memory(tmp_path) -> KnowledgeBaseService:
+	store = MagicMock()
+	store.collection.return_value = LocalVectorCollection("qa_insights", tmp_path, _letter_embed)
+	store.embedder.embed.side_effect = _letter_embed
+	return KnowledgeBaseService(store)
+
+
+def test_consolidate_merges_duplicates_per_domain(tmp_path) -> None:
+	service = _local_memory(tmp_path)
+	service.learn_lesson("https://a.example/login", "Element not interactable", "Use force click.")
+	service.learn_lesson("https://a.example/login", "Element not interactable!", "Use force click on login.")
+	service.learn_lesson("https://b.example/login", "Element not interactable", "Scroll into view first.")
+	service.recall_lessons("Element not interactable", url="https://a.example/login", n_results=2)
+
+	stats = service.consolidate()
+
+	assert stats["merged"] == 1
+	remaining = service.collection.get(include=["metadatas"])["metadatas"]
+	by_domain = {meta["domain"]: meta for meta in remaining}
+	assert set(by_domain) == {"a.example", "b.example"}
+	assert by_domain["a.example"]["hits"] == 2
+	assert by_domain["a.example"]["merged"] == 1
+
+
+def test_consolidate_evicts_never_recalled_lessons(tmp_path) -> None:
+	service = _local_memory(tmp_path)
+	service.learn_lesson("https://a.example", "Timeout waiting for selector", "Wait for networkidle.")
+
+	assert service.consolidate()["evicted"] == 0
+	stats = service.consolidate(now=datetime.utcnow() + timedelta(days=60))
+
+	assert stats["evicted"] == 1
+	assert service.collection.count() == 0
+
+
+def test_hybrid_recall_caches_domain_until_new_lesson(tmp_path) -> None:
+	service = _local_memory(tmp_path)
+	service.learn_lesson("https://a.example/login", "Element not interactable", "Use force click.")
+	service.collection = MagicMock(wraps=service.collection)
+
+	first = service.recall_lessons("Element not interactable", url="https://a.example/cart")
+	second = service.recall_lessons("Element not interactable", url="https://a.example/login")
+
+	assert "force click" in first and first == second
+	assert service.collection.get.call_count == 1
+	service.collection.query.assert_not_called()
+
+	service.learn_lesson("https://a.example/login", "Timeout on checkout", "Wait for networkidle.")
+	third = service.recall_lessons("Timeout on checkout", url="https://a.example/login", n_results=1)
+
+	assert "networkidle" in third
+	assert service.collection.get.call_count == 2
+
+
+def test_consolidation_drops_domain_cache_of_other_instances(tmp_path) -> None:
+	graph_service = _local_memory(tmp_path)
+	scheduler_service = KnowledgeBaseService(graph_service.vector_store)
+	graph_service.learn_lesson("https://a.example/login", "Element not interactable", "Use force click.")
+	assert "force click" in graph_service.recall_lessons("Element not interactable", url="https://a.example/login")
+
+	scheduler_service.consolidate(now=datetime.utcnow() + timedelta(days=365))
+
+	assert graph_service.recall_lessons("Element not interactable", url="https://a.example/login") == ""
+
+
+def test_legacy_lessons_are_aged_from_first_consolidation(tmp_path) -> None:
+	service = _local_memory(tmp_path)
+	# Stored before hit counting existed: no `hits`, created long before the unused TTL.
+	legacy = {"domain": "a.example", "lesson": "Wait for networkidle.", "timestamp": "2020-01-01T00:00:00"}
+	service.collection.add(ids=["legacy"], documents=["Timeout waiting for selector"], metadatas=[legacy])
+
+	assert service.consolidate()["evicted"] == 0
+	meta = service.collection.get(include=["metadatas"])["metadatas"][0]
+	assert meta["hits"] == 0 and meta["tracked_since"]
+
+	stats = service.consolidate(now=datetime.utcnow() + timedelta(days=60))
+	assert stats["evicted"] == 1
+
+
+def test_recall_hits_are_buffered_until_consolidation(tmp_path) -> None:
+	service = _local_memory(tmp_path)
+	service.learn_lesson("https://a.example/login", "Element not interactable", "Use force click.")
+	service.collection = MagicMock(wraps=service.collection)
+
+	for _ in range(3):
+		service.recall_lessons("Element not interactable", url="https://a.example/login")
+	service.collection.update.assert_not_called()
+
+	KnowledgeBaseService(service.vector_store).consolidate()
+	meta = service.collection.get(include=["metadatas"])["metadatas"][0]
+	assert meta["hits"] == 3 and meta["last_recalled"]
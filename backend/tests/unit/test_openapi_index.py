@@ -0,0 +1,74 @@
+import json
+
+import yaml
+
+from src.app.services.parsers.openapi import OpenAPIParser
+from src.app.services.parsers.openapi_index import build_index, build_index_from_bytes, endpoint_ranker
+
+SPEC = {
+	"openapi": "3.0.0",
+	"info": {"title": "Shop API"},
+	"paths": {
+		"/v1.0/orders/{orderId}": {
+			"parameters": [{"$ref": "#/components/parameters/OrderId"}],
+			"get": {
+				"summary": "Get order",
+				"tags": ["orders"],
+				"responses": {"200": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Order"}}}}},
+			},
+		},
+		"/v1.0/orders": {
+			"post": {
+				"summary": "Create order",
+				"operationId": "createOrder",
+				"requestBody": {"$ref": "#/components/requestBodies/NewOrder"},
+			},
+		},
+	},
+	"components": {
+		"parameters": {"OrderId": {"name": "orderId", "in": "path", "required": True}},
+		"requestBodies": {
+			"NewOrder": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Order"}}}},
+		},
+		"schemas": {
+			"Order": {
+				"allOf": [{"$ref": "#/components/schemas/Base"}],
+				"properties": {"items": {"type": "array"}, "total": {"type": "number"}},
+				"required": ["items"],
+			},
+			"Base": {"properties": {"id": {"type": "string"}}, "required": ["id"]},
+		},
+	},
+}
+
+
+def test_index_resolves_refs_for_params_bodies_and_responses() -> None:
+	endpoints = {(e["method"], e["path"]): e for e in build_index(SPEC)["endpoints"]}
+
+	get_order = endpoints[("GET", "/v1.0/orders/{orderId}")]
+	assert get_order["params"] == ["orderId*"]
+	assert get_order["response"] == "Order{items*, total, id*}"
+	assert endpoints[("POST", "/v1.0/orders")]["body"] == "Order{items*, total, id*}"
+
+
+def test_streaming_and_yaml_parses_match_full_parse() -> None:
+	expected = build_index(SPEC)["endpoints"]
+
+	assert build_index_from_bytes(json.dumps(SPEC).encode())["endpoints"] == expected
+	assert build_index_from_bytes(yaml.safe_dump(SPEC, sort_keys=False).encode())["endpoints"] == expected
+
+
+def test_large_spec_ranks_relevant_endpoints_within_top_k() -> None:
+	spec = {"info": {"title": "Big"}, "paths": {
+		f"/resource{n}/items": {"get": {"summary": f"List items of resource {n}"}} for n in range(2000)
+	}}
+	spec["paths"]["/payments/refunds"] = {"post": {"summary": "Refund a payment", "tags": ["billing"]}}
+	index = build_index_from_bytes(json.dumps(spec).encode())
+
+	ranked = endpoint_ranker.rank(index, "test refund of a billing payment", top_k=5)
+	assert ranked[0][0]["path"] == "/payments/refunds"
+
+	summary = OpenAPIParser._summarize_index(index, "refund payment", max_tokens=200)
+	lines = summary.splitlines()
+	assert lines[2].startswith("- POST /payments/refunds")
+	assert "of 2001 endpoints shown" in lines[-1]
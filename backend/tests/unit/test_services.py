@@ -2,8 +2,15 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from src.app.services.deduplication import DeduplicationService
+from src.app.services.deduplication import DeduplicationService, normalize_request
 from src.app.services.gitlab import GitLabService
+from src.app.services.memory import KnowledgeBaseService
+from src.app.services.storage.service import StorageService
+from src.app.services.vector_store import VectorStore
+
+
+def _fake_embed(texts: list[str]) -> list[list[float]]:
+    return [[0.1, 0.2, 0.3] for _ in texts]
 
 
 @pytest.mark.asyncio
@@ -27,7 +34,7 @@ async def test_gitlab_create_mr(mock_client_cls: MagicMock) -> None:
     assert result["mr_url"] == "http://mr-url"
     assert mock_client.post.call_count == 3
 
-@patch("src.app.services.deduplication.chromadb.HttpClient")
+@patch("src.app.services.vector_store.chromadb.HttpClient")
 def test_deduplication_find_similar(mock_chroma: MagicMock) -> None:
     """Test vector search logic with HttpClient."""
     mock_collection = MagicMock()
@@ -41,12 +48,12 @@ def test_deduplication_find_similar(mock_chroma: MagicMock) -> None:
         "metadatas": [[{"code": "def cached_test(): pass"}]],
     }
 
-    service = DeduplicationService()
+    service = DeduplicationService(embedding_function=_fake_embed)
     result = service.find_similar("login test")
 
     assert result == "def cached_test(): pass"
 
-@patch("src.app.services.deduplication.chromadb.HttpClient")
+@patch("src.app.services.vector_store.chromadb.HttpClient")
 def test_deduplication_no_match(mock_chroma: MagicMock) -> None:
     """Test when no similar test is found."""
     mock_collection = MagicMock()
@@ -59,7 +66,125 @@ def test_deduplication_no_match(mock_chroma: MagicMock) -> None:
         "metadatas": [[{"code": "irrelevant code"}]],
     }
 
-    service = DeduplicationService()
+    service = DeduplicationService(embedding_function=_fake_embed)
     result = service.find_similar("login test", threshold=0.2)
 
     assert result is None
+
+@patch("src.app.services.vector_store.chromadb.HttpClient")
+def test_services_share_one_chroma_client(mock_chroma: MagicMock) -> None:
+    """Dedup and memory reuse the app-lifetime client and resolve each collection once."""
+    store = VectorStore(_fake_embed)
+    dedup = DeduplicationService(store)
+    memory = KnowledgeBaseService(store)
+    mock_chroma.return_value.get_or_create_collection.return_value.query.return_value = {
+        "ids": [[]], "distances": [[]], "metadatas": [[]],
+    }
+
+    dedup.find_similar("login test")
+    dedup.find_similar("logout test")
+    memory.recall_lessons("login test")
+
+    assert mock_chroma.call_count == 1
+    assert mock_chroma.return_value.get_or_create_collection.call_count == 2
+
+@patch("src.app.services.vector_store.chromadb.HttpClient")
+def test_vector_store_reconnects_after_connection_error(mock_chroma: MagicMock) -> None:
+    """A dropped connection rebuilds the client and retries the call once."""
+    stale_collection = MagicMock()
+    stale_collection.query.side_effect = ConnectionError("server restarted")
+    fresh_collection = MagicMock()
+    fresh_collection.query.return_value = {
+        "ids": [["id1"]], "distances": [[0.1]], "metadatas": [[{"code": "def cached_test(): pass"}]],
+    }
+    mock_chroma.return_value.get_or_create_collection.side_effect = [stale_collection, fresh_collection]
+
+    service = DeduplicationService(VectorStore(_fake_embed))
+
+    assert service.find_similar("login test") == "def cached_test(): pass"
+    assert mock_chroma.call_count == 2
+
+@pytest.mark.asyncio
+@patch("src.app.services.vector_store.chromadb.HttpClient")
+async def test_unreachable_collection_is_skipped_until_retry(mock_chroma: MagicMock) -> None:
+    """Guards report an unreachable server and don't reconnect on every call."""
+    mock_chroma.return_value.get_or_create_collection.side_effect = ConnectionError("chroma down")
+    store = VectorStore(_fake_embed)
+    dedup = DeduplicationService(store)
+    memory = KnowledgeBaseService(store)
+
+    assert dedup.find_similar("login test") is None
+    assert dedup.find_similar("logout test") is None
+    assert await memory.arecall_lessons("login test") == ""
+    memory.learn_lesson("https://a.example", "Timeout", "Wait for networkidle.")
+
+    assert mock_chroma.return_value.get_or_create_collection.call_count == 2  # once per collection
+    store.embedder.embed = MagicMock()
+    dedup.find_similar("login test")
+    store.embedder.embed.assert_not_called()
+
+def test_deduplication_stores_code_by_reference(tmp_path) -> None:
+    """Code goes to StorageService by hash; the index keeps only the reference."""
+    collection = MagicMock()
+    collection.get.return_value = {"ids": []}
+    store = MagicMock()
+    store.collection.return_value = collection
+    store.embedder.embed.side_effect = _fake_embed
+    service = DeduplicationService(store, storage=StorageService(tmp_path))
+
+    service.save("login test", "def test_login(): pass")
+
+    metadata = collection.add.call_args.kwargs["metadatas"][0]
+    assert "code" not in metadata
+    collection.query.return_value = {"ids": [["id1"]], "distances": [[0.1]], "metadatas": [[metadata]]}
+    assert service.find_similar("login test") == "def test_login(): pass"
+
+def test_deduplication_skips_duplicate_pairs(tmp_path) -> None:
+    collection = MagicMock()
+    store = MagicMock()
+    store.collection.return_value = collection
+    store.embedder.embed.side_effect = _fake_embed
+    service = DeduplicationService(store, storage=StorageService(tmp_path))
+
+    collection.get.return_value = {"ids": []}
+    service.save("login test", "def test_login(): pass")
+    entry_id = collection.add.call_args.kwargs["ids"][0]
+    collection.get.return_value = {"ids": [entry_id]}
+    service.save("login test", "def test_login(): pass")
+
+    assert collection.add.call_count == 1
+    assert store.embedder.embed.call_count == 1
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.data[key] = value
+
+def test_normalize_request_canonicalizes_case_whitespace_and_urls() -> None:
+    assert normalize_request("  Test LOGIN on\nhttps://www.Site.example/login/?b=2&a=1#top ") == (
+        normalize_request("test login on http://site.example/login?a=1&b=2")
+    )
+    assert normalize_request("login on site.example/a") != normalize_request("login on site.example/b")
+
+@pytest.mark.asyncio
+async def test_deduplication_exact_match_skips_vector_search(tmp_path) -> None:
+    collection = MagicMock()
+    collection.get.return_value = {"ids": []}
+    store = MagicMock()
+    store.collection.return_value = collection
+    store.embedder.aembed_one = AsyncMock(return_value=[0.1, 0.2, 0.3])
+    service = DeduplicationService(store, storage=StorageService(tmp_path), exact_index=_FakeRedis())
+
+    await service.asave("Test login on https://site.example/login", "def test_login(): pass")
+    store.embedder.aembed_one.reset_mock()
+
+    result = await service.afind_similar("test   login on https://site.example/login/")
+
+    assert result == "def test_login(): pass"
+    store.embedder.aembed_one.assert_not_called()
+    collection.query.assert_not_called()
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from src.app.core.config import Settings
+from src.app.services.speculation import SpeculativeCoderService, plan_fingerprint
+
+
+def _service() -> SpeculativeCoderService:
+	service = SpeculativeCoderService()
+	service.enabled = True
+	return service
+
+
+@pytest.mark.asyncio
+async def test_speculative_result_reused_for_unchanged_plan() -> None:
+	service = _service()
+
+	async def generate() -> str:
+		return "def test_login(): pass"
+
+	fingerprint = plan_fingerprint("1. Open page", "ctx")
+	assert service.start(1, fingerprint, generate)
+
+	assert await service.take(1, plan_fingerprint("1. Open page", "ctx")) == "def test_login(): pass"
+	# A result is handed out only once.
+	assert await service.take(1, fingerprint) is None
+
+
+@pytest.mark.asyncio
+async def test_speculative_result_discarded_for_edited_plan() -> None:
+	service = _service()
+	started = asyncio.Event()
+
+	async def generate() -> str:
+		started.set()
+		await asyncio.sleep(10)
+		return "stale code"
+
+	service.start(2, plan_fingerprint("draft plan"), generate)
+	await started.wait()
+	task = service._speculations["2"].task
+
+	assert await service.take(2, plan_fingerprint("edited plan")) is None
+	await asyncio.sleep(0)
+	assert task.cancelled()
+
+
+def test_speculation_is_disabled_by_default() -> None:
+	assert Settings.model_fields["SPECULATIVE_CODER_ENABLED"].default is False
+
+
+@pytest.mark.asyncio
+async def test_disabled_service_neither_starts_nor_hands_out_results() -> None:
+	service = SpeculativeCoderService()
+	service.enabled = False
+
+	async def generate() -> str:
+		return "code"
+
+	assert not service.start(3, "hash", generate)
+	assert await service.take(3, "hash") is None
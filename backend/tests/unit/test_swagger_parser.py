@@ -1,7 +1,11 @@
 import json
 from unittest.mock import MagicMock, patch
 
+import httpx
+import pytest
+
 from src.app.services.parsers.openapi import OpenAPIParser
+from src.app.services.parsers.spec_cache import OpenAPISpecCache
 
 PETSTORE_SWAGGER = {
   "openapi": "3.0.0",
@@ -59,3 +63,54 @@ def test_parse_from_url_failure(mock_get: MagicMock) -> None:
 
     assert "Error parsing OpenAPI spec" in result
     assert "Treating input as plain text" in result
+
+@pytest.mark.asyncio
+async def test_spec_cache_revalidates_with_etag_and_reuses_index(tmp_path) -> None:
+    """A fresh entry costs no request; a stale one is revalidated and a 304 keeps the index."""
+    calls: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=PETSTORE_SWAGGER, headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = OpenAPISpecCache(cache_dir=tmp_path, ttl_seconds=60, client=client)
+    url = "http://example.com/swagger.json"
+
+    first = await cache.get(url)
+    await cache.get(url)
+    assert len(calls) == 1
+
+    # A new process (empty memory) with an expired entry revalidates from disk.
+    restarted = OpenAPISpecCache(cache_dir=tmp_path, ttl_seconds=0, client=client)
+    second = await restarted.get(url)
+
+    assert len(calls) == 2 and calls[1]["if-none-match"] == '"v1"'
+    assert second == first
+    assert first["endpoints"][0]["path"] == "/pets"
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_spec_cache_ignores_entries_of_older_format(tmp_path) -> None:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json=PETSTORE_SWAGGER)))
+    cache = OpenAPISpecCache(cache_dir=tmp_path, ttl_seconds=60, client=client)
+    url = "http://example.com/swagger.json"
+    old_entry = {"url": url, "fetched_at": 9e12, "index": {"title": "Old", "endpoints": []}}
+    cache._path_for(url).write_text(json.dumps(old_entry), encoding="utf-8")
+
+    index = await cache.get(url)
+
+    assert index["fingerprint"] and index["endpoints"][0]["path"] == "/pets"
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_aparse_summarizes_cached_spec(tmp_path) -> None:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json=PETSTORE_SWAGGER)))
+    with patch("src.app.services.parsers.openapi.openapi_spec_cache", OpenAPISpecCache(tmp_path, 60, client)):
+        summary = await OpenAPIParser.aparse("http://example.com/swagger.json list pets", query="list pets")
+
+    assert "Swagger Petstore" in summary
+    assert "GET /pets [limit]" in summary
+    await client.aclose()
@@ -0,0 +1,136 @@
+import pytest
+
+from src.app.services.code_analysis.parsers.tree_sitter_engine import TreeSitterEngine
+from src.app.services.code_analysis.scanner import parse_source
+
+pytest.importorskip("tree_sitter")
+
+
+@pytest.fixture
+def engine():
+    return TreeSitterEngine()
+
+
+def _require(engine, file_path):
+    if not engine.supports(file_path):
+        pytest.skip(f"tree-sitter grammar for {file_path} is not installed")
+
+
+def test_spring_controller_java(engine):
+    _require(engine, "UserController.java")
+    code = """
+@RestController
+@RequestMapping("/api/users")
+public class UserController {
+    @GetMapping(value = "/{id}", produces = "application/json")
+    public ResponseEntity<User> get(@PathVariable Long id, @RequestParam(required = false) String q) { return null; }
+
+    @RequestMapping(path = "/import", method = RequestMethod.POST)
+    public void importUsers(@RequestBody List<User> users) {}
+}
+"""
+    endpoints = engine.parse_file("UserController.java", code)
+
+    assert [(ep.method, ep.path, ep.line_number) for ep in endpoints] == [
+        ("get", "/api/users/{id}", 6),
+        ("post", "/api/users/import", 9),
+    ]
+    assert [(p.name, p.type_hint, p.source) for p in endpoints[0].parameters] == [
+        ("id", "Long", "path"), ("q", "String", "query"),
+    ]
+    assert endpoints[0].return_type == "ResponseEntity<User>"
+    assert endpoints[1].parameters[0].source == "body"
+
+
+def test_spring_controller_kotlin(engine):
+    _require(engine, "ItemController.kt")
+    code = """
+@RestController
+@RequestMapping("/api/items")
+class ItemController(private val service: ItemService) {
+    @GetMapping("/{id}")
+    fun get(@PathVariable id: Long): Item = service.get(id)
+
+    @PostMapping
+    suspend fun create(@RequestBody item: Item) {}
+}
+"""
+    endpoints = engine.parse_file("ItemController.kt", code)
+
+    assert [(ep.method, ep.path, ep.function_name) for ep in endpoints] == [
+        ("get", "/api/items/{id}", "get"),
+        ("post", "/api/items", "create"),
+    ]
+    assert endpoints[0].return_type == "Item"
+
+
+def test_nestjs_and_express_typescript(engine):
+    _require(engine, "cats.controller.ts")
+    code = """
+@Controller('cats')
+export class CatsController {
+  @Post()
+  @HttpCode(204)
+  create(@Body() dto: CreateCatDto) {}
+
+  @Get(':id')
+  findOne(@Param('id') id: string) {}
+}
+
+router.delete('/cats/:id', removeCat);
+cache.get('cats');
+"""
+    endpoints = engine.parse_file("cats.controller.ts", code)
+
+    assert [(ep.method, ep.path, ep.function_name, ep.line_number) for ep in endpoints] == [
+        ("post", "/cats", "create", 6),
+        ("get", "/cats/:id", "findOne", 9),
+        ("delete", "/cats/:id", "removeCat", 12),
+    ]
+    assert [(p.name, p.source) for p in endpoints[1].parameters] == [("id", "path")]
+
+
+def test_go_routers_resolve_groups(engine):
+    _require(engine, "main.go")
+    code = """package main
+
+func main() {
+	r := gin.Default()
+	v1 := r.Group("/v1")
+	v1.GET("/users/:id", getUser)
+	mux.HandleFunc("POST /items", h.Create)
+	router.HandleFunc("/health", health).Methods("GET")
+	resp, _ := client.Get("http://example.com")
+}
+"""
+    endpoints = engine.parse_file("main.go", code)
+
+    assert [(ep.method, ep.path, ep.function_name) for ep in endpoints] == [
+        ("get", "/v1/users/:id", "getUser"),
+        ("post", "/items", "h.Create"),
+        ("get", "/health", "health"),
+    ]
+
+
+def test_flask_routes_are_added_to_fastapi_results():
+    if not TreeSitterEngine().supports("views.py"):
+        pytest.skip("tree-sitter grammar for Python is not installed")
+    code = '''
+bp = Blueprint("users", __name__, url_prefix="/users")
+
+@bp.route("/<int:user_id>", methods=["GET", "DELETE"])
+def user(user_id):
+    """Fetch or delete a user"""
+
+@router.get("/health")
+def health():
+    pass
+'''
+    endpoints = parse_source("views.py", code).endpoints
+
+    assert sorted((ep.method, ep.path) for ep in endpoints) == [
+        ("delete", "/users/{user_id}"), ("get", "/health"), ("get", "/users/{user_id}"),
+    ]
+    flask = next(ep for ep in endpoints if ep.path == "/users/{user_id}")
+    assert flask.description == "Fetch or delete a user"
+    assert flask.parameters[0].type_hint == "int"